@@ -4,17 +4,23 @@
 # Force reload
 import logging
 import base64
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Literal
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Literal, Set, Tuple
 import io
 import PyPDF2
 
 from fastapi import FastAPI, HTTPException, Request, Depends, UploadFile, File, Form, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse, FileResponse
-from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse, FileResponse, Response, ORJSONResponse
+from pydantic import VERSION as PYDANTIC_VERSION, BaseModel, field_validator
 import json
 import asyncio
+import hashlib
+import heapq
+import time
+import orjson
+from openai import AsyncOpenAI, OpenAI
+from operator import itemgetter
 from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -22,87 +28,123 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Inches, Pt, RGBColor
 
 import os
+import re
+import secrets
 import sys
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import Config
+from modules.daily_digest_formatter import DailyDigestFormatter
 from modules.logger import setup_logging
 from modules.perplexity_workflow import PerplexityWorkflow
 from modules.perplexity_client import PerplexityClient
+from modules.ai_pdf_filler import get_ai_pdf_filler
 from modules.apollo_followup import ApolloFollowUpService
 from modules.post_contact_automation import PostContactAutomationService, PostContactAction
 from modules.lost_lead_analyzer import LostLeadAnalyzer
-from modules.proposal_followup_analyzer import ProposalFollowupAnalyzer
+from modules.nda_analyzer import NDAAnalyzer
+from modules.pdf_generator import get_all_entities, get_entity_info, get_pdf_generator
+from modules.proposal_followup_analyzer import (
+    THREAD_ANALYSIS_MAX_TOKENS,
+    THREAD_ANALYSIS_TEMPERATURE,
+    ProposalFollowupAnalyzer,
+)
 from modules.outlook_client import OutlookClient
 from modules.email_token_store import EmailTokenStore
 from modules.odoo_client import OdooClient
 from modules.teams_messenger import TeamsMessenger
+from modules.token_refresh import refresh_stored_access_token, stored_token_refresh, token_refresh_manager
+from modules.tool_impact_analyzer import ToolImpactAnalyzer
 from modules.weekly_pipeline_analyzer import WeeklyPipelineAnalyzer
+from modules.llm_coalescer import LLMRequestCoalescer
+from modules.report_builder import build_saved_report
+from modules.llm_client import LLMClient
+from modules.rate_limit import TokenBucket
+from modules.ttl_cache import TTLCache
 from api.auth import get_auth_service, get_current_user, get_database, AuthService
 from api.database import Database
 from api.supabase_client import get_supabase_client
 from api.supabase_database import SupabaseDatabase
 
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # Initialize Supabase client
 supabase = get_supabase_client()
 
-# In-memory cache for proposal followups analysis (fallback if Supabase unavailable)
-proposal_followups_cache = {
-    "data": None,
-    "timestamp": None,
-    "params": None
-}
-
-
-def get_supabase_database() -> SupabaseDatabase:
-    """Dependency to get Supabase database instance."""
-    return SupabaseDatabase()
-
+# Optional Redis client shared by all workers (only when REDIS_URL is configured)
+redis_client = (
+    redis_asyncio.from_url(Config.REDIS_URL)
+    if REDIS_AVAILABLE and Config.REDIS_URL
+    else None
+)
 
-def get_user_odoo_client(user: Dict[str, Any], db: Database) -> OdooClient:
-    """
-    Get an Odoo client configured with the user's stored credentials.
+# Per-process L1 in front of the shared Supabase analysis cache, keyed on
+# (user_id, days_back, no_response_days, engage_email). Entries are
+# (time.monotonic() when stored, dict stored in Supabase). Without Supabase it
+# is the only cache. With Supabase, entries older than the fresh window are
+# still served but trigger a background re-read (stale-while-revalidate).
+PROPOSAL_FOLLOWUPS_L1_TTL_SECONDS = 300
+PROPOSAL_FOLLOWUPS_L1_FRESH_SECONDS = 60
+PROPOSAL_FOLLOWUPS_L1_MAXSIZE = 256
+proposal_followups_cache = TTLCache(maxsize=PROPOSAL_FOLLOWUPS_L1_MAXSIZE, ttl=PROPOSAL_FOLLOWUPS_L1_TTL_SECONDS)
+# One lock per cache key so concurrent L1 misses share a single Supabase read;
+# bounded like the L1 itself so idle keys do not accumulate
+_proposal_followups_locks = TTLCache(maxsize=PROPOSAL_FOLLOWUPS_L1_MAXSIZE, ttl=PROPOSAL_FOLLOWUPS_L1_TTL_SECONDS)
+_proposal_followups_locks_guard = threading.Lock()
+_proposal_followups_refreshing: Set[Tuple[Any, ...]] = set()
 
-    Args:
-        user: Current authenticated user dict
-        db: Database instance
 
-    Returns:
-        Configured OdooClient instance
+# Process-wide SupabaseDatabase, created lazily on first use
+_supabase_database: Optional[SupabaseDatabase] = None
+_supabase_database_lock = threading.Lock()
 
-    Raises:
-        HTTPException: If user hasn't set up Odoo credentials
-    """
-    user_settings = db.get_user_settings(user["id"])
 
-    if not user_settings.get("odoo_username") or not user_settings.get("odoo_password"):
-        raise HTTPException(
-            status_code=403,
-            detail="Odoo credentials not configured. Please log in again."
-        )
+def get_supabase_database() -> SupabaseDatabase:
+    """Dependency to get the shared Supabase database instance."""
+    global _supabase_database
+    if _supabase_database is None:
+        with _supabase_database_lock:
+            if _supabase_database is None:
+                _supabase_database = SupabaseDatabase()
+    return _supabase_database
 
-    # Create a custom config with user's credentials
-    config = Config()
-    config.ODOO_URL = user_settings.get("odoo_url") or config.ODOO_URL
-    config.ODOO_DB = user_settings.get("odoo_db") or config.ODOO_DB
-    config.ODOO_USERNAME = user_settings["odoo_username"]
-    config.ODOO_PASSWORD = user_settings["odoo_password"]
 
-    client = OdooClient(config)
-    return client
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Handshake with Graph in the background so the first Outlook call reuses a pooled connection
+    threading.Thread(target=get_outlook_client().warm_up, daemon=True).start()
+    yield
+    OutlookClient.session.close()
 
 
 app = FastAPI(
     title="Lead Automation API",
     description="Generate Perplexity prompts, parse results, and prepare Apollo follow-up emails.",
     version="1.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-ALLOWED_ORIGINS = [
+# Frozenset so the per-request origin check is a hash lookup
+ALLOWED_ORIGINS = frozenset({
     'http://localhost:3000',
     'http://localhost:3001',
     'http://localhost:3002',
@@ -110,7 +152,7 @@ ALLOWED_ORIGINS = [
     'http://127.0.0.1:3001',
     'http://127.0.0.1:3002',
     'https://lead-automation-system.onrender.com',
-]
+})
 
 app.add_middleware(
     CORSMiddleware,
@@ -121,33 +163,99 @@ app.add_middleware(
 )
 
 
+@lru_cache(maxsize=1)
 def _setup_logging() -> Config:
+    """Build the shared Config and install logging handlers exactly once."""
     config = Config()
     setup_logging(config, "INFO")
     return config
 
 
+# Service instances are reused across requests but kept per thread: they wrap
+# an OdooClient whose xmlrpc ServerProxy must not be shared between threads.
+_thread_services = threading.local()
+
+
+def _thread_service(name: str, factory: Callable[[], Any]) -> Any:
+    service = getattr(_thread_services, name, None)
+    if service is None:
+        service = factory()
+        setattr(_thread_services, name, service)
+    return service
+
+
+def get_odoo_client() -> OdooClient:
+    """Connected OdooClient on the service account, authenticated once per worker thread.
+
+    Called inside handlers rather than through Depends: sync dependencies may run
+    on a different threadpool thread than the endpoint that uses them.
+    """
+    client = getattr(_thread_services, "odoo_client", None)
+    if client is None:
+        client = OdooClient(_setup_logging())
+        if not client.connect():
+            raise HTTPException(status_code=500, detail="Failed to connect to Odoo")
+        _thread_services.odoo_client = client
+    return client
+
+
 def get_workflow() -> PerplexityWorkflow:
-    config = _setup_logging()
-    return PerplexityWorkflow(config)
+    return _thread_service("workflow", lambda: PerplexityWorkflow(_setup_logging()))
+
+
+@lru_cache(maxsize=1)
+def get_perplexity_client() -> PerplexityClient:
+    """PerplexityClient keeps no per-call state, so one instance is shared."""
+    return PerplexityClient(_setup_logging())
+
+
+# Shared by every endpoint that calls Perplexity, since the quota is per API key
+perplexity_rate_limiter = TokenBucket(
+    rate=Config.PERPLEXITY_REQUESTS_PER_SECOND,
+    capacity=Config.PERPLEXITY_BURST,
+)
 
 
 def get_followup_service() -> ApolloFollowUpService:
-    config = _setup_logging()
-    return ApolloFollowUpService(config=config)
+    return _thread_service("followup", lambda: ApolloFollowUpService(config=_setup_logging()))
 
 
 def get_post_contact_service() -> PostContactAutomationService:
-    config = _setup_logging()
-    return PostContactAutomationService(config=config)
+    return _thread_service("post_contact", lambda: PostContactAutomationService(config=_setup_logging()))
+
+
+@lru_cache(maxsize=1)
+def get_llm_client() -> LLMClient:
+    """The OpenAI client is thread-safe and pools connections, so one instance is shared."""
+    return LLMClient(_setup_logging())
+
+
+def get_proposal_followup_analyzer() -> ProposalFollowupAnalyzer:
+    return _thread_service(
+        "proposal_followup_analyzer",
+        lambda: ProposalFollowupAnalyzer(config=_setup_logging(), llm_client=get_llm_client()),
+    )
 
 
 def get_lost_lead_analyzer() -> LostLeadAnalyzer:
-    config = _setup_logging()
-    return LostLeadAnalyzer(config=config, supabase_client=supabase)
+    return _thread_service(
+        "lost_lead_analyzer",
+        lambda: LostLeadAnalyzer(config=_setup_logging(), supabase_client=supabase),
+    )
+
+
+# Exact-type fast path for _to_iso; subclasses (e.g. pandas.Timestamp) fall
+# through to the isinstance checks.
+_ISO_FORMATTERS: Dict[type, Callable[[Any], str]] = {
+    datetime: datetime.isoformat,
+    str: str,
+}
 
 
 def _to_iso(value: Any) -> Optional[str]:
+    formatter = _ISO_FORMATTERS.get(type(value))
+    if formatter is not None:
+        return formatter(value)
     if isinstance(value, datetime):
         return value.isoformat()
     if isinstance(value, str):
@@ -159,40 +267,71 @@ def _serialize_call_info(call: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     if not call:
         return {}
 
-    raw_call = call.get('raw_call') if isinstance(call.get('raw_call'), dict) else {}
+    raw_call = call.get('raw_call')
+    if not isinstance(raw_call, dict):
+        raw_call = {}
 
-    def _first(*keys: str) -> Optional[Any]:
-        for key in keys:
-            if key in call and call[key]:
-                return call[key]
-            if key in raw_call and raw_call[key]:
-                return raw_call[key]
-        return None
-
-    result: Dict[str, Any] = {
-        'id': _first('call_id', 'id'),
-        'disposition': _first('call_disposition', 'disposition'),
-        'duration_seconds': _first('duration_seconds', 'duration'),
-        'last_called_at': _to_iso(
-            _first('last_called_at_dt', 'last_called_at', 'called_at', 'updated_at')
-        ),
-        'notes': _first('notes', 'note'),
-    }
-    return {key: value for key, value in result.items() if value is not None}
+    # Lookups are spelled out per field (call first, then raw_call, for each key
+    # in priority order) since this runs once per post-contact action.
+    result: Dict[str, Any] = {}
+    value = (
+        call.get('call_id') or raw_call.get('call_id')
+        or call.get('id') or raw_call.get('id')
+    )
+    if value:
+        result['id'] = value
+    value = (
+        call.get('call_disposition') or raw_call.get('call_disposition')
+        or call.get('disposition') or raw_call.get('disposition')
+    )
+    if value:
+        result['disposition'] = value
+    value = (
+        call.get('duration_seconds') or raw_call.get('duration_seconds')
+        or call.get('duration') or raw_call.get('duration')
+    )
+    if value:
+        result['duration_seconds'] = value
+    value = (
+        call.get('last_called_at_dt') or raw_call.get('last_called_at_dt')
+        or call.get('last_called_at') or raw_call.get('last_called_at')
+        or call.get('called_at') or raw_call.get('called_at')
+        or call.get('updated_at') or raw_call.get('updated_at')
+    )
+    if value:
+        value = _to_iso(value)
+        if value is not None:
+            result['last_called_at'] = value
+    value = call.get('notes') or raw_call.get('notes') or call.get('note') or raw_call.get('note')
+    if value:
+        result['notes'] = value
+    return result
 
 
 def _serialize_lead_info(lead: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     if not lead:
         return {}
-    result: Dict[str, Any] = {
-        'id': lead.get('id'),
-        'name': lead.get('name') or lead.get('contact_name'),
-        'company': lead.get('partner_name') or lead.get('Company Name') or lead.get('company'),
-        'stage_name': lead.get('stage_name'),
-        'salesperson': lead.get('salesperson_name') or lead.get('Salesperson'),
-        'phone': lead.get('phone') or lead.get('mobile'),
-    }
-    return {key: value for key, value in result.items() if value is not None}
+    get = lead.get
+    result: Dict[str, Any] = {}
+    value = get('id')
+    if value is not None:
+        result['id'] = value
+    value = get('name') or get('contact_name')
+    if value is not None:
+        result['name'] = value
+    value = get('partner_name') or get('Company Name') or get('company')
+    if value is not None:
+        result['company'] = value
+    value = get('stage_name')
+    if value is not None:
+        result['stage_name'] = value
+    value = get('salesperson_name') or get('Salesperson')
+    if value is not None:
+        result['salesperson'] = value
+    value = get('phone') or get('mobile')
+    if value is not None:
+        result['phone'] = value
+    return result
 
 
 class LeadPreview(BaseModel):
@@ -287,6 +426,7 @@ class PushApprovedRequest(BaseModel):
     approved_leads: List[Dict[str, Any]]
     send_emails: Optional[bool] = False
     email_data: Optional[Dict[int, Dict[str, str]]] = None  # lead_id -> {subject, body}
+    update_odoo: bool = True  # False: only send emails for leads already pushed
 
 
 class PushApprovedResponse(BaseModel):
@@ -425,15 +565,13 @@ class LostLeadAnalysisResponse(BaseModel):
 
 
 @app.get("/health")
-def health() -> dict:
+async def health() -> dict:
     return {"status": "ok"}
 
 
 @app.get("/test-type")
-def test_type() -> dict:
+async def test_type() -> dict:
     """Test endpoint to debug type field issue."""
-    from pydantic import BaseModel
-    from typing import Optional
 
     class TestModel(BaseModel):
         id: int
@@ -442,22 +580,42 @@ def test_type() -> dict:
 
     obj = TestModel(id=1, record_type="test_record", type="test_type")
     return {
-        "object": obj.dict(),
-        "pydantic_version": __import__("pydantic").VERSION
+        "object": obj.model_dump(),
+        "pydantic_version": PYDANTIC_VERSION
     }
 
 
+# Seconds the unenriched-lead prompt is reused across the /perplexity endpoints
+ENRICHMENT_PROMPT_TTL_SECONDS = 30
+_enrichment_prompt_cache = TTLCache(maxsize=1, ttl=ENRICHMENT_PROMPT_TTL_SECONDS)
+
+
+def _get_enrichment_prompt(workflow: PerplexityWorkflow) -> Tuple[str, List[Dict[str, Any]]]:
+    """Return (prompt, unenriched leads), reusing a recent Odoo fetch if available."""
+    cached = _enrichment_prompt_cache.get("unenriched")
+    if cached is None:
+        cached = workflow.generate_enrichment_prompt()
+        _enrichment_prompt_cache.set("unenriched", cached)
+    return cached
+
+
+def _invalidate_enrichment_prompt() -> None:
+    """Drop the cached unenriched leads after Odoo lead data has been written."""
+    _enrichment_prompt_cache.clear()
+
+
 @app.post("/perplexity/generate", response_model=GenerateResponse)
 def generate_prompt() -> GenerateResponse:
     workflow = get_workflow()
 
-    prompt, leads = workflow.generate_enrichment_prompt()
+    prompt, leads = _get_enrichment_prompt(workflow)
 
     if not leads:
         return GenerateResponse(prompt="", lead_count=0, leads=[])
 
+    # Leads come straight from our own Odoo query, so skip per-field validation
     previews = [
-        LeadPreview(
+        LeadPreview.model_construct(
             id=lead.get("id"),
             full_name=lead.get("Full Name") or lead.get("name"),
             company_name=lead.get("Company Name") or lead.get("partner_name"),
@@ -477,7 +635,7 @@ def smart_analysis() -> SmartAnalysisResponse:
     workflow = get_workflow()
 
     # Get all unenriched leads
-    _, leads = workflow.generate_enrichment_prompt()
+    _, leads = _get_enrichment_prompt(workflow)
     if not leads:
         return SmartAnalysisResponse(
             total_leads=0,
@@ -543,7 +701,7 @@ def smart_analysis() -> SmartAnalysisResponse:
 def parse_results(payload: ParseRequest) -> ParseResponse:
     workflow = get_workflow()
 
-    _, original_leads = workflow.generate_enrichment_prompt()
+    _, original_leads = _get_enrichment_prompt(workflow)
     if not original_leads:
         raise HTTPException(status_code=409, detail="No leads available to reconcile the results against")
 
@@ -557,6 +715,7 @@ def parse_results(payload: ParseRequest) -> ParseResponse:
 
     if payload.update:
         outcome = workflow.update_leads_in_odoo(enriched)
+        _invalidate_enrichment_prompt()
         if not outcome.get("success", False):
             raise HTTPException(status_code=500, detail=outcome.get("error", "Unknown error"))
         updated = outcome.get("updated", 0)
@@ -576,7 +735,7 @@ def parse_preview(payload: ParsePreviewRequest) -> ParsePreviewResponse:
     """Parse Perplexity output and return preview without pushing to Odoo"""
     workflow = get_workflow()
 
-    _, original_leads = workflow.generate_enrichment_prompt()
+    _, original_leads = _get_enrichment_prompt(workflow)
     if not original_leads:
         raise HTTPException(status_code=409, detail="No leads available to reconcile the results against")
 
@@ -584,11 +743,13 @@ def parse_preview(payload: ParsePreviewRequest) -> ParsePreviewResponse:
     if not enriched:
         raise HTTPException(status_code=422, detail="Unable to parse Perplexity response")
 
+    # Index original leads once to show current vs suggested
+    originals_by_id = {l.get('id'): l for l in original_leads if l.get('id') is not None}
+
     # Build results for preview
     results = []
     for enriched_lead in enriched:
-        # Find original lead to show current vs suggested
-        original = next((l for l in original_leads if l.get('id') == enriched_lead.get('id')), {})
+        original = originals_by_id.get(enriched_lead.get('id'), {})
 
         results.append(EnrichedLeadResult(
             lead_id=enriched_lead.get('id', 0),
@@ -607,9 +768,8 @@ def parse_preview(payload: ParsePreviewRequest) -> ParsePreviewResponse:
 def enrich_single_lead(payload: EnrichSingleLeadRequest) -> EnrichSingleLeadResponse:
     """Enrich a single lead using Perplexity API"""
     try:
-        config = Config()
-        workflow = PerplexityWorkflow(config)
-        perplexity_client = PerplexityClient(config)
+        workflow = get_workflow()
+        perplexity_client = get_perplexity_client()
 
         # Connect to Odoo and get the lead
         if not workflow.odoo.connect():
@@ -620,16 +780,9 @@ def enrich_single_lead(payload: EnrichSingleLeadRequest) -> EnrichSingleLeadResp
             )
 
         # Fetch the specific lead by ID
-        lead_data = workflow.odoo._call_kw(
-            'crm.lead', 'read',
-            [[payload.lead_id]],
-            {'fields': [
-                'id', 'name', 'partner_name', 'email_from', 'phone', 'mobile',
-                'function', 'contact_name', 'x_studio_linkedin_profile'
-            ]}
-        )
+        lead = _fetch_leads_for_enrichment(workflow.odoo, [payload.lead_id]).get(payload.lead_id)
 
-        if not lead_data:
+        if not lead:
             return EnrichSingleLeadResponse(
                 success=False,
                 lead_id=payload.lead_id,
@@ -637,22 +790,14 @@ def enrich_single_lead(payload: EnrichSingleLeadRequest) -> EnrichSingleLeadResp
             )
 
         # Convert to the format expected by the workflow
-        lead = lead_data[0]
-        formatted_lead = {
-            'id': lead.get('id'),
-            'Full Name': lead.get('name') or lead.get('contact_name') or '',
-            'Company Name': lead.get('partner_name') or '',
-            'email': lead.get('email_from') or '',
-            'Phone': lead.get('phone') or '',
-            'Mobile': lead.get('mobile') or '',
-            'Job Role': lead.get('function') or '',
-        }
+        formatted_lead, _ = _format_lead(lead)
 
         # Generate prompt for this single lead
         prompt = workflow.generate_single_lead_prompt(formatted_lead)
         logger.info(f"Generated enrichment prompt for lead {payload.lead_id}")
 
         # Call Perplexity API
+        perplexity_rate_limiter.acquire_blocking()
         perplexity_response = perplexity_client.enrich_lead(formatted_lead, prompt)
 
         if not perplexity_response:
@@ -690,19 +835,126 @@ def enrich_single_lead(payload: EnrichSingleLeadRequest) -> EnrichSingleLeadResp
         )
 
 
+# crm.lead fields needed to build both the enrichment input and the review data
+ENRICHMENT_LEAD_FIELDS = (
+    'id', 'name', 'partner_name', 'email_from', 'phone', 'mobile',
+    'function', 'contact_name', 'x_studio_linkedin_profile',
+    'website', 'city', 'country_id', 'x_studio_quality',
+)
+
+
+def _fetch_leads_for_enrichment(odoo: OdooClient, lead_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Read all requested leads in one Odoo round-trip, keyed by lead id."""
+    rows = odoo._call_kw(
+        'crm.lead', 'read',
+        [list(lead_ids)],
+        {'fields': list(ENRICHMENT_LEAD_FIELDS)}
+    )
+    return {row['id']: row for row in rows or []}
+
+
+def _format_lead(lead: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Convert an Odoo crm.lead row into (enrichment input, current data).
+
+    The current data is the enrichment input plus the fields shown for review.
+    """
+    formatted = {
+        'id': lead.get('id'),
+        'Full Name': lead.get('name') or lead.get('contact_name') or '',
+        'Company Name': lead.get('partner_name') or '',
+        'email': lead.get('email_from') or '',
+        'Phone': lead.get('phone') or '',
+        'Mobile': lead.get('mobile') or '',
+        'Job Role': lead.get('function') or '',
+    }
+    country = lead.get('country_id')
+    current = {
+        **formatted,
+        'LinkedIn Link': lead.get('x_studio_linkedin_profile') or '',
+        'website': lead.get('website') or '',
+        'City': lead.get('city') or '',
+        'Country': country[1] if country else '',
+        'Quality (Out of 5)': lead.get('x_studio_quality') or '',
+    }
+    return formatted, current
+
+
+def _trusted_response(model: BaseModel) -> ORJSONResponse:
+    """Serialize a model built with model_construct.
+
+    Returning a Response directly skips FastAPI's response_model re-validation,
+    which would otherwise redo the work model_construct avoided.
+    """
+    return ORJSONResponse(model.model_dump())
+
+
+# (epoch second, ISO string) of the last timestamp formatted by _iso_now
+_iso_now_cache: Tuple[int, str] = (0, "")
+
+
+def _iso_now() -> str:
+    """Current UTC time as ISO-8601 with a Z suffix, formatted at most once per second."""
+    global _iso_now_cache
+    second = int(time.time())
+    cached_second, cached = _iso_now_cache
+    if second != cached_second:
+        cached = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        _iso_now_cache = (second, cached)
+    return cached
+
+
+# Clients must always revalidate (marking a thread complete or saving a report has to
+# show up on the next poll), but an unchanged payload comes back as an empty 304.
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+
+def _conditional_response(
+    request: Request,
+    response: Response,
+    cache_control: str = CONDITIONAL_CACHE_CONTROL,
+) -> Response:
+    """Tag a rendered response with an ETag, answering 304 if the client already has it."""
+    etag = f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
+
+def _sse(event: Any) -> bytes:
+    """Encode one server-sent event frame."""
+    # StreamingResponse sends bytes as-is, so skip the decode/re-encode round trip
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+def _dump_perplexity_response(perplexity_response: str) -> None:
+    """Write a raw Perplexity response to the temp dir for debugging."""
+    path = os.path.join(tempfile.gettempdir(), "perplexity_raw_response.txt")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(perplexity_response)
+    logger.info(f"Perplexity raw response saved to {path} ({len(perplexity_response)} chars)")
+
+
 @app.post("/perplexity/enrich-batch", response_model=EnrichBatchResponse)
-def enrich_batch_leads(payload: EnrichBatchRequest) -> EnrichBatchResponse:
+async def enrich_batch_leads(payload: EnrichBatchRequest) -> EnrichBatchResponse:
     """Enrich multiple leads using Perplexity API in ONE batch call - returns comparison data for review"""
     results = []
     successful = 0
     failed = 0
 
-    config = Config()
+    # The Odoo proxy is used from worker threads, so each request gets its own
+    # workflow; config and the Perplexity client are shared.
+    config = _setup_logging()
     workflow = PerplexityWorkflow(config)
-    perplexity_client = PerplexityClient(config)
+    perplexity_client = get_perplexity_client()
 
     # Connect to Odoo
-    if not workflow.odoo.connect():
+    if not await asyncio.to_thread(workflow.odoo.connect):
         return EnrichBatchResponse(
             total=len(payload.lead_ids),
             successful=0,
@@ -719,49 +971,18 @@ def enrich_batch_leads(payload: EnrichBatchRequest) -> EnrichBatchResponse:
 
     try:
         # Fetch ALL leads from Odoo
-        all_leads_data = workflow.odoo._call_kw(
-            'crm.lead', 'read',
-            [payload.lead_ids],
-            {'fields': [
-                'id', 'name', 'partner_name', 'email_from', 'phone', 'mobile',
-                'function', 'contact_name', 'x_studio_linkedin_profile',
-                'website', 'city', 'country_id', 'x_studio_quality'
-            ]}
+        leads_by_id = await asyncio.to_thread(
+            _fetch_leads_for_enrichment, workflow.odoo, payload.lead_ids
         )
 
         # Build map of current data and formatted leads
         current_data_map = {}
         formatted_leads = []
 
-        for lead in all_leads_data:
-            lead_id = lead.get('id')
-
-            # Store current data
-            current_data_map[lead_id] = {
-                'id': lead_id,
-                'Full Name': lead.get('name') or lead.get('contact_name') or '',
-                'Company Name': lead.get('partner_name') or '',
-                'email': lead.get('email_from') or '',
-                'Phone': lead.get('phone') or '',
-                'Mobile': lead.get('mobile') or '',
-                'Job Role': lead.get('function') or '',
-                'LinkedIn Link': lead.get('x_studio_linkedin_profile') or '',
-                'website': lead.get('website') or '',
-                'City': lead.get('city') or '',
-                'Country': lead.get('country_id')[1] if lead.get('country_id') else '',
-                'Quality (Out of 5)': lead.get('x_studio_quality') or '',
-            }
-
-            # Format for enrichment
-            formatted_leads.append({
-                'id': lead_id,
-                'Full Name': lead.get('name') or lead.get('contact_name') or '',
-                'Company Name': lead.get('partner_name') or '',
-                'email': lead.get('email_from') or '',
-                'Phone': lead.get('phone') or '',
-                'Mobile': lead.get('mobile') or '',
-                'Job Role': lead.get('function') or '',
-            })
+        for lead_id, lead in leads_by_id.items():
+            formatted, current = _format_lead(lead)
+            formatted_leads.append(formatted)
+            current_data_map[lead_id] = current
 
         # Generate ONE batch prompt for ALL leads
         logger.info(f"Generating batch prompt for {len(formatted_leads)} leads")
@@ -769,13 +990,12 @@ def enrich_batch_leads(payload: EnrichBatchRequest) -> EnrichBatchResponse:
 
         # Call Perplexity ONCE with all leads
         logger.info(f"Calling Perplexity API with batch of {len(formatted_leads)} leads")
-        perplexity_response = perplexity_client.search(batch_prompt, max_tokens=8000)
+        await perplexity_rate_limiter.acquire()
+        perplexity_response = await asyncio.to_thread(perplexity_client.search, batch_prompt, max_tokens=8000)
 
-        # DEBUG: Save full raw response
-        if perplexity_response:
-            with open('c:/Users/Geeks/Desktop/Programming_Files/Leads/perplexity_raw_response.txt', 'w', encoding='utf-8') as f:
-                f.write(perplexity_response)
-            logger.info(f"Perplexity raw response saved to perplexity_raw_response.txt ({len(perplexity_response)} chars)")
+        # DEBUG: Save full raw response (opt-in via PERPLEXITY_DEBUG_DUMP)
+        if perplexity_response and config.PERPLEXITY_DEBUG_DUMP:
+            await asyncio.to_thread(_dump_perplexity_response, perplexity_response)
 
         if not perplexity_response:
             # All leads failed
@@ -795,14 +1015,18 @@ def enrich_batch_leads(payload: EnrichBatchRequest) -> EnrichBatchResponse:
 
         # Parse batch response (this works reliably!)
         logger.info(f"Parsing batch response ({len(perplexity_response)} characters)")
-        enriched_leads = workflow.parse_perplexity_results(perplexity_response, formatted_leads)
+        enriched_leads = await asyncio.to_thread(
+            workflow.parse_perplexity_results, perplexity_response, formatted_leads
+        )
 
         # Match enriched leads back to lead_ids
         enriched_map = {lead.get('id'): lead for lead in enriched_leads}
 
+        # Results are built from data produced above, so skip re-validating
+        # the nested lead dicts.
         for lead_id in payload.lead_ids:
             if lead_id in enriched_map:
-                results.append(EnrichedLeadResult(
+                results.append(EnrichedLeadResult.model_construct(
                     lead_id=lead_id,
                     success=True,
                     current_data=current_data_map.get(lead_id),
@@ -810,7 +1034,7 @@ def enrich_batch_leads(payload: EnrichBatchRequest) -> EnrichBatchResponse:
                 ))
                 successful += 1
             else:
-                results.append(EnrichedLeadResult(
+                results.append(EnrichedLeadResult.model_construct(
                     lead_id=lead_id,
                     success=False,
                     current_data=current_data_map.get(lead_id),
@@ -839,136 +1063,311 @@ def enrich_batch_leads(payload: EnrichBatchRequest) -> EnrichBatchResponse:
     )
 
 
+# Number of Perplexity requests in flight at once for /perplexity/enrich-batch-stream
+ENRICH_STREAM_CONCURRENCY = max(1, Config.PERPLEXITY_STREAM_CONCURRENCY)
+# Leads folded into one Perplexity prompt by each enrich-batch-stream worker
+ENRICH_STREAM_BATCH_SIZE = 5
+
+
 @app.post("/perplexity/enrich-batch-stream")
 async def enrich_batch_stream(payload: EnrichBatchRequest):
-    """Enrich leads individually with streaming progress updates"""
+    """Enrich leads in small batches with streaming progress updates.
+
+    ENRICH_STREAM_CONCURRENCY workers each take up to ENRICH_STREAM_BATCH_SIZE
+    queued leads, enrich them with one Perplexity call, and stream per-lead
+    events as soon as that batch is parsed. The final frame lists results in
+    request order.
+    """
 
     async def event_generator():
-        config = Config()
-        workflow = PerplexityWorkflow(config)
-        perplexity_client = PerplexityClient(config)
+        workflow = PerplexityWorkflow(_setup_logging())
+        perplexity_client = get_perplexity_client()
 
         # Connect to Odoo
-        if not workflow.odoo.connect():
-            yield f"data: {json.dumps({'type': 'error', 'message': 'Failed to connect to Odoo'})}\n\n"
+        if not await asyncio.to_thread(workflow.odoo.connect):
+            yield _sse({'type': 'error', 'message': 'Failed to connect to Odoo'})
             return
 
-        results = []
+        # EnrichedLeadResult-shaped dicts by request index, ready for the final frame
+        serialized_results: Dict[int, Dict[str, Any]] = {}
         successful = 0
         failed = 0
-
-        try:
-            # Fetch ALL leads from Odoo first
-            all_leads_data = workflow.odoo._call_kw(
-                'crm.lead', 'read',
-                [payload.lead_ids],
-                {'fields': [
-                    'id', 'name', 'partner_name', 'email_from', 'phone', 'mobile',
-                    'function', 'contact_name', 'x_studio_linkedin_profile',
-                    'website', 'city', 'country_id', 'x_studio_quality'
-                ]}
-            )
-
-            # Create a map for easy lookup
-            leads_map = {lead['id']: lead for lead in all_leads_data}
-
-            # Enrich each lead individually
-            for i, lead_id in enumerate(payload.lead_ids):
-                lead = leads_map.get(lead_id)
-                if not lead:
-                    yield f"data: {json.dumps({'type': 'error', 'lead_id': lead_id, 'message': f'Lead {lead_id} not found'})}\n\n"
-                    failed += 1
-                    continue
-
+        started = 0
+        total = len(payload.lead_ids)
+
+        pending: asyncio.Queue = asyncio.Queue()
+        events: asyncio.Queue = asyncio.Queue()
+        # Parsing checks Odoo for duplicates; the xmlrpc proxy must not be used
+        # from several threads at once.
+        odoo_lock = asyncio.Lock()
+
+        async def enrich_batch(batch: List[Tuple[int, int, Dict[str, Any]]]) -> None:
+            nonlocal successful, failed, started
+
+            formatted_leads = []
+            current_data_map: Dict[int, Dict[str, Any]] = {}
+            for _, lead_id, lead in batch:
+                started += 1
                 lead_name = lead.get('name') or lead.get('contact_name') or f'Lead {lead_id}'
-
                 # Send progress update
-                yield f"data: {json.dumps({'type': 'progress', 'lead_id': lead_id, 'lead_name': lead_name, 'current': i + 1, 'total': len(payload.lead_ids)})}\n\n"
-
-                # Format lead for enrichment
-                formatted_lead = {
-                    'id': lead_id,
-                    'Full Name': lead.get('name') or lead.get('contact_name') or '',
-                    'Company Name': lead.get('partner_name') or '',
-                    'email': lead.get('email_from') or '',
-                    'Phone': lead.get('phone') or '',
-                    'Mobile': lead.get('mobile') or '',
-                    'Job Role': lead.get('function') or '',
-                }
+                await events.put({'type': 'progress', 'lead_id': lead_id, 'lead_name': lead_name, 'current': started, 'total': total})
+                formatted, current_data_map[lead_id] = _format_lead(lead)
+                formatted_leads.append(formatted)
 
-                try:
-                    # Generate prompt for single lead
-                    prompt = workflow.generate_single_lead_prompt(formatted_lead)
-
-                    # Call Perplexity
-                    perplexity_response = perplexity_client.search(prompt)
-
-                    # Parse response
-                    enriched_data = workflow.parse_single_lead_response(perplexity_response, formatted_lead)
-
-                    # Store current data
-                    current_data = {
-                        'id': lead_id,
-                        'Full Name': lead.get('name') or lead.get('contact_name') or '',
-                        'Company Name': lead.get('partner_name') or '',
-                        'email': lead.get('email_from') or '',
-                        'Phone': lead.get('phone') or '',
-                        'Mobile': lead.get('mobile') or '',
-                        'Job Role': lead.get('function') or '',
-                        'LinkedIn Link': lead.get('x_studio_linkedin_profile') or '',
-                        'website': lead.get('website') or '',
-                        'City': lead.get('city') or '',
-                        'Country': lead.get('country_id')[1] if lead.get('country_id') else '',
-                        'Quality (Out of 5)': lead.get('x_studio_quality') or '',
-                    }
+            try:
+                # One Perplexity call for the whole batch
+                prompt = workflow._build_comprehensive_prompt(formatted_leads)
+                await perplexity_rate_limiter.acquire()
+                perplexity_response = await asyncio.to_thread(
+                    perplexity_client.search, prompt, max_tokens=8000 if len(batch) > 1 else 4096
+                )
+                if not perplexity_response:
+                    raise RuntimeError("Perplexity API returned no response")
 
-                    result = EnrichedLeadResult(
-                        lead_id=lead_id,
-                        success=True,
-                        current_data=current_data,
-                        suggested_data=enriched_data
+                async with odoo_lock:
+                    enriched_leads = await asyncio.to_thread(
+                        workflow.parse_perplexity_results, perplexity_response, formatted_leads
                     )
-                    results.append(result)
-                    successful += 1
+                enriched_map = {enriched.get('id'): enriched for enriched in enriched_leads}
+                batch_error = None
+            except Exception as e:
+                logger.error(f"Error enriching leads {[lead_id for _, lead_id, _ in batch]}: {e}")
+                enriched_map = {}
+                batch_error = str(e)
 
+            for index, lead_id, lead in batch:
+                lead_name = lead.get('name') or lead.get('contact_name') or f'Lead {lead_id}'
+                enriched_data = enriched_map.get(lead_id)
+                if enriched_data is not None:
+                    serialized_results[index] = {
+                        'lead_id': lead_id,
+                        'success': True,
+                        'current_data': current_data_map[lead_id],
+                        'suggested_data': enriched_data,
+                        'error': None,
+                    }
+                    successful += 1
                     # Send success update
-                    yield f"data: {json.dumps({'type': 'success', 'lead_id': lead_id, 'lead_name': lead_name})}\n\n"
+                    await events.put({'type': 'success', 'lead_id': lead_id, 'lead_name': lead_name})
+                else:
+                    message = batch_error or "Lead not found in Perplexity response"
+                    serialized_results[index] = {
+                        'lead_id': lead_id,
+                        'success': False,
+                        'current_data': current_data_map[lead_id],
+                        'suggested_data': None,
+                        'error': message,
+                    }
+                    failed += 1
+                    # Send error update
+                    await events.put({'type': 'error', 'lead_id': lead_id, 'lead_name': lead_name, 'message': message})
 
-                except Exception as e:
-                    logger.error(f"Error enriching lead {lead_id}: {e}")
-                    result = EnrichedLeadResult(
-                        lead_id=lead_id,
-                        success=False,
-                        error=str(e)
-                    )
-                    results.append(result)
+        async def worker() -> None:
+            try:
+                while True:
+                    try:
+                        batch = [pending.get_nowait()]
+                    except asyncio.QueueEmpty:
+                        return
+                    while len(batch) < ENRICH_STREAM_BATCH_SIZE and not pending.empty():
+                        batch.append(pending.get_nowait())
+
+                    await enrich_batch(batch)
+            finally:
+                # Sentinel: this worker is finished
+                await events.put(None)
+
+        tasks: List[asyncio.Task] = []
+        try:
+            # Fetch ALL leads from Odoo first
+            leads_map = await asyncio.to_thread(
+                _fetch_leads_for_enrichment, workflow.odoo, payload.lead_ids
+            )
+
+            for index, lead_id in enumerate(payload.lead_ids):
+                lead = leads_map.get(lead_id)
+                if not lead:
+                    yield _sse({'type': 'error', 'lead_id': lead_id, 'message': f'Lead {lead_id} not found'})
                     failed += 1
+                    continue
+                pending.put_nowait((index, lead_id, lead))
 
-                    # Send error update
-                    yield f"data: {json.dumps({'type': 'error', 'lead_id': lead_id, 'lead_name': lead_name, 'message': str(e)})}\n\n"
+            batches = -(-pending.qsize() // ENRICH_STREAM_BATCH_SIZE)
+            tasks = [
+                asyncio.create_task(worker())
+                for _ in range(min(ENRICH_STREAM_CONCURRENCY, batches))
+            ]
 
-                # Small delay to avoid rate limiting
-                await asyncio.sleep(1)
+            # Stream events as the batches progress
+            remaining = len(tasks)
+            while remaining:
+                event = await events.get()
+                if event is None:
+                    remaining -= 1
+                    continue
+                yield _sse(event)
 
             # Send final completion
             final_response = {
                 'type': 'complete',
-                'total': len(payload.lead_ids),
+                'total': total,
                 'successful': successful,
                 'failed': failed,
-                'results': [r.dict() for r in results]
+                'results': [serialized_results[index] for index in sorted(serialized_results)]
             }
-            yield f"data: {json.dumps(final_response)}\n\n"
+            yield _sse(final_response)
 
         except Exception as e:
             logger.error(f"Error in batch enrichment stream: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield _sse({'type': 'error', 'message': str(e)})
+        finally:
+            # Client disconnected or an error occurred: stop outstanding work
+            for task in tasks:
+                task.cancel()
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
+# Outreach emails sent in parallel by /perplexity/push-approved
+OUTREACH_EMAIL_CONCURRENCY = 10
+
+
+COMPANY_PROFILE_PDF = os.path.join(os.path.dirname(__file__), '..', 'knowledge_base', 'PrezLab Company Profile.pdf')
+
+OutreachEmail = Tuple[Any, str, str, str]  # (lead_id, lead_email, subject, html_body)
+
+
+DEFAULT_OUTREACH_SUBJECT = 'Thank you for your interest in PrezLab'
+# Plain-text draft -> HTML line breaks (CRLF collapses to a single <br>)
+_NEWLINES_TO_BR = str.maketrans({'\n': '<br>', '\r': ''})
+
+
+def _collect_outreach(payload: PushApprovedRequest) -> List[OutreachEmail]:
+    """Pair each approved lead with its drafted email, skipping leads without one."""
+    get_draft = (payload.email_data or {}).get
+    # Pull (id, email) out of the lead dicts in one pass; the loop below only
+    # touches these pairs and the draft lookup
+    targets = [(lead.get('id'), lead.get('email')) for lead in payload.approved_leads]
+    logger.info("📋 %d email drafts for %d approved leads", len(payload.email_data or {}), len(targets))
+
+    outgoing: List[OutreachEmail] = []
+    for lead_id, lead_email in targets:
+        if not lead_id or not lead_email:
+            logger.warning(f"⚠️ Skipping lead: missing ID or email (id={lead_id}, email={lead_email})")
+            continue
+
+        # email_data is declared Dict[int, ...], so Pydantic has already turned the
+        # JSON object's string keys into ints; only the lead id needs normalising
+        try:
+            email_draft = get_draft(int(lead_id))
+        except (TypeError, ValueError):
+            email_draft = None
+        if not email_draft:
+            logger.warning(f"⚠️ No email draft found for lead {lead_id}")
+            continue
+
+        subject = email_draft.get('subject', DEFAULT_OUTREACH_SUBJECT)
+        body = email_draft.get('body', '').translate(_NEWLINES_TO_BR)
+        outgoing.append((lead_id, lead_email, subject, body))
+    return outgoing
+
+
+def _user_outlook_tokens(outlook: OutlookClient, user_identifier: str) -> Optional[Dict[str, Any]]:
+    """get_user_auth_tokens through the shared token store, which caches the email_tokens row."""
+    return outlook.get_user_auth_tokens(user_identifier, token_store=get_token_store())
+
+
+def _drop_expired_outlook_tokens(error: Exception, user_identifier: str) -> None:
+    """OutlookClient raises RuntimeError("Access token expired...") when Graph answers 401."""
+    if isinstance(error, RuntimeError) and "expired" in str(error):
+        # Make the next request reload the token row instead of reusing the rejected token
+        get_token_store().invalidate(user_identifier)
+
+
+def _outreach_access_token(outlook: OutlookClient, current_user: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Return (access_token, error) for the current user's Outlook account."""
+    # Use current user's ID as identifier (matches the auth flow)
+    user_identifier = str(current_user["id"])
+    try:
+        logger.info(f"🔐 Retrieving Outlook tokens for user {user_identifier}")
+        tokens = _user_outlook_tokens(outlook, user_identifier)
+    except Exception as auth_error:
+        logger.error(f"Error getting Outlook authentication: {auth_error}")
+        return None, f"Authentication error: {str(auth_error)}"
+
+    if not tokens or 'access_token' not in tokens:
+        logger.error(f"❌ No Outlook tokens found for user {user_identifier}")
+        return None, f"No authenticated Outlook account found for {current_user['email']}. Please authenticate your Outlook account in Settings."
+
+    logger.info(f"✅ Got Outlook access token for user {user_identifier}")
+    return tokens['access_token'], None
+
+
+def _send_outreach(
+    outlook: OutlookClient,
+    access_token: str,
+    item: OutreachEmail,
+    sender_email: str,
+    user_identifier: str,
+) -> Optional[str]:
+    """Send one outreach email; returns an error message on failure."""
+    lead_id, lead_email, subject, body = item
+    logger.info(f"📤 Sending email to {lead_email} (Lead {lead_id}): '{subject}'")
+    try:
+        success = outlook.send_email_with_attachment(
+            access_token=access_token,
+            to=[lead_email],
+            subject=subject,
+            body=body,
+            attachment_path=COMPANY_PROFILE_PDF,
+            attachment_name='PrezLab Company Profile.pdf',
+            cc=['engage@prezlab.com']
+        )
+    except Exception as email_error:
+        _drop_expired_outlook_tokens(email_error, user_identifier)
+        logger.error(f"Error sending email to {lead_email}: {email_error}")
+        return f"Error sending to {lead_email}: {str(email_error)}"
+
+    if not success:
+        return f"Failed to send email to {lead_email}"
+    logger.info(f"Email sent successfully to {lead_email} from {sender_email}")
+    return None
+
+
+def _send_outreach_emails(
+    payload: PushApprovedRequest,
+    current_user: Dict[str, Any],
+) -> Tuple[int, List[str]]:
+    """Send the drafted outreach email for each approved lead; returns (sent, errors)."""
+    outlook = get_outlook_client()
+    access_token, auth_error = _outreach_access_token(outlook, current_user)
+    if auth_error:
+        return 0, [auth_error]
+
+    emails_sent = 0
+    email_errors: List[str] = []
+    outgoing = _collect_outreach(payload)
+
+    # Graph sendMail calls are independent; overlap their round-trips
+    if outgoing:
+        with ThreadPoolExecutor(max_workers=min(OUTREACH_EMAIL_CONCURRENCY, len(outgoing))) as pool:
+            sends = pool.map(
+                lambda item: _send_outreach(
+                    outlook, access_token, item, current_user['email'], str(current_user["id"])
+                ),
+                outgoing
+            )
+            for send_error in sends:
+                if send_error:
+                    email_errors.append(send_error)
+                else:
+                    emails_sent += 1
+
+    return emails_sent, email_errors
+
+
 @app.post("/perplexity/push-approved", response_model=PushApprovedResponse)
-def push_approved_enrichments(
+async def push_approved_enrichments(
     payload: PushApprovedRequest,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ) -> PushApprovedResponse:
@@ -987,8 +1386,12 @@ def push_approved_enrichments(
     logger.info(f"Pushing {len(payload.approved_leads)} approved leads to Odoo")
 
     try:
-        outcome = workflow.update_leads_in_odoo(payload.approved_leads)
-        print("[EMAIL-DEBUG-0-PRINT] Odoo update completed - checking outcome")
+        if payload.update_odoo:
+            outcome = await asyncio.to_thread(workflow.update_leads_in_odoo, payload.approved_leads)
+            _invalidate_enrichment_prompt()
+        else:
+            # Email-only resend: the leads were written on an earlier push
+            outcome = {"success": True, "updated": len(payload.approved_leads), "failed": 0, "errors": []}
         logger.info(f"[EMAIL-DEBUG-0] Odoo update returned. success={outcome.get('success')}, type={type(outcome)}")
 
         if not outcome.get("success", False):
@@ -1013,71 +1416,9 @@ def push_approved_enrichments(
         logger.info(f"[EMAIL-DEBUG-3] Email sending request: send_emails={payload.send_emails}, email_data_count={len(payload.email_data) if payload.email_data else 0}")
 
         if payload.send_emails and payload.email_data:
-            from modules.outlook_client import OutlookClient
-            import os
-
-            outlook = OutlookClient()
-            pdf_path = os.path.join(os.path.dirname(__file__), '..', 'knowledge_base', 'PrezLab Company Profile.pdf')
-
-            # Get authenticated user's Outlook access token
-            # Use current user's ID as identifier (matches the auth flow)
-            user_identifier = str(current_user["id"])
-
-            try:
-                logger.info(f"🔐 Retrieving Outlook tokens for user {user_identifier}")
-                tokens = outlook.get_user_auth_tokens(user_identifier)
-                if not tokens or 'access_token' not in tokens:
-                    logger.error(f"❌ No Outlook tokens found for user {user_identifier}")
-                    email_errors.append(f"No authenticated Outlook account found for {current_user['email']}. Please authenticate your Outlook account in Settings.")
-                else:
-                    access_token = tokens['access_token']
-                    logger.info(f"✅ Got Outlook access token for user {user_identifier}, preparing to send {len(payload.approved_leads)} emails")
-                    logger.info(f"📋 Email data keys: {list(payload.email_data.keys())}")
-                    logger.info(f"📋 Lead IDs to process: {[lead.get('id') for lead in payload.approved_leads]}")
-
-                    for lead in payload.approved_leads:
-                        lead_id = lead.get('id')
-                        lead_email = lead.get('email')
-
-                        if not lead_id or not lead_email:
-                            logger.warning(f"⚠️ Skipping lead: missing ID or email (id={lead_id}, email={lead_email})")
-                            continue
-
-                        # Try both integer and string keys (frontend sends as int)
-                        email_draft = payload.email_data.get(lead_id) or payload.email_data.get(str(lead_id))
-                        if not email_draft:
-                            logger.warning(f"⚠️ No email draft found for lead {lead_id} (tried both int and str keys)")
-                            continue
-
-                        subject = email_draft.get('subject', 'Thank you for your interest in PrezLab')
-                        body = email_draft.get('body', '').replace('\n', '<br>')
-
-                        logger.info(f"📤 Sending email to {lead_email} (Lead {lead_id}): '{subject}'")
-
-                        try:
-                            success = outlook.send_email_with_attachment(
-                                access_token=access_token,
-                                to=[lead_email],
-                                subject=subject,
-                                body=body,
-                                attachment_path=pdf_path,
-                                attachment_name='PrezLab Company Profile.pdf',
-                                cc=['engage@prezlab.com']
-                            )
-
-                            if success:
-                                emails_sent += 1
-                                logger.info(f"Email sent successfully to {lead_email} from {current_user['email']}")
-                            else:
-                                email_errors.append(f"Failed to send email to {lead_email}")
-
-                        except Exception as email_error:
-                            logger.error(f"Error sending email to {lead_email}: {email_error}")
-                            email_errors.append(f"Error sending to {lead_email}: {str(email_error)}")
-
-            except Exception as auth_error:
-                logger.error(f"Error getting Outlook authentication: {auth_error}")
-                email_errors.append(f"Authentication error: {str(auth_error)}")
+            emails_sent, email_errors = await asyncio.to_thread(
+                _send_outreach_emails, payload, current_user
+            )
 
         return PushApprovedResponse(
             total=len(payload.approved_leads),
@@ -1098,11 +1439,110 @@ def push_approved_enrichments(
         )
 
 
+
+# Approved leads written to Odoo per progress event by /perplexity/push-approved-stream
+PUSH_STREAM_CHUNK_SIZE = 10
+
+
+@app.post("/perplexity/push-approved-stream")
+async def push_approved_stream(
+    payload: PushApprovedRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Push approved enrichments with streaming progress updates.
+
+    Leads are written to Odoo in chunks of PUSH_STREAM_CHUNK_SIZE with a 'pushed'
+    event per chunk; each outreach email then reports 'emailed' or 'error' as it
+    completes. The final 'complete' frame carries the PushApprovedResponse fields.
+    """
+
+    async def event_generator():
+        workflow = PerplexityWorkflow(_setup_logging())
+        leads = payload.approved_leads
+        updated = 0
+        failed = 0
+        errors: List[str] = []
+        emails_sent = 0
+        email_errors: List[str] = []
+
+        try:
+            if payload.update_odoo:
+                for start in range(0, len(leads), PUSH_STREAM_CHUNK_SIZE):
+                    chunk = leads[start:start + PUSH_STREAM_CHUNK_SIZE]
+                    outcome = await asyncio.to_thread(workflow.update_leads_in_odoo, chunk)
+                    if outcome.get("success", False):
+                        chunk_updated = outcome.get("updated", 0)
+                        chunk_failed = outcome.get("failed", 0)
+                        chunk_errors = outcome.get("errors", [])
+                    else:
+                        chunk_updated = 0
+                        chunk_failed = len(chunk)
+                        chunk_errors = [outcome.get("error", "Unknown error")]
+                    updated += chunk_updated
+                    failed += chunk_failed
+                    errors.extend(chunk_errors)
+                    yield _sse({
+                        'type': 'pushed',
+                        'lead_ids': [lead.get('id') for lead in chunk],
+                        'updated': chunk_updated,
+                        'failed': chunk_failed,
+                        'errors': chunk_errors,
+                    })
+                if leads:
+                    _invalidate_enrichment_prompt()
+            else:
+                # Email-only resend: the leads were written on an earlier push
+                updated = len(leads)
+
+            if payload.send_emails and payload.email_data:
+                outlook = get_outlook_client()
+                access_token, auth_error = await asyncio.to_thread(_outreach_access_token, outlook, current_user)
+                if auth_error:
+                    email_errors.append(auth_error)
+                    yield _sse({'type': 'error', 'message': auth_error})
+                else:
+                    semaphore = asyncio.Semaphore(OUTREACH_EMAIL_CONCURRENCY)
+
+                    async def send(item: OutreachEmail) -> Tuple[OutreachEmail, Optional[str]]:
+                        async with semaphore:
+                            return item, await asyncio.to_thread(
+                                _send_outreach, outlook, access_token, item,
+                                current_user['email'], str(current_user["id"])
+                            )
+
+                    for next_done in asyncio.as_completed([send(item) for item in _collect_outreach(payload)]):
+                        (lead_id, lead_email, _, _), send_error = await next_done
+                        if send_error:
+                            email_errors.append(send_error)
+                            yield _sse({'type': 'error', 'lead_id': lead_id, 'email': lead_email, 'message': send_error})
+                        else:
+                            emails_sent += 1
+                            yield _sse({'type': 'emailed', 'lead_id': lead_id, 'email': lead_email})
+
+            yield _sse({
+                'type': 'complete',
+                'total': len(leads),
+                'successful': updated,
+                'failed': failed,
+                'errors': errors,
+                'emails_sent': emails_sent,
+                'email_errors': email_errors,
+            })
+
+        except Exception as e:
+            logger.error(f"Error in push-approved stream: {e}")
+            yield _sse({'type': 'error', 'message': str(e)})
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
 @app.get("/apollo/followups", response_model=FollowUpResponse)
-def get_apollo_followups(limit: int = 10, lookback_hours: Optional[int] = None) -> FollowUpResponse:
-    service = get_followup_service()
+async def get_apollo_followups(limit: int = 10, lookback_hours: Optional[int] = None) -> FollowUpResponse:
+    # Resolve the per-thread service inside the worker thread that uses it
+    def prepare() -> List[Dict[str, Any]]:
+        return get_followup_service().prepare_followups(limit=limit, lookback_hours=lookback_hours)
+
     try:
-        followups = service.prepare_followups(limit=limit, lookback_hours=lookback_hours)
+        followups = await asyncio.to_thread(prepare)
     except Exception as exc:
         logger.error("Failed to prepare Apollo follow-ups: %s", exc)
         raise HTTPException(status_code=500, detail="Unable to generate Apollo follow-ups")
@@ -1207,19 +1647,39 @@ def execute_post_contact_action(payload: ExecuteActionRequest) -> ExecuteActionR
     return ExecuteActionResponse(success=True, message=message)
 
 
+# LostLeadSummary attribute -> Odoo field for the optional string columns
+_LOST_LEAD_STR_FIELDS = (
+    ("record_type", "type"),
+    ("partner_name", "partner_name"),
+    ("contact_name", "contact_name"),
+    ("stage", "stage_id"),
+    ("lost_reason", "lost_reason"),
+    ("lost_reason_category", "lost_reason_id"),
+    ("salesperson", "user_id"),
+    ("email", "email_from"),
+    ("phone", "phone"),
+    ("mobile", "mobile"),
+    ("create_date", "create_date"),
+    ("last_update", "write_date"),
+)
+
+
 @app.get("/lost-leads", response_model=LostLeadListResponse, response_model_exclude_none=False)
-def list_lost_leads(
+async def list_lost_leads(
     limit: int = 20,
     salesperson: Optional[str] = None,
     type_filter: Optional[str] = None
-) -> LostLeadListResponse:
-    analyzer = get_lost_lead_analyzer()
-    try:
-        leads = analyzer.list_lost_leads(
+) -> ORJSONResponse:
+    # Resolve the per-thread analyzer inside the worker thread that uses it
+    def fetch() -> List[Dict[str, Any]]:
+        return get_lost_lead_analyzer().list_lost_leads(
             limit=limit,
             salesperson_name=salesperson,
             type_filter=type_filter
         )
+
+    try:
+        leads = await asyncio.to_thread(fetch)
     except Exception as exc:
         logger.error("Failed to fetch lost leads: %s", exc)
         raise HTTPException(status_code=500, detail="Unable to fetch lost leads")
@@ -1231,39 +1691,25 @@ def list_lost_leads(
         except Exception:
             logger.debug("Skipping lead with missing id: %s", lead)
             continue
-        def _str_or_none(value):
-            """Convert Odoo False values to None for optional string fields."""
-            return value if isinstance(value, str) else None
-
-        lead_type = _str_or_none(lead.get("type"))
-        logger.debug(f"Lead {lead_id}: raw type={lead.get('type')}, processed type={lead_type}")
+        # Odoo sends False for empty fields; only keep real strings
+        fields = {
+            attr: value if isinstance(value, str) else None
+            for attr, value in ((attr, lead.get(key)) for attr, key in _LOST_LEAD_STR_FIELDS)
+        }
+        logger.debug("Lead %s: raw type=%s, processed type=%s", lead_id, lead.get("type"), fields["record_type"])
 
+        # Values come straight from Odoo in the declared types, so skip validation
         items.append(
-            LostLeadSummary(
+            LostLeadSummary.model_construct(
                 id=lead_id,
                 name=lead.get("name") or "Untitled Opportunity",
-                record_type=lead_type,
-                partner_name=_str_or_none(lead.get("partner_name")),
-                contact_name=_str_or_none(lead.get("contact_name")),
-                stage=_str_or_none(lead.get("stage_id")),
-                lost_reason=_str_or_none(lead.get("lost_reason")),
-                lost_reason_category=_str_or_none(lead.get("lost_reason_id")),
                 probability=lead.get("probability"),
                 expected_revenue=lead.get("expected_revenue"),
-                salesperson=_str_or_none(lead.get("user_id")),
-                email=_str_or_none(lead.get("email_from")),
-                phone=_str_or_none(lead.get("phone")),
-                mobile=_str_or_none(lead.get("mobile")),
-                create_date=_str_or_none(lead.get("create_date")),
-                last_update=_str_or_none(lead.get("write_date")),
+                **fields,
             )
         )
 
-    response = LostLeadListResponse(count=len(items), items=items)
-    if items:
-        logger.info(f"First item record_type field: {items[0].record_type}")
-        logger.info(f"First item dict: {items[0].dict()}")
-    return response
+    return _trusted_response(LostLeadListResponse.model_construct(count=len(items), items=items))
 
 
 @app.post("/lost-leads/{lead_id}/analysis", response_model=LostLeadAnalysisResponse)
@@ -1330,6 +1776,13 @@ class SavedAnalysisResponse(BaseModel):
     message: Optional[str] = None
 
 
+class SavedAnalysesBulkResponse(BaseModel):
+    """Response with the ids of analyses saved in one request."""
+    success: bool
+    analysis_ids: List[str] = []
+    message: Optional[str] = None
+
+
 class SharedAnalysisItem(BaseModel):
     """A shared analysis item for re-engagement."""
     id: str
@@ -1342,6 +1795,23 @@ class SharedAnalysisItem(BaseModel):
     company_name: Optional[str] = None
 
 
+def _shared_analysis_row(user_id: int, lead_id: int, payload: SaveAnalysisRequest) -> Dict[str, Any]:
+    """analysis_cache row for a lost lead analysis shared with all users."""
+    # Prepare analysis data with lead info
+    analysis_to_save = {
+        **payload.analysis_data,
+        "lead_id": lead_id,
+        "title": payload.title or f"Lost Lead #{lead_id} Analysis"
+    }
+    return {
+        "user_id": user_id,
+        "analysis_type": "lost_leads",
+        "parameters": {"lead_id": lead_id},
+        "results": analysis_to_save,
+        "is_shared": True  # Make visible to all users
+    }
+
+
 @app.post("/lost-leads/{lead_id}/save-analysis", response_model=SavedAnalysisResponse)
 def save_lost_lead_analysis(
     lead_id: int,
@@ -1353,21 +1823,9 @@ def save_lost_lead_analysis(
         raise HTTPException(status_code=503, detail="Database not available")
 
     try:
-        # Prepare analysis data with lead info
-        analysis_to_save = {
-            **payload.analysis_data,
-            "lead_id": lead_id,
-            "title": payload.title or f"Lost Lead #{lead_id} Analysis"
-        }
-
-        # Insert into analysis_cache with is_shared=true
-        result = supabase.client.table("analysis_cache").insert({
-            "user_id": current_user["id"],
-            "analysis_type": "lost_leads",
-            "parameters": {"lead_id": lead_id},
-            "results": analysis_to_save,
-            "is_shared": True  # Make visible to all users
-        }).execute()
+        result = supabase.client.table("analysis_cache").insert(
+            _shared_analysis_row(current_user["id"], lead_id, payload)
+        ).execute()
 
         if result.data:
             return SavedAnalysisResponse(
@@ -1383,31 +1841,66 @@ def save_lost_lead_analysis(
         raise HTTPException(status_code=500, detail=str(exc))
 
 
-@app.get("/re-engage/analyses")
+@app.post("/lost-leads/save-analyses-bulk", response_model=SavedAnalysesBulkResponse)
+def save_lost_lead_analyses_bulk(
+    payload: List[SaveAnalysisRequest],
+    current_user: Dict[str, Any] = Depends(get_current_user)
+) -> SavedAnalysesBulkResponse:
+    """Save several lost lead analyses in one insert (one transaction)."""
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not available")
+    if not payload:
+        return SavedAnalysesBulkResponse(success=True, message="No analyses to save")
+
+    try:
+        rows = [_shared_analysis_row(current_user["id"], item.lead_id, item) for item in payload]
+        result = supabase.client.table("analysis_cache").insert(rows).execute()
+
+        if result.data:
+            return SavedAnalysesBulkResponse(
+                success=True,
+                analysis_ids=[row["id"] for row in result.data],
+                message=f"Saved and shared {len(result.data)} analyses"
+            )
+        else:
+            raise HTTPException(status_code=500, detail="Failed to save analyses")
+
+    except Exception as exc:
+        logger.error(f"Error saving {len(payload)} analyses: {exc}")
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+# Newest shared analyses returned by /re-engage/analyses
+SHARED_ANALYSES_LIMIT = 200
+
+
+@app.get("/re-engage/analyses", response_model=List[SharedAnalysisItem])
 def get_shared_analyses(
     current_user: Dict[str, Any] = Depends(get_current_user)
-) -> List[SharedAnalysisItem]:
+) -> ORJSONResponse:
     """Get all shared lost lead analyses for re-engagement."""
     if not supabase:
         raise HTTPException(status_code=503, detail="Database not available")
 
     try:
-        # Fetch all shared lost_leads analyses
+        # Fetch the newest shared lost_leads analyses; results is returned whole
+        # because the re-engage pages render the full analysis
         result = supabase.client.table("analysis_cache")\
-            .select("*")\
+            .select("id,user_id,created_at,results")\
             .eq("analysis_type", "lost_leads")\
             .eq("is_shared", True)\
             .order("created_at", desc=True)\
+            .limit(SHARED_ANALYSES_LIMIT)\
             .execute()
 
         if not result.data:
-            return []
+            return ORJSONResponse([])
 
-        # Map to response format
+        # Map to response format; rows come from our own inserts, so skip validation
         shared_analyses = []
         for item in result.data:
             results_data = item.get("results", {})
-            shared_analyses.append(SharedAnalysisItem(
+            shared_analyses.append(SharedAnalysisItem.model_construct(
                 id=item["id"],
                 lead_id=results_data.get("lead_id", 0),
                 title=results_data.get("title", f"Analysis #{item['id'][:8]}"),
@@ -1418,7 +1911,7 @@ def get_shared_analyses(
                 company_name=results_data.get("lead", {}).get("partner_name")
             ))
 
-        return shared_analyses
+        return ORJSONResponse([item.model_dump() for item in shared_analyses])
 
     except Exception as exc:
         logger.error(f"Error fetching shared analyses: {exc}")
@@ -1497,30 +1990,35 @@ class LostLeadDraftRequest(BaseModel):
     analysis_data: Dict[str, Any]
 
 
-@app.post("/lost-leads/generate-draft")
-def generate_lost_lead_draft(request: LostLeadDraftRequest):
-    """Generate a re-engagement email draft for a lost lead."""
-    try:
-        from modules.llm_client import LLMClient
+# Generated lost-lead drafts keyed by a hash of the prompt, so retries of the
+# same lead + analysis reuse the previous completion instead of calling the LLM
+LOST_LEAD_DRAFT_CACHE_TTL_SECONDS = 600
+lost_lead_draft_cache = TTLCache(maxsize=256, ttl=LOST_LEAD_DRAFT_CACHE_TTL_SECONDS)
+
 
-        llm = LLMClient()
+def _draft_cache_key(messages: List[Dict[str, str]]) -> str:
+    # The prompt is built only from the fields that matter, so it is the fingerprint
+    return hashlib.blake2b(orjson.dumps(messages), digest_size=16).hexdigest()
 
-        # Extract lead information
-        lead = request.lead_data
-        analysis = request.analysis_data.get("analysis", {})
 
-        # Build context for email generation
-        lead_name = lead.get("partner_name") or lead.get("contact_name") or lead.get("name", "there")
-        company_name = lead.get("partner_name", "")
-        lost_reason = lead.get("lost_reason", "Unknown reason")
+def _lost_lead_draft_messages(request: LostLeadDraftRequest) -> List[Dict[str, str]]:
+    """Chat messages asking the LLM for a JSON {subject, body} re-engagement draft."""
+    # Extract lead information
+    lead = request.lead_data
+    analysis = request.analysis_data.get("analysis", {})
+
+    # Build context for email generation
+    lead_name = lead.get("partner_name") or lead.get("contact_name") or lead.get("name", "there")
+    company_name = lead.get("partner_name", "")
+    lost_reason = lead.get("lost_reason", "Unknown reason")
 
-        # Get analysis insights
-        key_insights = analysis.get("key_insights", [])
-        recommended_actions = analysis.get("recommended_actions", [])
-        summary = analysis.get("summary", "")
+    # Get analysis insights
+    key_insights = analysis.get("key_insights", [])
+    recommended_actions = analysis.get("recommended_actions", [])
+    summary = analysis.get("summary", "")
 
-        # Create prompt for draft generation
-        prompt = f"""You are a sales professional crafting a re-engagement email to a lost lead.
+    # Create prompt for draft generation
+    prompt = f"""You are a sales professional crafting a re-engagement email to a lost lead.
 
 Lead Information:
 - Name: {lead_name}
@@ -1553,21 +2051,34 @@ Return your response in JSON format with two fields:
 
 The subject line should be attention-grabbing but professional, specific to this lead's situation, and NOT generic."""
 
-        messages = [
-            {"role": "system", "content": "You are an expert sales professional writing re-engagement emails to lost leads. Always respond in valid JSON format."},
-            {"role": "user", "content": prompt}
-        ]
+    return [
+        {"role": "system", "content": "You are an expert sales professional writing re-engagement emails to lost leads. Always respond in valid JSON format."},
+        {"role": "user", "content": prompt}
+    ]
 
-        result = llm.chat_completion_json(messages, max_tokens=6000, temperature=0.7)
+
+@app.post("/lost-leads/generate-draft")
+def generate_lost_lead_draft(request: LostLeadDraftRequest):
+    """Generate a re-engagement email draft for a lost lead."""
+    try:
+        messages = _lost_lead_draft_messages(request)
+        cache_key = _draft_cache_key(messages)
+        cached = lost_lead_draft_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = get_llm_client().chat_completion_json(messages, max_tokens=6000, temperature=0.7)
 
         if not result or not result.get("body") or not result.get("subject"):
             raise HTTPException(status_code=500, detail="Failed to generate draft email")
 
-        return {
+        response = {
             "success": True,
             "draft": result["body"],
             "subject_suggestion": result["subject"]
         }
+        lost_lead_draft_cache.set(cache_key, response)
+        return response
 
     except HTTPException:
         raise
@@ -1576,6 +2087,56 @@ The subject line should be attention-grabbing but professional, specific to this
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/lost-leads/generate-draft-stream")
+async def generate_lost_lead_draft_stream(request: LostLeadDraftRequest):
+    """Stream a re-engagement draft as it is generated.
+
+    Emits 'delta' events with raw completion text, then a 'complete' event
+    carrying the same draft/subject_suggestion fields as /lost-leads/generate-draft.
+    """
+    messages = _lost_lead_draft_messages(request)
+    cache_key = _draft_cache_key(messages)
+
+    # Sync generator: StreamingResponse iterates it in the threadpool, so the
+    # blocking OpenAI stream never holds up the event loop.
+    def event_generator():
+        cached = lost_lead_draft_cache.get(cache_key)
+        if cached is not None:
+            yield _sse({'type': 'complete', **cached})
+            return
+
+        try:
+            llm = get_llm_client()
+            parts: List[str] = []
+            for delta in llm.stream_chat_completion(
+                messages,
+                max_tokens=6000,
+                temperature=0.7,
+                response_format={"type": "json_object"},
+            ):
+                parts.append(delta)
+                yield _sse({'type': 'delta', 'delta': delta})
+
+            result = orjson.loads("".join(parts))
+            if not isinstance(result, dict) or not result.get("body") or not result.get("subject"):
+                yield _sse({'type': 'error', 'message': 'Failed to generate draft email'})
+                return
+
+            response = {
+                'success': True,
+                'draft': result["body"],
+                'subject_suggestion': result["subject"]
+            }
+            lost_lead_draft_cache.set(cache_key, response)
+            yield _sse({'type': 'complete', **response})
+
+        except Exception as e:
+            logger.error(f"Error streaming lost lead draft: {e}")
+            yield _sse({'type': 'error', 'message': str(e)})
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
 class SendLostLeadEmailRequest(BaseModel):
     """Request to send re-engagement email for lost lead."""
     lead_id: int
@@ -1591,14 +2152,8 @@ def send_lost_lead_email(
 ):
     """Send a re-engagement email to a lost lead."""
     try:
-        from modules.outlook_client import OutlookClient
-        from modules.odoo_client import OdooClient
-
         # Get lead details from Odoo
-        config = Config()
-        odoo = OdooClient(config)
-        if not odoo.connect():
-            raise HTTPException(status_code=500, detail="Failed to connect to Odoo")
+        odoo = get_odoo_client()
 
         # Fetch the lead to get email
         lead = odoo._call_kw(
@@ -1615,9 +2170,9 @@ def send_lost_lead_email(
             raise HTTPException(status_code=400, detail="Lead has no email address")
 
         # Get Outlook tokens
-        outlook = OutlookClient()
+        outlook = get_outlook_client()
         user_identifier = str(current_user["id"])
-        tokens = outlook.get_user_auth_tokens(user_identifier)
+        tokens = _user_outlook_tokens(outlook, user_identifier)
 
         if not tokens or 'access_token' not in tokens:
             raise HTTPException(
@@ -1649,6 +2204,7 @@ def send_lost_lead_email(
     except HTTPException:
         raise
     except Exception as e:
+        _drop_expired_outlook_tokens(e, str(current_user["id"]))
         logger.error(f"Error sending re-engagement email: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1720,8 +2276,6 @@ def send_lost_leads_report_to_teams(
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """Send lost leads report to Teams as a formatted message."""
-    from modules.teams_messenger import TeamsMessenger
-
     try:
         # Get user tokens for Microsoft Graph API
         user_id = str(current_user.get("id"))
@@ -1897,6 +2451,14 @@ class ProposalFollowupSummary(BaseModel):
     last_updated: Optional[str] = None
 
 
+def _whole_days(value: Any) -> int:
+    """Read a days_waiting value as whole days; missing or unreadable values count as 0."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
 class ProposalFollowupThread(BaseModel):
     """Single email thread needing follow-up."""
     conversation_id: str
@@ -1910,6 +2472,16 @@ class ProposalFollowupThread(BaseModel):
     classification: Optional[Dict[str, Any]] = None  # AI classification: is_lead, confidence, category
     is_favorited: Optional[bool] = None
 
+    @field_validator("days_waiting", mode="before")
+    @classmethod
+    def _coerce_days_waiting(cls, value: Any) -> int:
+        """Normalize days_waiting to a whole number of days.
+
+        Only fresh analyzer output is validated here; cached and saved reports
+        are served as stored, so readers of those use _whole_days directly.
+        """
+        return _whole_days(value)
+
 
 class ProposalFollowupResponse(BaseModel):
     """Response containing all proposal follow-up data."""
@@ -1919,8 +2491,91 @@ class ProposalFollowupResponse(BaseModel):
     filtered: Optional[List[ProposalFollowupThread]] = []
 
 
+def _proposal_followups_from_cache(
+    cached_data: Dict[str, Any],
+    completed_thread_ids: set,
+    favorited_thread_ids: set,
+) -> ORJSONResponse:
+    """Rebuild a follow-ups response from cached results, applying current completed/favorited state.
+
+    Cached results are model dumps written by get_proposal_followups, so the
+    dicts already match ProposalFollowupResponse and are serialized as they are.
+    """
+    # Copy thread dicts: cached_data may be shared through the L1 cache
+    unanswered = [
+        {**thread, "is_favorited": thread.get("conversation_id") in favorited_thread_ids}
+        for thread in cached_data.get("unanswered", [])
+        if thread.get("conversation_id") not in completed_thread_ids
+    ]
+    pending_proposals = [
+        {**thread, "is_favorited": thread.get("conversation_id") in favorited_thread_ids}
+        for thread in cached_data.get("pending_proposals", [])
+        if thread.get("conversation_id") not in completed_thread_ids
+    ]
+
+    # Sort: favorited threads first, then by days_waiting descending
+    unanswered.sort(key=lambda x: (not x.get("is_favorited", False), -_whole_days(x.get("days_waiting"))))
+    pending_proposals.sort(key=lambda x: (not x.get("is_favorited", False), -_whole_days(x.get("days_waiting"))))
+
+    # Update summary counts
+    summary = cached_data["summary"].copy()
+    summary["unanswered_count"] = len(unanswered)
+    summary["pending_proposals_count"] = len(pending_proposals)
+    summary["total_count"] = len(unanswered) + len(pending_proposals)
+
+    return ORJSONResponse({
+        "summary": summary,
+        "unanswered": unanswered,
+        "pending_proposals": pending_proposals,
+        "filtered": cached_data.get("filtered") or [],
+    })
+
+
+def _load_proposal_followups(
+    cache_key: Tuple[Any, ...], user_id: int, cache_params: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Read the Supabase cache entry for cache_key into L1 and return it."""
+    with _proposal_followups_locks_guard:
+        lock = _proposal_followups_locks.get(cache_key)
+        if lock is None:
+            lock = threading.Lock()
+            _proposal_followups_locks.set(cache_key, lock)
+    with lock:
+        # Another request may have loaded it while we waited
+        entry = proposal_followups_cache.get(cache_key)
+        if entry is not None and time.monotonic() - entry[0] < PROPOSAL_FOLLOWUPS_L1_FRESH_SECONDS:
+            return entry[1]
+
+        try:
+            cached_data = supabase.get_cached_analysis(
+                user_id=user_id,
+                analysis_type="proposal_followups",
+                parameters=cache_params
+            )
+        except Exception as e:
+            logger.warning(f"Failed to get from Supabase cache: {e}")
+            return None
+
+        if cached_data:
+            proposal_followups_cache.set(cache_key, (time.monotonic(), cached_data))
+        else:
+            # Expired or removed in Supabase: stop serving the L1 copy
+            proposal_followups_cache.pop(cache_key)
+        return cached_data
+
+
+def _refresh_proposal_followups(
+    cache_key: Tuple[Any, ...], user_id: int, cache_params: Dict[str, Any]
+) -> None:
+    try:
+        _load_proposal_followups(cache_key, user_id, cache_params)
+    finally:
+        _proposal_followups_refreshing.discard(cache_key)
+
+
 @app.get("/proposal-followups", response_model=ProposalFollowupResponse)
 def get_proposal_followups(
+    request: Request,
     days_back: int = 3,
     no_response_days: int = 3,
     engage_email: str = "automated.response@prezlab.com",
@@ -1932,6 +2587,7 @@ def get_proposal_followups(
     Get proposal follow-up analysis from engage inbox.
 
     Args:
+        request: Incoming request (for If-None-Match)
         days_back: Number of days to look back for emails (default: 3)
         no_response_days: Days threshold for "no response" (default: 3)
         engage_email: Email of the engage monitoring account
@@ -1942,7 +2598,6 @@ def get_proposal_followups(
     Returns:
         Summary and categorized threads needing follow-up with last_updated timestamp
     """
-    global proposal_followups_cache
     user_id = current_user.get("id")
 
     # Determine cache duration based on days_back
@@ -1980,80 +2635,40 @@ def get_proposal_followups(
     except Exception as e:
         logger.warning(f"Failed to get favorited followups: {e}")
 
-    # Try to get from Supabase cache first (if available)
-    if not force_refresh and supabase.is_connected():
-        try:
-            cached_data = supabase.get_cached_analysis(
-                user_id=user_id,
-                analysis_type="proposal_followups",
-                parameters=cache_params
-            )
-
+    cache_key = (user_id, days_back, no_response_days, engage_email)
+
+    if not force_refresh:
+        # L1 first, then the shared Supabase cache (if available)
+        cached_data = None
+        entry = proposal_followups_cache.get(cache_key)
+        if entry is not None:
+            stored_at, cached_data = entry
+            logger.info(f"Returning cached proposal follow-ups from memory for user {user_id}")
+            if (
+                supabase.is_connected()
+                and time.monotonic() - stored_at >= PROPOSAL_FOLLOWUPS_L1_FRESH_SECONDS
+                and cache_key not in _proposal_followups_refreshing
+            ):
+                _proposal_followups_refreshing.add(cache_key)
+                threading.Thread(
+                    target=_refresh_proposal_followups,
+                    args=(cache_key, user_id, cache_params),
+                    daemon=True,
+                ).start()
+        elif supabase.is_connected():
+            cached_data = _load_proposal_followups(cache_key, user_id, cache_params)
             if cached_data:
                 logger.info(f"✅ Returning cached proposal follow-ups from Supabase for user {user_id}")
-                # Filter out completed threads and add favorited flag
-                unanswered = []
-                for thread in cached_data.get("unanswered", []):
-                    if thread.get("conversation_id") not in completed_thread_ids:
-                        thread["is_favorited"] = thread.get("conversation_id") in favorited_thread_ids
-                        unanswered.append(thread)
-
-                pending_proposals = []
-                for thread in cached_data.get("pending_proposals", []):
-                    if thread.get("conversation_id") not in completed_thread_ids:
-                        thread["is_favorited"] = thread.get("conversation_id") in favorited_thread_ids
-                        pending_proposals.append(thread)
-
-                # Sort: favorited threads first, then by days_waiting descending
-                unanswered.sort(key=lambda x: (not x.get("is_favorited", False), -x.get("days_waiting", 0)))
-                pending_proposals.sort(key=lambda x: (not x.get("is_favorited", False), -x.get("days_waiting", 0)))
-
-                # Update summary counts
-                summary = cached_data["summary"].copy()
-                summary["unanswered_count"] = len(unanswered)
-                summary["pending_proposals_count"] = len(pending_proposals)
-                summary["total_count"] = len(unanswered) + len(pending_proposals)
-
-                # Convert cached data back to response model
-                response = ProposalFollowupResponse(
-                    summary=ProposalFollowupSummary(**summary),
-                    unanswered=[ProposalFollowupThread(**thread) for thread in unanswered],
-                    pending_proposals=[ProposalFollowupThread(**thread) for thread in pending_proposals],
-                    filtered=[ProposalFollowupThread(**thread) for thread in cached_data.get("filtered", [])]
-                )
-                return response
-        except Exception as e:
-            logger.warning(f"Failed to get from Supabase cache: {e}. Falling back to in-memory cache.")
-
-    # Fallback to in-memory cache if Supabase unavailable
-    if not force_refresh and proposal_followups_cache["data"] and proposal_followups_cache["params"] == cache_params:
-        logger.info("Returning cached proposal follow-ups analysis from memory")
-        cached_response = proposal_followups_cache["data"]
-        # Filter out completed threads and add favorited flag
-        cached_response.unanswered = [thread for thread in cached_response.unanswered
-                                     if thread.conversation_id not in completed_thread_ids]
-        for thread in cached_response.unanswered:
-            thread.is_favorited = thread.conversation_id in favorited_thread_ids
-
-        cached_response.pending_proposals = [thread for thread in cached_response.pending_proposals
-                                            if thread.conversation_id not in completed_thread_ids]
-        for thread in cached_response.pending_proposals:
-            thread.is_favorited = thread.conversation_id in favorited_thread_ids
-
-        # Sort: favorited first, then by days_waiting
-        cached_response.unanswered.sort(key=lambda x: (not x.is_favorited, -x.days_waiting))
-        cached_response.pending_proposals.sort(key=lambda x: (not x.is_favorited, -x.days_waiting))
 
-        # Update counts
-        cached_response.summary.unanswered_count = len(cached_response.unanswered)
-        cached_response.summary.pending_proposals_count = len(cached_response.pending_proposals)
-        cached_response.summary.total_count = len(cached_response.unanswered) + len(cached_response.pending_proposals)
-        cached_response.summary.last_updated = proposal_followups_cache["timestamp"]
-        return cached_response
+        if cached_data:
+            return _conditional_response(
+                request,
+                _proposal_followups_from_cache(cached_data, completed_thread_ids, favorited_thread_ids),
+            )
 
     try:
         logger.info(f"Running new proposal follow-ups analysis (days_back={days_back}, no_response_days={no_response_days})")
-        analyzer = ProposalFollowupAnalyzer()
+        analyzer = get_proposal_followup_analyzer()
         # Use SYSTEM_ prefix for system email tokens
         system_identifier = f"SYSTEM_{engage_email}"
         result = analyzer.get_proposal_followups(
@@ -2063,7 +2678,6 @@ def get_proposal_followups(
         )
 
         # Check for new activity in completed threads and reopen if needed
-        from datetime import datetime, timezone
         for thread in result["unanswered"] + result["pending_proposals"]:
             conv_id = thread.get("conversation_id")
 
@@ -2117,22 +2731,19 @@ def get_proposal_followups(
         result["summary"]["total_count"] = len(unanswered) + len(pending_proposals)
 
         # Create timestamp
-        timestamp = datetime.utcnow().isoformat() + "Z"
+        timestamp = _iso_now()
 
-        response = ProposalFollowupResponse(
+        # Fresh analyzer threads carry raw mail data, so these are validated to strip it
+        build_thread = ProposalFollowupThread.model_validate
+        response = ProposalFollowupResponse.model_construct(
             summary=ProposalFollowupSummary(**result["summary"], last_updated=timestamp),
-            unanswered=[ProposalFollowupThread(**thread) for thread in unanswered],
-            pending_proposals=[ProposalFollowupThread(**thread) for thread in pending_proposals],
-            filtered=[ProposalFollowupThread(**thread) for thread in result.get("filtered", [])]
+            unanswered=[build_thread(thread) for thread in unanswered],
+            pending_proposals=[build_thread(thread) for thread in pending_proposals],
+            filtered=[build_thread(thread) for thread in result.get("filtered", [])]
         )
 
-        # Convert response to dict for caching
-        response_dict = {
-            "summary": response.summary.dict(),
-            "unanswered": [thread.dict() for thread in response.unanswered],
-            "pending_proposals": [thread.dict() for thread in response.pending_proposals],
-            "filtered": [thread.dict() for thread in response.filtered]
-        }
+        # Convert response to dict for caching (one pydantic-core pass over the whole tree)
+        response_dict = response.model_dump()
 
         # Save to Supabase cache
         if supabase.is_connected():
@@ -2148,14 +2759,14 @@ def get_proposal_followups(
             except Exception as e:
                 logger.warning(f"Failed to save to Supabase cache: {e}")
 
-        # Also save to in-memory cache as fallback
-        proposal_followups_cache = {
-            "data": response,
-            "timestamp": timestamp,
-            "params": cache_params
-        }
+        # Keep in L1; without Supabase it must last as long as a Supabase entry would
+        proposal_followups_cache.set(
+            cache_key,
+            (time.monotonic(), response_dict),
+            ttl=None if supabase.is_connected() else cache_duration_days * 86400
+        )
 
-        return response
+        return _conditional_response(request, ORJSONResponse(response_dict))
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
     except Exception as e:
@@ -2163,8 +2774,25 @@ def get_proposal_followups(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Coalesces concurrent draft/analysis completions from the follow-up endpoints
+llm_coalescer = LLMRequestCoalescer(llm_factory=get_llm_client)
+
+
+async def _analyze_thread(thread_data: Dict[str, Any]) -> Dict[str, Any]:
+    """ProposalFollowupAnalyzer.analyze_thread_with_llm through the shared LLM request coalescer."""
+    try:
+        return await llm_coalescer.submit_json(
+            ProposalFollowupAnalyzer.thread_analysis_messages(thread_data),
+            max_tokens=THREAD_ANALYSIS_MAX_TOKENS,
+            temperature=THREAD_ANALYSIS_TEMPERATURE,
+        )
+    except Exception as e:
+        logger.error(f"Error analyzing thread with LLM: {e}")
+        return ProposalFollowupAnalyzer.failed_thread_analysis()
+
+
 @app.post("/proposal-followups/analyze-thread")
-def analyze_followup_thread(thread_data: Dict[str, Any]):
+async def analyze_followup_thread(thread_data: Dict[str, Any]):
     """
     Analyze a specific email thread and generate follow-up draft.
 
@@ -2175,9 +2803,7 @@ def analyze_followup_thread(thread_data: Dict[str, Any]):
         Analysis with summary, sentiment, urgency, and draft email
     """
     try:
-        analyzer = ProposalFollowupAnalyzer()
-        analysis = analyzer.analyze_thread_with_llm(thread_data)
-        return analysis
+        return await _analyze_thread(thread_data)
     except Exception as e:
         logger.error(f"Error analyzing thread: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -2208,6 +2834,16 @@ class GenerateReportRequest(BaseModel):
     engage_email: str = "automated.response@prezlab.com"
 
 
+# Report generation pages through months of mail and classifies every thread,
+# so it runs on a small dedicated pool and the client polls the job instead.
+REPORT_JOB_WORKERS = 2
+REPORT_JOB_TTL_SECONDS = 6 * 3600
+report_job_executor = ThreadPoolExecutor(max_workers=REPORT_JOB_WORKERS, thread_name_prefix="report-job")
+report_jobs = TTLCache(maxsize=64, ttl=REPORT_JOB_TTL_SECONDS)
+_active_report_jobs: Dict[Tuple[Any, ...], str] = {}
+_active_report_jobs_lock = threading.Lock()
+
+
 class MarkCompleteRequest(BaseModel):
     thread_id: str
     conversation_id: str
@@ -2221,7 +2857,7 @@ class GenerateDraftRequest(BaseModel):
 class RefineDraftRequest(BaseModel):
     current_draft: str
     edit_prompt: str
-    thread_data: Dict[str, Any]
+    thread_data: Dict[str, Any] = {}
 
 
 class SendFollowupEmailRequest(BaseModel):
@@ -2232,22 +2868,22 @@ class SendFollowupEmailRequest(BaseModel):
 
 
 @app.get("/proposal-followups/reports", response_model=SavedReportsResponse)
-def get_saved_reports(
+async def get_saved_reports(
+    request: Request,
     report_type: Optional[str] = None,
     current_user: Dict[str, Any] = Depends(get_current_user),
     db: SupabaseDatabase = Depends(get_supabase_database)
-):
+) -> Response:
     """Get all saved follow-up reports."""
     try:
-        reports = db.get_saved_reports(
+        reports = await asyncio.to_thread(
+            db.get_saved_reports,
             analysis_type="proposal_followups",
             report_type=report_type
         )
 
-        return SavedReportsResponse(
-            count=len(reports),
-            reports=[SavedReport(**report) for report in reports]
-        )
+        # Rows are already shaped like SavedReport; skip re-validating them.
+        return _conditional_response(request, ORJSONResponse({"count": len(reports), "reports": reports}))
     except Exception as e:
         logger.error(f"Error fetching saved reports: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2264,6 +2900,7 @@ def delete_saved_report(
         success = db.delete_report(report_id)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to delete report")
+        _invalidate_dashboard_cache()
 
         return {"success": True, "message": "Report deleted successfully"}
     except HTTPException:
@@ -2430,7 +3067,6 @@ def export_report_pdf(
         pdf_buffer.seek(0)
 
         # Save to temp file and return
-        import tempfile
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
             tmp_file.write(pdf_buffer.getvalue())
             tmp_path = tmp_file.name
@@ -2451,7 +3087,6 @@ def export_report_pdf(
 def generate_executive_summary(followups: List[Dict], report_type: str) -> str:
     """Generate an executive summary of the follow-ups using OpenAI."""
     try:
-        from openai import OpenAI
         client = OpenAI()
 
         # Prepare summary of followups for AI
@@ -2500,6 +3135,32 @@ Priority should be given to the urgent follow-ups to maintain engagement and mov
 The team should systematically work through these opportunities to maximize conversion rates."""
 
 
+def _format_recipient(recipient: Dict[str, Any]) -> Dict[str, str]:
+    address = recipient.get("emailAddress", {})
+    return {"name": address.get("name", ""), "email": address.get("address", "")}
+
+
+def _format_conversation_message(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape one Graph message for the conversation view."""
+    get = msg.get
+    from_data = get("from", {}).get("emailAddress", {})
+    return {
+        "id": get("id"),
+        "subject": get("subject", ""),
+        "from": {
+            "name": from_data.get("name", "Unknown"),
+            "email": from_data.get("address", "")
+        },
+        "to": [_format_recipient(r) for r in get("toRecipients", [])],
+        "cc": [_format_recipient(r) for r in get("ccRecipients", [])],
+        "receivedDateTime": get("receivedDateTime", ""),
+        "body": get("body", {}).get("content", ""),
+        "bodyPreview": get("bodyPreview", ""),
+        "hasAttachments": get("hasAttachments", False),
+        "webLink": get("webLink", "")
+    }
+
+
 @app.get("/outlook/conversation/{conversation_id}")
 def get_conversation_thread(
     conversation_id: str,
@@ -2511,7 +3172,7 @@ def get_conversation_thread(
         user_identifier = str(current_user["id"])
 
         # Get user's Outlook tokens
-        tokens = outlook.get_user_auth_tokens(user_identifier)
+        tokens = _user_outlook_tokens(outlook, user_identifier)
         if not tokens or 'access_token' not in tokens:
             raise HTTPException(
                 status_code=401,
@@ -2551,27 +3212,7 @@ def get_conversation_thread(
             }
 
         # Format messages for frontend
-        formatted_messages = []
-        for msg in messages:
-            from_data = msg.get("from", {}).get("emailAddress", {})
-            to_recipients = msg.get("toRecipients", [])
-            cc_recipients = msg.get("ccRecipients", [])
-
-            formatted_messages.append({
-                "id": msg.get("id"),
-                "subject": msg.get("subject", ""),
-                "from": {
-                    "name": from_data.get("name", "Unknown"),
-                    "email": from_data.get("address", "")
-                },
-                "to": [{"name": r.get("emailAddress", {}).get("name", ""), "email": r.get("emailAddress", {}).get("address", "")} for r in to_recipients],
-                "cc": [{"name": r.get("emailAddress", {}).get("name", ""), "email": r.get("emailAddress", {}).get("address", "")} for r in cc_recipients],
-                "receivedDateTime": msg.get("receivedDateTime", ""),
-                "body": msg.get("body", {}).get("content", ""),
-                "bodyPreview": msg.get("bodyPreview", ""),
-                "hasAttachments": msg.get("hasAttachments", False),
-                "webLink": msg.get("webLink", "")
-            })
+        formatted_messages = [_format_conversation_message(msg) for msg in messages]
 
         return {
             "conversation_id": conversation_id,
@@ -2582,80 +3223,76 @@ def get_conversation_thread(
     except HTTPException:
         raise
     except Exception as e:
+        _drop_expired_outlook_tokens(e, str(current_user["id"]))
         logger.error(f"Error fetching conversation thread: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/proposal-followups/reports/generate")
+def _run_report_job(job_id: str, job_key: Tuple[Any, ...], user_id: Any, request: GenerateReportRequest) -> None:
+    job = report_jobs.get(job_id) or {"job_id": job_id}
+    job["status"] = "running"
+    report_jobs.set(job_id, job)
+    try:
+        job.update(build_saved_report(
+            get_supabase_database(),
+            get_proposal_followup_analyzer(),
+            user_id,
+            request.report_type,
+            request.no_response_days,
+            request.engage_email,
+            on_saved=_invalidate_dashboard_cache,
+        ))
+        job["status"] = "completed"
+    except Exception as e:
+        logger.error(f"Error generating report (job {job_id}): {e}", exc_info=True)
+        job.update(status="failed", error=str(e))
+    finally:
+        job["finished_at"] = datetime.now(timezone.utc).isoformat()
+        # Re-set so the entry outlives the job by the full TTL
+        report_jobs.set(job_id, job)
+        with _active_report_jobs_lock:
+            if _active_report_jobs.get(job_key) == job_id:
+                del _active_report_jobs[job_key]
+
+
+@app.post("/proposal-followups/reports/generate", status_code=202)
 def generate_saved_report(
     request: GenerateReportRequest,
-    current_user: Dict[str, Any] = Depends(get_current_user),
-    db: SupabaseDatabase = Depends(get_supabase_database)
+    current_user: Dict[str, Any] = Depends(get_current_user)
 ):
-    """Generate a new follow-up report and save it."""
-    try:
-        user_id = current_user.get("id")
-        user_identifier = current_user.get("email")
-
-        # Determine days_back based on report type
-        if request.report_type == "complete":
-            days_back = 365  # Analyze all emails from the past year
-            report_period = datetime.now().strftime("%Y")
-        elif request.report_type == "90day":
-            days_back = 90
-            report_period = datetime.now().strftime("%Y-Q%q")
-        elif request.report_type == "monthly":
-            days_back = 30
-            report_period = datetime.now().strftime("%Y-%m")
-        else:  # weekly
-            days_back = 7
-            report_period = datetime.now().strftime("%Y-W%W")
-
-        # Generate the analysis
-        logger.info(f"Starting report generation for {request.report_type} (days_back={days_back})")
-        analyzer = ProposalFollowupAnalyzer()
-        # Use SYSTEM_ prefix for system email tokens
-        system_identifier = f"SYSTEM_{request.engage_email}"
-        result = analyzer.get_proposal_followups(
-            user_identifier=system_identifier,
-            days_back=days_back,
-            no_response_days=request.no_response_days
-        )
-        logger.info(f"Analysis completed. Found {result.get('summary', {}).get('total_count', 0)} follow-ups")
+    """Queue generation of a new follow-up report; poll the returned job for the result."""
+    job_key = (request.report_type, request.no_response_days, request.engage_email)
+    with _active_report_jobs_lock:
+        # An identical report is already being built; share its job
+        job_id = _active_report_jobs.get(job_key)
+        job = report_jobs.get(job_id) if job_id else None
+        if job is not None:
+            return {"job_id": job_id, "status": job["status"]}
+
+        job_id = uuid.uuid4().hex
+        report_jobs.set(job_id, {
+            "job_id": job_id,
+            "status": "pending",
+            "report_type": request.report_type,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+        _active_report_jobs[job_key] = job_id
 
-        # Save as shared report (but don't fail if save fails)
-        report_id = None
-        try:
-            logger.info(f"Attempting to save report to database for user {user_id}")
-            report_id = db.save_report(
-                user_id=user_id,
-                analysis_type="proposal_followups",
-                report_type=request.report_type,
-                report_period=report_period,
-                result=result,
-                parameters={
-                    "days_back": days_back,
-                    "no_response_days": request.no_response_days,
-                    "engage_email": request.engage_email
-                },
-                is_shared=True
-            )
-            logger.info(f"Report saved successfully with ID: {report_id}")
-        except Exception as save_error:
-            logger.warning(f"Failed to save report to cache (report still generated): {save_error}")
-            # Continue without saving - the report was still generated successfully
+    report_job_executor.submit(_run_report_job, job_id, job_key, current_user.get("id"), request)
+    logger.info(f"Queued {request.report_type} report generation as job {job_id}")
+    return {"job_id": job_id, "status": "pending"}
 
-        return {
-            "success": True,
-            "report_id": report_id,
-            "report_type": request.report_type,
-            "report_period": report_period,
-            "result": result  # Return the result directly so user gets it even if cache fails
-        }
 
-    except Exception as e:
-        logger.error(f"Error generating report: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+@app.get("/proposal-followups/reports/jobs/{job_id}")
+def get_report_job(
+    job_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Get the status of a report generation job, including the report once it completes."""
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
 
 
 @app.post("/proposal-followups/daily-digest/send")
@@ -2665,9 +3302,6 @@ def send_daily_digest(
 ):
     """Send daily digest to Teams based on most recent complete report."""
     try:
-        from modules.daily_digest_formatter import DailyDigestFormatter
-        from modules.teams_messenger import TeamsMessenger
-
         # Get Microsoft access token (with automatic refresh if expired)
         user_id = str(current_user.get("id"))
         user_email = current_user.get("email")
@@ -2744,9 +3378,6 @@ def send_individual_digests(
         member_emails: Optional list of specific email addresses to send to. If None, sends to all.
     """
     try:
-        from modules.daily_digest_formatter import DailyDigestFormatter
-        from modules.teams_messenger import TeamsMessenger
-
         # Get Microsoft access token (with automatic refresh if expired)
         user_id = str(current_user.get("id"))
         user_email = current_user.get("email")
@@ -2942,6 +3573,8 @@ def mark_followup_complete(
             logger.error(f"Error updating saved reports: {update_error}")
             # Don't fail the completion if report update fails
 
+        # The dashboard counts exclude completed threads
+        _invalidate_dashboard_cache()
         return {"success": True, "completion": result}
 
     except Exception as e:
@@ -3009,6 +3642,7 @@ def mark_followup_complete(
             except Exception as update_error:
                 logger.error(f"Error updating saved reports for duplicate completion: {update_error}")
 
+            _invalidate_dashboard_cache()
             return {
                 "success": True,
                 "completion": {"already_completed": True},
@@ -3113,7 +3747,7 @@ def send_report_to_teams(
 
         # Get user's Microsoft access token (for Teams messaging)
         # Teams messages will be sent from the authenticated user
-        token_store = EmailTokenStore()
+        token_store = get_token_store()
         user_id = str(current_user.get("id"))  # Use user ID, not email
         user_email = current_user.get("email")
 
@@ -3222,7 +3856,7 @@ def send_pipeline_to_teams(
             raise HTTPException(status_code=400, detail="chat_id and report_data are required")
 
         # Get user's Microsoft access token
-        token_store = EmailTokenStore()
+        token_store = get_token_store()
         user_id = str(current_user.get("id"))
 
         tokens = token_store.get_tokens(user_id)
@@ -3279,8 +3913,6 @@ async def upload_nda(
 ):
     """Upload an NDA or contract document for analysis. Optionally save to database."""
     try:
-        from modules.nda_analyzer import NDAAnalyzer
-
         # Read file content
         file_content = await file.read()
         file_size = len(file_content)
@@ -3382,7 +4014,6 @@ async def upload_nda(
 @app.get("/nda/entities")
 def get_prezlab_entities():
     """Get list of available Prezlab entities for contract signing."""
-    from modules.pdf_generator import get_all_entities
     return {
         "success": True,
         "entities": get_all_entities()
@@ -3396,9 +4027,6 @@ def download_filled_pdf(
     db: SupabaseDatabase = Depends(get_supabase_database)
 ):
     """Download the auto-filled PDF for an approved document."""
-    from fastapi.responses import Response
-    import base64
-
     try:
         # Get the document
         result = db.supabase.client.table("nda_documents")\
@@ -3442,9 +4070,6 @@ def generate_contract_pdf(
     db: SupabaseDatabase = Depends(get_supabase_database)
 ):
     """Generate a contract info PDF with selected entity details and download it immediately."""
-    from fastapi.responses import Response
-    from modules.pdf_generator import get_pdf_generator, get_entity_info
-
     try:
         # Validate entity
         entity_info = get_entity_info(selected_entity)
@@ -3587,10 +4212,6 @@ async def chat_about_document(
     db: SupabaseDatabase = Depends(get_supabase_database)
 ):
     """Answer questions about an analyzed document using AI with streaming support."""
-    from fastapi.responses import StreamingResponse
-    from openai import OpenAI
-    import json
-
     try:
         # Fetch full document content from database
         document = db.get_nda_document(document_id)
@@ -3646,14 +4267,14 @@ async def chat_about_document(
                 for chunk in stream:
                     if chunk.choices[0].delta.content:
                         # Send each chunk as Server-Sent Event
-                        yield f"data: {json.dumps({'content': chunk.choices[0].delta.content})}\n\n"
+                        yield _sse({'content': chunk.choices[0].delta.content})
 
                 # Send completion signal
-                yield f"data: {json.dumps({'done': True})}\n\n"
+                yield _sse({'done': True})
 
             except Exception as e:
                 logger.error(f"Error in streaming chat: {e}")
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                yield _sse({'error': str(e)})
 
         return StreamingResponse(generate(), media_type="text/event-stream")
 
@@ -3676,11 +4297,6 @@ def forward_to_teams(
 ):
     """Forward document analysis report to Teams with Adaptive Card approval buttons."""
     try:
-        from modules.teams_messenger import TeamsMessenger
-        from modules.outlook_client import OutlookClient
-        from modules.pdf_generator import get_entity_info
-        import os
-
         # Get user tokens
         user_id = str(current_user.get("id"))
         outlook = get_outlook_client()
@@ -3936,10 +4552,6 @@ async def approve_page(
     Simple approval page that processes the approval/rejection and shows confirmation.
     This is called when user clicks the Approve/Reject button in Teams.
     """
-    from fastapi.responses import HTMLResponse
-    from modules.pdf_generator import get_pdf_generator, get_entity_info
-    import base64
-
     try:
         if action not in ['approved', 'rejected']:
             return HTMLResponse(content="<html><body><h1>Invalid action</h1></body></html>", status_code=400)
@@ -4155,10 +4767,6 @@ async def ai_fill_pdf(
     and creates an overlay with the filled text.
     """
     try:
-        from modules.ai_pdf_filler import get_ai_pdf_filler
-        from modules.pdf_generator import get_entity_info
-        from modules.llm_client import LLMClient
-
         # Validate entity
         entity = get_entity_info(entity_key)
         if not entity:
@@ -4202,8 +4810,7 @@ async def ai_fill_pdf(
         cp_name = counterparty_name or document.get("counterparty_name") or ""
 
         # Initialize AI filler with OpenAI client
-        llm = LLMClient()
-        filler = get_ai_pdf_filler(llm.client)
+        filler = get_ai_pdf_filler(get_llm_client().client)
 
         # Fill the PDF (sync method)
         filled_pdf_bytes, fill_report = filler.fill_pdf(
@@ -4248,11 +4855,10 @@ async def ai_fill_pdf(
 
 
 @app.post("/proposal-followups/generate-draft")
-def generate_email_draft(request: GenerateDraftRequest):
+async def generate_email_draft(request: GenerateDraftRequest):
     """Generate an email draft for a specific thread."""
     try:
-        analyzer = ProposalFollowupAnalyzer()
-        analysis = analyzer.analyze_thread_with_llm(request.thread_data)
+        analysis = await _analyze_thread(request.thread_data)
 
         return {
             "success": True,
@@ -4265,14 +4871,41 @@ def generate_email_draft(request: GenerateDraftRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Thread context embedded in the refine prompt: enough to keep the tone and facts, no more
+REFINE_CONTEXT_FIELDS = ("subject", "external_email", "days_waiting", "odoo_lead", "analysis")
+REFINE_CONTEXT_MAX_MESSAGES = 5
+REFINE_CONTEXT_MAX_BODY_CHARS = 2000
+
+
+def _refine_context_message(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a Graph or conversation-view message to sender, date and a capped body."""
+    body = msg.get("body") or msg.get("bodyPreview") or ""
+    if isinstance(body, dict):
+        body = body.get("content", "")
+    sender = msg.get("from") or {}
+    sender = sender.get("emailAddress", sender)
+    return {
+        "from": sender.get("address") or sender.get("email"),
+        "date": msg.get("receivedDateTime"),
+        "body": body[:REFINE_CONTEXT_MAX_BODY_CHARS],
+    }
+
+
+def _refine_thread_context(thread_data: Dict[str, Any]) -> str:
+    """Compact JSON of the thread for the refine prompt."""
+    context = {key: thread_data[key] for key in REFINE_CONTEXT_FIELDS if thread_data.get(key) is not None}
+    messages = thread_data.get("messages") or thread_data.get("thread") or []
+    if messages:
+        context["last_messages"] = [
+            _refine_context_message(msg) for msg in messages[-REFINE_CONTEXT_MAX_MESSAGES:]
+        ]
+    return orjson.dumps(context).decode()
+
+
 @app.post("/proposal-followups/refine-draft")
-def refine_email_draft(request: RefineDraftRequest):
+async def refine_email_draft(request: RefineDraftRequest):
     """Refine an email draft based on user's editing instructions."""
     try:
-        from modules.llm_client import LLMClient
-
-        llm = LLMClient()
-
         # Create prompt for refinement
         prompt = f"""You are an expert email writer. Modify the following email draft based on the user's instructions.
 
@@ -4283,7 +4916,7 @@ User's Editing Instructions:
 {request.edit_prompt}
 
 Thread Context:
-{json.dumps(request.thread_data, indent=2)}
+{_refine_thread_context(request.thread_data)}
 
 Please provide the refined email draft that incorporates the user's requested changes while maintaining professionalism and the original intent."""
 
@@ -4292,7 +4925,7 @@ Please provide the refined email draft that incorporates the user's requested ch
             {"role": "user", "content": prompt}
         ]
 
-        refined_draft = llm.chat_completion(messages, max_tokens=1000, temperature=0.7)
+        refined_draft = await llm_coalescer.submit(messages, max_tokens=1000, temperature=0.7)
 
         return {
             "success": True,
@@ -4305,23 +4938,18 @@ Please provide the refined email draft that incorporates the user's requested ch
 
 
 @app.post("/proposal-followups/send-email")
-def send_followup_email(
+async def send_followup_email(
     request: SendFollowupEmailRequest,
     current_user: Dict[str, Any] = Depends(get_current_user),
     db: SupabaseDatabase = Depends(get_supabase_database)
 ):
     """Send a follow-up email via Outlook and mark as completed."""
     try:
-        from modules.outlook_client import OutlookClient
-        from modules.token_store import TokenStore
-
-        user_identifier = current_user.get("email")
         user_id = current_user.get("id")
 
-        # Get user's Outlook token
-        config = Config()
-        token_store = TokenStore(config)
-        tokens = token_store.get_tokens(user_identifier)
+        # Get user's Outlook token (stored under the user id by the auth flow)
+        outlook = get_outlook_client()
+        tokens = await asyncio.to_thread(_user_outlook_tokens, outlook, str(user_id))
 
         if not tokens:
             raise HTTPException(
@@ -4329,10 +4957,9 @@ def send_followup_email(
                 detail="No Outlook authentication found. Please authenticate first."
             )
 
-        outlook = OutlookClient(config)
-
         # Send the email as a reply
-        result = outlook.send_reply(
+        result = await asyncio.to_thread(
+            outlook.send_reply,
             access_token=tokens.get("access_token"),
             conversation_id=request.conversation_id,
             reply_body=request.draft_body,
@@ -4342,7 +4969,8 @@ def send_followup_email(
 
         if result:
             # Mark as completed
-            db.mark_followup_complete(
+            await asyncio.to_thread(
+                db.mark_followup_complete,
                 thread_id=request.conversation_id,
                 conversation_id=request.conversation_id,
                 user_id=user_id,
@@ -4355,6 +4983,7 @@ def send_followup_email(
             raise HTTPException(status_code=500, detail="Failed to send email")
 
     except Exception as e:
+        _drop_expired_outlook_tokens(e, str(current_user.get("id")))
         logger.error(f"Error sending email: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -4363,6 +4992,10 @@ def send_followup_email(
 # LEAD ASSIGNMENT ENDPOINTS
 # ============================================================================
 
+# Absorbs the inbox/outbox polling from the UI; writes clear it outright.
+LEAD_ASSIGNMENTS_CACHE_TTL_SECONDS = 10
+lead_assignments_cache = TTLCache(maxsize=256, ttl=LEAD_ASSIGNMENTS_CACHE_TTL_SECONDS)
+
 class LeadAssignmentCreate(BaseModel):
     conversation_id: str
     external_email: str
@@ -4382,7 +5015,7 @@ class LeadAssignmentUpdate(BaseModel):
 
 
 @app.post("/lead-assignments")
-def create_lead_assignment(
+async def create_lead_assignment(
     assignment: LeadAssignmentCreate,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -4426,7 +5059,8 @@ def create_lead_assignment(
         else:
             raise HTTPException(status_code=400, detail="Must provide either assigned_to_user_id or assigned_to_teams_id")
 
-        result = supabase.create_lead_assignment(**assignment_kwargs)
+        result = await asyncio.to_thread(supabase.create_lead_assignment, **assignment_kwargs)
+        lead_assignments_cache.clear()
 
         if not result:
             raise HTTPException(status_code=500, detail="Failed to create assignment")
@@ -4438,8 +5072,43 @@ def create_lead_assignment(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/lead-assignments/all")
+async def get_all_assignments(
+    status: Optional[Literal["pending", "accepted", "completed", "rejected"]] = None,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Get leads assigned to and by the current user in one round-trip.
+
+    Args:
+        status: Optional filter by status
+        current_user: Authenticated user
+
+    Returns:
+        Received and sent assignments
+    """
+    if not supabase.is_connected():
+        raise HTTPException(
+            status_code=503,
+            detail="Lead assignment requires Supabase connection"
+        )
+
+    try:
+        user_id = current_user.get("id")
+        cache_key = (user_id, status)
+        assignments = lead_assignments_cache.get(cache_key)
+        if assignments is None:
+            assignments = await asyncio.to_thread(supabase.get_user_assignments, user_id=user_id, status=status)
+            lead_assignments_cache.set(cache_key, assignments)
+        return assignments
+
+    except Exception as e:
+        logger.error(f"Error fetching assignments: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/lead-assignments/received")
-def get_received_assignments(
+async def get_received_assignments(
     status: Optional[Literal["pending", "accepted", "completed", "rejected"]] = None,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -4461,7 +5130,7 @@ def get_received_assignments(
 
     try:
         user_id = current_user.get("id")
-        assignments = supabase.get_received_assignments(user_id=user_id, status=status)
+        assignments = await asyncio.to_thread(supabase.get_received_assignments, user_id=user_id, status=status)
         return {"assignments": assignments, "count": len(assignments)}
 
     except Exception as e:
@@ -4470,7 +5139,7 @@ def get_received_assignments(
 
 
 @app.get("/lead-assignments/sent")
-def get_sent_assignments(
+async def get_sent_assignments(
     status: Optional[Literal["pending", "accepted", "completed", "rejected"]] = None,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -4492,7 +5161,7 @@ def get_sent_assignments(
 
     try:
         user_id = current_user.get("id")
-        assignments = supabase.get_sent_assignments(user_id=user_id, status=status)
+        assignments = await asyncio.to_thread(supabase.get_sent_assignments, user_id=user_id, status=status)
         return {"assignments": assignments, "count": len(assignments)}
 
     except Exception as e:
@@ -4501,7 +5170,7 @@ def get_sent_assignments(
 
 
 @app.patch("/lead-assignments/{assignment_id}")
-def update_assignment(
+async def update_assignment(
     assignment_id: str,
     update: LeadAssignmentUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user)
@@ -4524,11 +5193,13 @@ def update_assignment(
         )
 
     try:
-        success = supabase.update_assignment_status(
+        success = await asyncio.to_thread(
+            supabase.update_assignment_status,
             assignment_id=assignment_id,
             status=update.status,
             notes=update.notes
         )
+        lead_assignments_cache.clear()
 
         if not success:
             raise HTTPException(status_code=500, detail="Failed to update assignment")
@@ -4544,14 +5215,22 @@ def update_assignment(
 # EMAIL / OUTLOOK OAUTH2 ENDPOINTS
 # ============================================================================
 
+@lru_cache(maxsize=1)
 def get_outlook_client() -> OutlookClient:
-    """Get or create Outlook client instance."""
+    """OutlookClient only holds the app registration settings, so one instance is shared."""
     return OutlookClient(config=Config())
 
 
+@lru_cache(maxsize=1)
 def get_token_store() -> EmailTokenStore:
-    """Get or create token store instance."""
-    return EmailTokenStore()
+    """Token store shared by every request, backed by the process-wide Supabase database."""
+    return EmailTokenStore(db=get_supabase_database())
+
+
+# Tokens within the renew window are refreshed in the background while the current
+# one is still used; only a token about to lapse makes the request wait for a refresh.
+TOKEN_RENEW_WINDOW_SECONDS = 360
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
 
 
 class EmailAuthResponse(BaseModel):
@@ -4579,8 +5258,6 @@ def start_outlook_auth(current_user: Dict[str, Any] = Depends(get_current_user))
     Returns authorization URL for user to visit.
     Requires authentication.
     """
-    import secrets
-
     outlook = get_outlook_client()
 
     # Generate random state for CSRF protection
@@ -4589,10 +5266,7 @@ def start_outlook_auth(current_user: Dict[str, Any] = Depends(get_current_user))
 
     auth_url = outlook.get_authorization_url(state=state)
 
-    return EmailAuthResponse(
-        authorization_url=auth_url,
-        state=state
-    )
+    return ORJSONResponse({"authorization_url": auth_url, "state": state})
 
 
 @app.get("/auth/outlook/callback", response_class=RedirectResponse)
@@ -4612,8 +5286,7 @@ async def outlook_auth_callback(request: Request, code: str, state: str):
 @app.post("/auth/outlook/callback")
 def outlook_auth_callback_post(
     request: EmailAuthCallbackRequest,
-    current_user: Dict[str, Any] = Depends(get_current_user),
-    db: Database = Depends(get_database)
+    current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
     Complete OAuth2 callback (POST from frontend).
@@ -4648,7 +5321,7 @@ def outlook_auth_callback_post(
         # Use user ID as identifier for token storage
         user_identifier = str(current_user["id"])
 
-        # Store tokens in file system (backwards compatibility)
+        # email_tokens is the single durable record; the store also caches it in process
         success = token_store.save_tokens(
             user_identifier=user_identifier,
             access_token=access_token,
@@ -4661,30 +5334,6 @@ def outlook_auth_callback_post(
         if not success:
             raise HTTPException(status_code=500, detail="Failed to store tokens")
 
-        # Also store in database (with expires_at for persistence)
-        from datetime import datetime, timedelta
-        expires_at = (datetime.utcnow() + timedelta(seconds=expires_in)).isoformat()
-
-        try:
-            db.update_user_settings(
-                user_id=current_user["id"],
-                outlook_tokens={
-                    "access_token": access_token,
-                    "refresh_token": refresh_token,
-                    "expires_in": expires_in,
-                    "expires_at": expires_at,
-                    "user_email": user_email,
-                    "user_name": user_name,
-                    "created_at": datetime.utcnow().isoformat(),
-                    "updated_at": datetime.utcnow().isoformat()
-                },
-                user_identifier=user_identifier
-            )
-            logger.info(f"✅ Successfully saved Outlook tokens to database for user {current_user['id']} ({user_email})")
-        except Exception as db_error:
-            logger.error(f"❌ Failed to save Outlook tokens to database: {db_error}")
-            # Don't fail the request if database save fails, file system backup exists
-
         return {
             "success": True,
             "user_email": user_email,
@@ -4700,22 +5349,8 @@ def outlook_auth_callback_post(
 @app.get("/auth/outlook/status", response_model=EmailAuthStatusResponse)
 def get_email_auth_status(current_user: Dict[str, Any] = Depends(get_current_user)):
     """Check if current user has authorized email access."""
-    token_store = get_token_store()
-    user_identifier = str(current_user["id"])
-
-    tokens = token_store.get_tokens(user_identifier)
-
-    if not tokens:
-        return EmailAuthStatusResponse(authorized=False)
-
-    is_expired = token_store.is_token_expired(user_identifier)
-
-    return EmailAuthStatusResponse(
-        authorized=True,
-        user_email=tokens.get("user_email"),
-        user_name=tokens.get("user_name"),
-        expires_soon=is_expired
-    )
+    # Polled by the frontend; the store already returns the response shape, so skip re-validation
+    return ORJSONResponse(get_token_store().get_status(str(current_user["id"])))
 
 
 @app.delete("/auth/outlook")
@@ -4755,8 +5390,6 @@ def start_system_outlook_auth(current_user: Dict[str, Any] = Depends(get_current
     # if current_user["role"] != "admin":
     #     raise HTTPException(status_code=403, detail="Admin access required")
 
-    import secrets
-
     outlook = get_outlook_client()
 
     # Use special state prefix to identify system auth
@@ -4770,10 +5403,7 @@ def start_system_outlook_auth(current_user: Dict[str, Any] = Depends(get_current
         include_teams=False  # No Teams permissions needed for system email
     )
 
-    return EmailAuthResponse(
-        authorization_url=auth_url,
-        state=state
-    )
+    return ORJSONResponse({"authorization_url": auth_url, "state": state})
 
 
 @app.post("/auth/outlook/system/callback")
@@ -4811,7 +5441,6 @@ def system_outlook_auth_callback_post(
         system_identifier = "SYSTEM_automated.response@prezlab.com"
 
         # Store tokens in Supabase (persists across deployments)
-        from datetime import datetime, timedelta, timezone
         expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
 
         try:
@@ -4852,23 +5481,22 @@ def get_system_email_auth_status():
     tokens = outlook.get_user_auth_tokens(system_identifier)
 
     if not tokens:
-        return EmailAuthStatusResponse(authorized=False)
+        return ORJSONResponse({"authorized": False, "user_email": None, "user_name": None, "expires_soon": False})
 
     # Check if token is expired (will be refreshed automatically on next use)
     expires_at = tokens.get("expires_at")
     expires_soon = False
     if expires_at:
-        from datetime import datetime, timezone, timedelta
         expires_dt = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
         now = datetime.now(timezone.utc)
         expires_soon = (expires_dt - now) < timedelta(minutes=10)
 
-    return EmailAuthStatusResponse(
-        authorized=True,
-        user_email=tokens.get("user_email"),
-        user_name=tokens.get("user_name"),
-        expires_soon=expires_soon
-    )
+    return ORJSONResponse({
+        "authorized": True,
+        "user_email": tokens.get("user_email"),
+        "user_name": tokens.get("user_name"),
+        "expires_soon": expires_soon,
+    })
 
 
 @app.delete("/auth/outlook/system")
@@ -4924,16 +5552,14 @@ def send_email(
                 detail="Email not authorized. Please connect your email first."
             )
 
-        # Refresh token if expired
+        # Refresh ahead of expiry in the background; wait only if the token is about to lapse
         access_token = tokens.get("access_token")
-        if token_store.is_token_expired(user_identifier):
-            refresh_token = tokens.get("refresh_token")
-            token_response = outlook.refresh_access_token(refresh_token)
-            access_token = token_response.get("access_token")
-            token_store.update_access_token(
-                user_identifier,
-                access_token,
-                token_response.get("expires_in", 3600)
+        seconds_left = token_store.seconds_until_expiry(user_identifier)
+        if seconds_left <= TOKEN_EXPIRY_MARGIN_SECONDS:
+            access_token = refresh_stored_access_token(token_store, outlook, user_identifier)
+        elif seconds_left <= TOKEN_RENEW_WINDOW_SECONDS:
+            token_refresh_manager.schedule(
+                user_identifier, stored_token_refresh(token_store, outlook, user_identifier)
             )
 
         # Add engage@prezlab.com to CC if requested
@@ -4995,10 +5621,7 @@ class CallFlowGenerateRequest(BaseModel):
 def get_enriched_leads():
     """Get list of leads that have been enriched (have quality rating)."""
     config = _setup_logging()
-    odoo = OdooClient(config)
-
-    if not odoo.connect():
-        raise HTTPException(status_code=500, detail="Failed to connect to Odoo")
+    odoo = get_odoo_client()
 
     try:
         # Find Dareen's user ID
@@ -5015,58 +5638,263 @@ def get_enriched_leads():
             ['user_id', '!=', user_id] if user_id else ['id', '!=', -1]
         ]
 
-        fields = [
-            'id', 'name', 'partner_name', 'email_from', 'stage_id',
-            'user_id', 'description', 'function', 'x_studio_quality'
-        ]
+        # Only the fields EnrichedLead renders; the quality rating is filtered in the domain
+        fields = [
+            'id', 'name', 'partner_name', 'email_from', 'stage_id',
+            'user_id', 'description', 'function'
+        ]
+
+        leads_data = odoo._call_kw(
+            'crm.lead',
+            'search_read',
+            [domain],
+            {
+                'fields': fields,
+                'limit': 100,
+                'order': 'write_date desc'
+            }
+        )
+
+        enriched_leads = []
+        for lead in leads_data:
+            enriched_leads.append(
+                EnrichedLead(
+                    id=lead.get('id'),
+                    name=lead.get('name') or 'Untitled Lead',
+                    partner_name=lead.get('partner_name') if isinstance(lead.get('partner_name'), str) else None,
+                    email_from=lead.get('email_from') if isinstance(lead.get('email_from'), str) else None,
+                    stage_name=lead.get('stage_id')[1] if lead.get('stage_id') and isinstance(lead.get('stage_id'), (list, tuple)) else None,
+                    salesperson_name=lead.get('user_id')[1] if lead.get('user_id') and isinstance(lead.get('user_id'), (list, tuple)) else None,
+                    description=lead.get('description') if isinstance(lead.get('description'), str) else None,
+                    function=lead.get('function') if isinstance(lead.get('function'), str) else None,
+                )
+            )
+
+        return EnrichedLeadsResponse(count=len(enriched_leads), leads=enriched_leads)
+
+    except Exception as exc:
+        logger.error(f"Failed to fetch enriched leads: {exc}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch enriched leads: {str(exc)}")
+
+
+# Seconds the joined knowledge base text is reused across call-flow generations
+KB_CONTEXT_TTL_SECONDS = 600
+_kb_context_cache = TTLCache(maxsize=1, ttl=KB_CONTEXT_TTL_SECONDS)
+
+
+def _get_kb_context() -> str:
+    """Return all active knowledge base documents joined into one prompt section."""
+    cached = _kb_context_cache.get("active")
+    if cached is not None:
+        return cached
+
+    result = supabase.client.table("knowledge_base_documents")\
+        .select("filename, content")\
+        .eq("is_active", True)\
+        .execute()
+
+    context_parts = []
+    for doc in result.data:
+        filename = doc.get("filename", "Unknown Document")
+        content = doc.get("content", "")
+        if content.strip():
+            context_parts.append(f"=== {filename} ===\n{content.strip()}")
+
+    kb_context = "\n\n".join(context_parts)
+    _kb_context_cache.set("active", kb_context)
+    return kb_context
+
+
+def _invalidate_kb_context() -> None:
+    """Drop the cached knowledge base text after documents are added or removed."""
+    _kb_context_cache.clear()
+
+
+# Generated documents stay in memory up to this size and spill to disk beyond it
+DOCX_SPOOL_MAX_BYTES = 512 * 1024
+DOCX_STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _iter_file_chunks(fileobj, chunk_size: int = DOCX_STREAM_CHUNK_BYTES):
+    """Yield fileobj in chunks from the start, closing it once fully sent."""
+    try:
+        fileobj.seek(0)
+        while chunk := fileobj.read(chunk_size):
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+# Static parts of the call-flow prompt; only the per-lead fields are filled in per request
+CALL_FLOW_SYSTEM_PROMPT = "You are an expert sales consultant who creates personalized discovery call frameworks. Always respond with valid JSON."
+
+CALL_FLOW_KB_SECTION_TEMPLATE = """IMPORTANT - Company Context & Knowledge Base:
+First, carefully review the following documents about PrezLab (our company, services, and offerings):
+
+{kb_context}
+
+INSTRUCTIONS:
+- Study the above documents to understand what PrezLab offers and our value propositions
+- Tailor your discovery questions to uncover needs that align with PrezLab's specific services
+- Reference PrezLab's actual capabilities when framing questions about solutions
+- Ensure all questions are relevant to what PrezLab can actually provide
+
+
+"""
+
+CALL_FLOW_RETURNING_CLIENT_TEMPLATE = """
+CLIENT TYPE: RETURNING CLIENT (Previous PrezLab Customer)
+Previous projects with this client:
+{previous_work_context}
+
+IMPORTANT FOR RETURNING CLIENTS:
+- Acknowledge the existing relationship warmly
+- Reference past successful work if relevant
+- Focus on what's NEW or DIFFERENT about this inquiry
+- Ask about how things have evolved since the last project
+- Explore if there were any lessons learned they want to apply
+- Consider asking about expanding scope or new team members involved
+"""
+
+CALL_FLOW_NOTES_TEMPLATE = """
+INTERNAL TEAM NOTES (from CRM):
+{internal_notes}
+
+IMPORTANT: Review these internal notes carefully. They may contain:
+- Specific requirements or preferences mentioned by the client
+- Timeline or budget constraints
+- Key contacts or decision-makers identified
+- Previous interactions or important context
+- Red flags or opportunities to address
+Use relevant insights from these notes to make your questions more targeted and informed.
+"""
+
+CALL_FLOW_PROMPT_TEMPLATE = """{kb_section}You are a PrezLab sales consultant preparing for a discovery call. Using a consultative, dialogue-friendly approach, create personalized questions for each section that help uncover the prospect's business challenges and how PrezLab's services can help.
+
+LEAD INFORMATION:
+- Contact Name: {lead_name}
+- Company: {partner_name}
+- Job Title: {job_title}
+- Current Stage: {stage}
+- Enriched Notes: {enriched_notes}
+{client_type_context}
+{internal_notes_context}
+
+DISCOVERY CALL FLOW STRUCTURE (based on proven methodology):
+
+1. **Business Problem** - What challenge or opportunity is driving them to explore working with us?
+   - Focus on understanding their core pain point or strategic need
+   - Make it conversational and open-ended
+   - Examples: challenges with communication clarity, brand consistency, executive presentations, etc.
+
+2. **Current State** - How are they handling things today?
+   - Understand their current approach (in-house, agencies, mix)
+   - What's working and what could be stronger
+
+3. **Cause Analysis** - What's the root cause?
+   - Help them identify if it's about resources, processes, alignment, or capabilities
+   - Be empathetic and avoid making them defensive
+
+4. **Negative Impact** - What happens when these challenges occur?
+   - Explore consequences: delays, rework, missed opportunities, brand inconsistency
+   - Help them articulate the cost of inaction
+
+5. **Desired Outcome** - What does success look like?
+   - Future state vision in 6 months
+   - What outcomes would make this "worth the investment"
+
+6. **Process** - How do they like to work with partners?
+   - Project-based vs. ongoing engagement preferences
+   - Timeline, review, and approval processes
+
+7. **Stakeholders** - Who else is involved?
+   - Decision-makers, influencers, departments affected
+   - Identify champions and potential blockers
+
+For each section, provide:
+- A brief **objective** (what you're trying to discover)
+- 2-3 **dialogue-friendly questions** that are:
+  * Conversational and consultative (not interrogative)
+  * Tailored to {job_title} at {partner_name}
+  * Relevant to PrezLab's services (presentations, visual communication, content)
+  * Open-ended to encourage discussion
+
+Format as JSON:
+{{
+  "sections": [
+    {{
+      "title": "Business Problem",
+      "objective": "...",
+      "questions": ["...", "..."]
+    }},
+    ...
+  ]
+}}
+
+Make questions sound natural in conversation. Reference their context from enriched notes AND internal team notes when relevant. If this is a returning client, acknowledge the relationship and tailor questions accordingly. Focus on business impact, not just creative/design needs."""
+
+
+@lru_cache(maxsize=1)
+def _call_flow_kb_section(kb_context: str) -> str:
+    """Prompt section for the knowledge base, rebuilt only when the cached KB text changes."""
+    if not kb_context:
+        return ""
+    return CALL_FLOW_KB_SECTION_TEMPLATE.format_map({"kb_context": kb_context})
 
-        leads_data = odoo._call_kw(
-            'crm.lead',
-            'search_read',
-            [domain],
-            {
-                'fields': fields,
-                'limit': 100,
-                'order': 'write_date desc'
-            }
-        )
 
-        enriched_leads = []
-        for lead in leads_data:
-            enriched_leads.append(
-                EnrichedLead(
-                    id=lead.get('id'),
-                    name=lead.get('name') or 'Untitled Lead',
-                    partner_name=lead.get('partner_name') if isinstance(lead.get('partner_name'), str) else None,
-                    email_from=lead.get('email_from') if isinstance(lead.get('email_from'), str) else None,
-                    stage_name=lead.get('stage_id')[1] if lead.get('stage_id') and isinstance(lead.get('stage_id'), (list, tuple)) else None,
-                    salesperson_name=lead.get('user_id')[1] if lead.get('user_id') and isinstance(lead.get('user_id'), (list, tuple)) else None,
-                    description=lead.get('description') if isinstance(lead.get('description'), str) else None,
-                    function=lead.get('function') if isinstance(lead.get('function'), str) else None,
-                )
-            )
+# Generated call-flow JSON keyed by a hash of the model and rendered prompt. The
+# prompt carries the lead fields, chatter notes, past deals and knowledge base,
+# so any change to those produces a new key. Redis, when configured, shares
+# completions across workers; the in-process cache backs it up.
+CALL_FLOW_CACHE_TTL_SECONDS = 24 * 60 * 60
+call_flow_cache = TTLCache(maxsize=256, ttl=CALL_FLOW_CACHE_TTL_SECONDS)
 
-        return EnrichedLeadsResponse(count=len(enriched_leads), leads=enriched_leads)
 
-    except Exception as exc:
-        logger.error(f"Failed to fetch enriched leads: {exc}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch enriched leads: {str(exc)}")
+def _call_flow_cache_key(model: str, prompt: str) -> str:
+    digest = hashlib.blake2b(f"{model}\0{prompt}".encode("utf-8"), digest_size=16).hexdigest()
+    return f"call_flow:{digest}"
 
 
-@app.post("/call-flow/generate")
-def generate_call_flow(request: CallFlowGenerateRequest):
-    """Generate a personalized discovery call flow document for a lead."""
-    import io
-    from docx import Document
-    from docx.shared import Pt, RGBColor, Inches
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from openai import OpenAI
+async def _get_cached_call_flow(key: str) -> Optional[bytes]:
+    """Return the cached call-flow JSON for key, checking Redis before memory."""
+    if redis_client is not None:
+        try:
+            payload = await redis_client.get(key)
+            if payload:
+                return payload
+        except Exception as e:
+            logger.warning(f"Failed to read call flow cache from Redis: {e}")
+    return call_flow_cache.get(key)
+
+
+async def _store_cached_call_flow(key: str, payload: bytes) -> None:
+    call_flow_cache.set(key, payload)
+    if redis_client is not None:
+        try:
+            await redis_client.set(key, payload, ex=CALL_FLOW_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to write call flow cache to Redis: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_async_openai_client() -> AsyncOpenAI:
+    """Async OpenAI client shared by handlers that await completions on the event loop."""
+    return AsyncOpenAI(api_key=_setup_logging().OPENAI_API_KEY)
+
+
+def _load_call_flow_kb_context() -> str:
+    """Knowledge base text for the call-flow prompt, or "" if it cannot be fetched."""
+    try:
+        if supabase.is_connected():
+            return _get_kb_context()
+    except Exception as e:
+        logger.warning(f"Could not fetch knowledge base context: {e}")
+    return ""
 
-    config = _setup_logging()
-    odoo = OdooClient(config)
 
-    if not odoo.connect():
-        raise HTTPException(status_code=500, detail="Failed to connect to Odoo")
+def _load_call_flow_context(request: CallFlowGenerateRequest) -> Dict[str, Any]:
+    """Gather the Odoo lead, its notes and past deals for the prompt."""
+    odoo = get_odoo_client()
 
     # Fetch the lead data
     try:
@@ -5112,7 +5940,6 @@ def generate_call_flow(request: CallFlowGenerateRequest):
             body = msg.get('body', '')
             if body and isinstance(body, str):
                 # Strip HTML tags for cleaner text
-                import re
                 clean_body = re.sub(r'<[^>]+>', ' ', body)
                 clean_body = re.sub(r'\s+', ' ', clean_body).strip()
 
@@ -5158,164 +5985,157 @@ def generate_call_flow(request: CallFlowGenerateRequest):
     except Exception as e:
         logger.warning(f"Could not check for previous deals: {e}")
 
-    # Get knowledge base context about PrezLab
-    kb_context = ""
-    try:
-        supabase = SupabaseClient()
-        if supabase.is_connected():
-            result = supabase.client.table("knowledge_base_documents")\
-                .select("filename, content")\
-                .eq("is_active", True)\
-                .execute()
-
-            context_parts = []
-            for doc in result.data:
-                filename = doc.get("filename", "Unknown Document")
-                content = doc.get("content", "")
-                if content.strip():
-                    context_parts.append(f"=== {filename} ===\n{content.strip()}")
-
-            kb_context = "\n\n".join(context_parts)
-    except Exception as e:
-        logger.warning(f"Could not fetch knowledge base context: {e}")
-
-    # Generate personalized content using LLM
-    try:
-        openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
-
-        prompt_parts = []
+    return {
+        "lead_name": lead_name,
+        "partner_name": partner_name,
+        "description": description,
+        "job_title": job_title,
+        "stage": stage,
+        "internal_notes": internal_notes,
+        "is_existing_client": is_existing_client,
+        "previous_work_context": previous_work_context,
+    }
 
-        if kb_context:
-            prompt_parts.append(f"""IMPORTANT - Company Context & Knowledge Base:
-First, carefully review the following documents about PrezLab (our company, services, and offerings):
 
-{kb_context}
+@lru_cache(maxsize=1)
+def _call_flow_template_bytes() -> bytes:
+    """Serialized base .docx with page setup applied, built once per process."""
+    doc = Document()
 
-INSTRUCTIONS:
-- Study the above documents to understand what PrezLab offers and our value propositions
-- Tailor your discovery questions to uncover needs that align with PrezLab's specific services
-- Reference PrezLab's actual capabilities when framing questions about solutions
-- Ensure all questions are relevant to what PrezLab can actually provide
+    # Set document margins
+    sections = doc.sections
+    for section in sections:
+        section.top_margin = Inches(1)
+        section.bottom_margin = Inches(1)
+        section.left_margin = Inches(1)
+        section.right_margin = Inches(1)
 
-""")
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
 
-        # Build client type context
-        client_type_context = ""
-        if is_existing_client:
-            client_type_context = f"""
-CLIENT TYPE: RETURNING CLIENT (Previous PrezLab Customer)
-Previous projects with this client:
-{previous_work_context}
 
-IMPORTANT FOR RETURNING CLIENTS:
-- Acknowledge the existing relationship warmly
-- Reference past successful work if relevant
-- Focus on what's NEW or DIFFERENT about this inquiry
-- Ask about how things have evolved since the last project
-- Explore if there were any lessons learned they want to apply
-- Consider asking about expanding scope or new team members involved
-"""
-        else:
-            client_type_context = "CLIENT TYPE: New Prospect"
+def _build_call_flow_docx(call_flow_data: Dict[str, Any], lead_name: str, partner_name: str, job_title: str):
+    """Render the call flow into a .docx and return (spooled file, size in bytes)."""
+    doc = Document(BytesIO(_call_flow_template_bytes()))
 
-        # Build internal notes context (only include if meaningful notes exist)
-        internal_notes_context = ""
-        if internal_notes:
-            internal_notes_context = f"""
-INTERNAL TEAM NOTES (from CRM):
-{internal_notes}
+    # Title
+    title = doc.add_heading(f'Discovery Call Flow - {lead_name}', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
-IMPORTANT: Review these internal notes carefully. They may contain:
-- Specific requirements or preferences mentioned by the client
-- Timeline or budget constraints
-- Key contacts or decision-makers identified
-- Previous interactions or important context
-- Red flags or opportunities to address
-Use relevant insights from these notes to make your questions more targeted and informed.
-"""
+    # Subtitle with company info
+    subtitle = doc.add_paragraph()
+    subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = subtitle.add_run(f'{partner_name} | {job_title}')
+    run.font.size = Pt(12)
+    run.font.color.rgb = RGBColor(128, 128, 128)
 
-        prompt_parts.append(f"""You are a PrezLab sales consultant preparing for a discovery call. Using a consultative, dialogue-friendly approach, create personalized questions for each section that help uncover the prospect's business challenges and how PrezLab's services can help.
+    doc.add_paragraph()  # Spacing
 
-LEAD INFORMATION:
-- Contact Name: {lead_name}
-- Company: {partner_name}
-- Job Title: {job_title}
-- Current Stage: {stage}
-- Enriched Notes: {description[:500] if description else 'No additional context available'}
-{client_type_context}
-{internal_notes_context}
+    # Add each section
+    sections_data = call_flow_data.get('sections', [])
+    for i, section_data in enumerate(sections_data, 1):
+        # Section title
+        section_title = doc.add_heading(f"{i}. {section_data.get('title', '')}", 1)
+        section_title.alignment = WD_ALIGN_PARAGRAPH.LEFT
 
-DISCOVERY CALL FLOW STRUCTURE (based on proven methodology):
+        # Objective
+        objective_para = doc.add_paragraph()
+        objective_para.add_run('Objective: ').bold = True
+        objective_para.add_run(section_data.get('objective', ''))
 
-1. **Business Problem** - What challenge or opportunity is driving them to explore working with us?
-   - Focus on understanding their core pain point or strategic need
-   - Make it conversational and open-ended
-   - Examples: challenges with communication clarity, brand consistency, executive presentations, etc.
+        # Questions
+        questions_heading = doc.add_paragraph()
+        questions_heading.add_run('Discussion Questions:').bold = True
 
-2. **Current State** - How are they handling things today?
-   - Understand their current approach (in-house, agencies, mix)
-   - What's working and what could be stronger
+        questions = section_data.get('questions', [])
+        for question in questions:
+            doc.add_paragraph(question, style='List Bullet')
 
-3. **Cause Analysis** - What's the root cause?
-   - Help them identify if it's about resources, processes, alignment, or capabilities
-   - Be empathetic and avoid making them defensive
+        doc.add_paragraph()  # Spacing between sections
 
-4. **Negative Impact** - What happens when these challenges occur?
-   - Explore consequences: delays, rework, missed opportunities, brand inconsistency
-   - Help them articulate the cost of inaction
+    # Add footer with preparation notes
+    doc.add_paragraph()
+    footer = doc.add_paragraph()
+    footer.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = footer.add_run('Prepared by PrezLab Lead Automation Hub')
+    run.font.size = Pt(9)
+    run.font.color.rgb = RGBColor(150, 150, 150)
 
-5. **Desired Outcome** - What does success look like?
-   - Future state vision in 6 months
-   - What outcomes would make this "worth the investment"
+    # Save to a spooled file so large documents go to disk instead of memory
+    spool = tempfile.SpooledTemporaryFile(max_size=DOCX_SPOOL_MAX_BYTES)
+    doc.save(spool)
+    return spool, spool.tell()
 
-6. **Process** - How do they like to work with partners?
-   - Project-based vs. ongoing engagement preferences
-   - Timeline, review, and approval processes
 
-7. **Stakeholders** - Who else is involved?
-   - Decision-makers, influencers, departments affected
-   - Identify champions and potential blockers
+@app.post("/call-flow/generate")
+async def generate_call_flow(request: CallFlowGenerateRequest):
+    """Generate a personalized discovery call flow document for a lead."""
+    config = _setup_logging()
 
-For each section, provide:
-- A brief **objective** (what you're trying to discover)
-- 2-3 **dialogue-friendly questions** that are:
-  * Conversational and consultative (not interrogative)
-  * Tailored to {job_title} at {partner_name}
-  * Relevant to PrezLab's services (presentations, visual communication, content)
-  * Open-ended to encourage discussion
+    # Odoo and Supabase clients are blocking; fetch the lead and the knowledge base
+    # concurrently off the event loop
+    context, kb_context = await asyncio.gather(
+        asyncio.to_thread(_load_call_flow_context, request),
+        asyncio.to_thread(_load_call_flow_kb_context),
+    )
+    lead_name = context["lead_name"]
+    partner_name = context["partner_name"]
+    description = context["description"]
+    job_title = context["job_title"]
+    stage = context["stage"]
+    internal_notes = context["internal_notes"]
+    is_existing_client = context["is_existing_client"]
+    previous_work_context = context["previous_work_context"]
 
-Format as JSON:
-{{
-  "sections": [
-    {{
-      "title": "Business Problem",
-      "objective": "...",
-      "questions": ["...", "..."]
-    }},
-    ...
-  ]
-}}
+    # Generate personalized content using LLM
+    try:
+        openai_client = get_async_openai_client()
 
-Make questions sound natural in conversation. Reference their context from enriched notes AND internal team notes when relevant. If this is a returning client, acknowledge the relationship and tailor questions accordingly. Focus on business impact, not just creative/design needs.""")
+        # Build client type context
+        if is_existing_client:
+            client_type_context = CALL_FLOW_RETURNING_CLIENT_TEMPLATE.format_map({"previous_work_context": previous_work_context})
+        else:
+            client_type_context = "CLIENT TYPE: New Prospect"
 
-        prompt = "\n".join(prompt_parts)
+        # Build internal notes context (only include if meaningful notes exist)
+        internal_notes_context = ""
+        if internal_notes:
+            internal_notes_context = CALL_FLOW_NOTES_TEMPLATE.format_map({"internal_notes": internal_notes})
+
+        prompt = CALL_FLOW_PROMPT_TEMPLATE.format_map({
+            "kb_section": _call_flow_kb_section(kb_context),
+            "lead_name": lead_name,
+            "partner_name": partner_name,
+            "job_title": job_title,
+            "stage": stage,
+            "enriched_notes": description[:500] if description else 'No additional context available',
+            "client_type_context": client_type_context,
+            "internal_notes_context": internal_notes_context,
+        })
 
-        response = openai_client.chat.completions.create(
-            model=config.OPENAI_MODEL or 'gpt-5-mini',
-            messages=[
-                {"role": "system", "content": "You are an expert sales consultant who creates personalized discovery call frameworks. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            max_completion_tokens=2000,
-            response_format={"type": "json_object"}
-        )
+        model = config.OPENAI_MODEL or 'gpt-5-mini'
+        cache_key = _call_flow_cache_key(model, prompt)
+        cached = await _get_cached_call_flow(cache_key)
+        if cached is not None:
+            call_flow_data = orjson.loads(cached)
+        else:
+            response = await openai_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": CALL_FLOW_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                max_completion_tokens=2000,
+                response_format={"type": "json_object"}
+            )
 
-        import json
-        content = response.choices[0].message.content
-        if not content:
-            logger.error(f"OpenAI returned empty content. Response: {response}")
-            raise ValueError("OpenAI returned empty response content")
-        call_flow_data = json.loads(content)
+            content = response.choices[0].message.content
+            if not content:
+                logger.error(f"OpenAI returned empty content. Response: {response}")
+                raise ValueError("OpenAI returned empty response content")
+            call_flow_data = json.loads(content)
+            await _store_cached_call_flow(cache_key, orjson.dumps(call_flow_data))
 
     except Exception as exc:
         logger.error(f"Failed to generate call flow content: {exc}")
@@ -5323,71 +6143,20 @@ Make questions sound natural in conversation. Reference their context from enric
 
     # Create the Word document
     try:
-        doc = Document()
-
-        # Set document margins
-        sections = doc.sections
-        for section in sections:
-            section.top_margin = Inches(1)
-            section.bottom_margin = Inches(1)
-            section.left_margin = Inches(1)
-            section.right_margin = Inches(1)
-
-        # Title
-        title = doc.add_heading(f'Discovery Call Flow - {lead_name}', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # Subtitle with company info
-        subtitle = doc.add_paragraph()
-        subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        run = subtitle.add_run(f'{partner_name} | {job_title}')
-        run.font.size = Pt(12)
-        run.font.color.rgb = RGBColor(128, 128, 128)
-
-        doc.add_paragraph()  # Spacing
-
-        # Add each section
-        sections_data = call_flow_data.get('sections', [])
-        for i, section_data in enumerate(sections_data, 1):
-            # Section title
-            section_title = doc.add_heading(f"{i}. {section_data.get('title', '')}", 1)
-            section_title.alignment = WD_ALIGN_PARAGRAPH.LEFT
-
-            # Objective
-            objective_para = doc.add_paragraph()
-            objective_para.add_run('Objective: ').bold = True
-            objective_para.add_run(section_data.get('objective', ''))
-
-            # Questions
-            questions_heading = doc.add_paragraph()
-            questions_heading.add_run('Discussion Questions:').bold = True
-
-            questions = section_data.get('questions', [])
-            for question in questions:
-                doc.add_paragraph(question, style='List Bullet')
-
-            doc.add_paragraph()  # Spacing between sections
-
-        # Add footer with preparation notes
-        doc.add_paragraph()
-        footer = doc.add_paragraph()
-        footer.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        run = footer.add_run('Prepared by PrezLab Lead Automation Hub')
-        run.font.size = Pt(9)
-        run.font.color.rgb = RGBColor(150, 150, 150)
-
-        # Save to bytes buffer
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
+        spool, content_length = await asyncio.to_thread(
+            _build_call_flow_docx, call_flow_data, lead_name, partner_name, job_title
+        )
 
         # Return as downloadable file
         filename = f"Discovery_Call_Flow_{lead_name.replace(' ', '_')}.docx"
 
         return StreamingResponse(
-            buffer,
+            _iter_file_chunks(spool),
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}",
+                "Content-Length": str(content_length),
+            }
         )
 
     except Exception as exc:
@@ -5407,159 +6176,283 @@ class DashboardSummary(BaseModel):
     recent_activity: List[Dict[str, Any]]
 
 
+# Seconds a serialized dashboard summary is served before it is rebuilt.
+DASHBOARD_CACHE_TTL_SECONDS = 30
+
+# Browsers may reuse a dashboard response this long before revalidating via ETag.
+DASHBOARD_CLIENT_MAX_AGE_SECONDS = 15
+
+# Encoded dashboard responses keyed by "dashboard:<engage email>". Cache hits
+# skip both Pydantic validation and JSON encoding. When Redis is configured it
+# is the shared tier and this cache only backs it up.
+DASHBOARD_CACHE_KEY_PREFIX = "dashboard:"
+_dashboard_response_cache = TTLCache(maxsize=16, ttl=DASHBOARD_CACHE_TTL_SECONDS)
+
+
+@lru_cache(maxsize=1)
+def _sync_redis_client():
+    """Blocking Redis client for invalidations issued from worker threads and scripts."""
+    return redis.Redis.from_url(Config.REDIS_URL)
+
+
+def _invalidate_dashboard_cache() -> None:
+    """Drop every cached dashboard summary, locally and in Redis (blocking)."""
+    _dashboard_response_cache.clear()
+    if redis_client is not None:
+        try:
+            client = _sync_redis_client()
+            keys = list(client.scan_iter(match=f"{DASHBOARD_CACHE_KEY_PREFIX}*"))
+            if keys:
+                client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate dashboard cache in Redis: {e}")
+
+
+async def _get_cached_dashboard(key: str) -> Optional[bytes]:
+    """Return the encoded dashboard payload for key if it is still fresh."""
+    if redis_client is not None:
+        try:
+            return await redis_client.get(key)
+        except Exception as e:
+            # Redis is the shared cache; the in-memory copy is only a fallback while it is down,
+            # since it misses invalidations made by other workers
+            logger.warning(f"Failed to read dashboard cache from Redis: {e}")
+
+    return _dashboard_response_cache.get(key)
+
+
+async def _store_cached_dashboard(key: str, payload: bytes) -> None:
+    """Store an encoded dashboard payload in Redis (if configured) and in memory."""
+    _dashboard_response_cache.set(key, payload)
+    if redis_client is not None:
+        try:
+            await redis_client.set(key, payload, ex=DASHBOARD_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to write dashboard cache to Redis: {e}")
+
+def _dashboard_response(request: Request, payload: bytes) -> Response:
+    """Wrap an encoded dashboard payload with ETag/Cache-Control, or 304 if unchanged."""
+    return _conditional_response(
+        request,
+        Response(content=payload, media_type="application/json"),
+        cache_control=f"private, max-age={DASHBOARD_CLIENT_MAX_AGE_SECONDS}",
+    )
+
+
+# In-flight dashboard computations keyed by engage email. Concurrent duplicate
+# requests (multiple tabs, reconnect bursts) await the same task instead of
+# each rebuilding the summary. The task is not tied to any one request, so a
+# client that disconnects does not cancel the build for the others.
+_dashboard_inflight: Dict[str, "asyncio.Task[bytes]"] = {}
+
+
+async def _compute_dashboard_payload(key: str, engage_email: str) -> bytes:
+    summary = await _build_dashboard_summary(engage_email)
+    payload = orjson.dumps(summary.model_dump())
+    await _store_cached_dashboard(key, payload)
+    return payload
+
+
+def _forget_dashboard_build(key: str, task: "asyncio.Task[bytes]") -> None:
+    if _dashboard_inflight.get(key) is task:
+        del _dashboard_inflight[key]
+    if not task.cancelled():
+        # Mark the exception as retrieved; waiting callers re-raise it themselves.
+        task.exception()
+
+
 @app.get("/dashboard/summary", response_model=DashboardSummary)
-def get_dashboard_summary(
+async def get_dashboard_summary(
+    request: Request,
     engage_email: str = "automated.response@prezlab.com"
 ):
     """
     Get dashboard summary with data from all features.
 
+    The encoded response is cached for DASHBOARD_CACHE_TTL_SECONDS (in Redis
+    when REDIS_URL is set, so all workers share it), and concurrent requests
+    for the same engage email share a single computation. Responses carry an
+    ETag so polling clients get a 304 while the summary is unchanged.
+
     Args:
+        request: Incoming request (for If-None-Match)
         engage_email: Email address for engage group monitoring
 
     Returns:
         Aggregated dashboard data
     """
-    try:
-        high_priority_items = []
-        stats = {}
-        recent_activity = []
+    key = f"{DASHBOARD_CACHE_KEY_PREFIX}{engage_email}"
+    cached = await _get_cached_dashboard(key)
+    if cached is not None:
+        return _dashboard_response(request, cached)
+
+    task = _dashboard_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_compute_dashboard_payload(key, engage_email))
+        _dashboard_inflight[key] = task
+        task.add_done_callback(lambda done: _forget_dashboard_build(key, done))
+    payload = await asyncio.shield(task)
+    return _dashboard_response(request, payload)
+
+
+@app.post("/dashboard/summary/invalidate")
+async def invalidate_dashboard_summary(current_user: Dict[str, Any] = Depends(get_current_user)):
+    """Drop cached dashboard summaries so the next request rebuilds them."""
+    await asyncio.to_thread(_invalidate_dashboard_cache)
+    return {"success": True}
+
+
+# Follow-up stats reported when no shared proposal report exists yet.
+_EMPTY_FOLLOWUP_STATS = {"unanswered_emails": 0, "pending_proposals": 0, "last_updated": None}
+
+
+def _dashboard_followup_section() -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Follow-up stats, high priority items and recent activity from the latest shared report."""
+    # Try to get the latest shared report from Supabase
+    if supabase.is_connected():
+        latest_report_response = supabase.client.table("analysis_cache") \
+            .select("*") \
+            .eq("analysis_type", "proposal_followups") \
+            .eq("is_shared", True) \
+            .not_.is_("report_type", "null") \
+            .order("created_at", desc=True) \
+            .limit(1) \
+            .execute()
+    else:
+        latest_report_response = None
 
-        # 1. Get Proposal Follow-ups data from Supabase (latest shared report)
-        try:
-            # Try to get the latest shared report from Supabase
-            if supabase.is_connected():
-                latest_report_response = supabase.client.table("analysis_cache") \
-                    .select("*") \
-                    .eq("analysis_type", "proposal_followups") \
-                    .eq("is_shared", True) \
-                    .not_.is_("report_type", "null") \
-                    .order("created_at", desc=True) \
-                    .limit(1) \
-                    .execute()
-            else:
-                latest_report_response = None
-
-            if latest_report_response and latest_report_response.data and len(latest_report_response.data) > 0:
-                report_data = latest_report_response.data[0]
-
-                # The field is 'results' and it's JSON-encoded
-                import json
-                result = report_data.get("results")
-                if isinstance(result, str):
-                    result = json.loads(result)
-                if not result:
-                    result = {}
-
-                # Get completed thread IDs to filter them out
-                db = SupabaseDatabase()
-                completed_threads = db.get_completed_followups_with_timestamps()
-                completed_ids = set(completed_threads.keys())
-
-                # Filter out completed threads from unanswered and pending_proposals
-                unanswered = result.get("unanswered", [])
-                pending_proposals = result.get("pending_proposals", [])
-
-                unanswered_filtered = [t for t in unanswered if t.get("conversation_id") not in completed_ids]
-                pending_filtered = [t for t in pending_proposals if t.get("conversation_id") not in completed_ids]
-
-                unanswered_count = len(unanswered_filtered)
-                pending_proposals_count = len(pending_filtered)
-
-                stats["unanswered_emails"] = unanswered_count
-                stats["pending_proposals"] = pending_proposals_count
-                stats["last_updated"] = report_data.get("created_at")
-
-                followups_result = {
-                    "summary": {
-                        "unanswered_count": unanswered_count,
-                        "pending_proposals_count": pending_proposals_count
-                    },
-                    "unanswered": unanswered_filtered,
-                    "pending_proposals": pending_filtered
-                }
-            else:
-                # No reports yet
-                stats["unanswered_emails"] = 0
-                stats["pending_proposals"] = 0
-                stats["last_updated"] = None
-                followups_result = {"summary": {"unanswered_count": 0, "pending_proposals_count": 0}, "unanswered": [], "pending_proposals": []}
-
-            # Add high priority items (>5 days waiting)
-            for item in followups_result["unanswered"]:
-                if item["days_waiting"] >= 5:
-                    high_priority_items.append({
-                        "type": "email",
-                        "subject": item["subject"],
-                        "external_email": item["external_email"],
-                        "days_waiting": item["days_waiting"],
-                        "odoo_lead": item.get("odoo_lead"),
-                        "source": "engage"
-                    })
+    if not (latest_report_response and latest_report_response.data):
+        # No reports yet: nothing to rank, so skip straight to zeroed stats
+        return dict(_EMPTY_FOLLOWUP_STATS), [], []
 
-            for item in followups_result["pending_proposals"]:
-                if item["days_waiting"] >= 5:
-                    high_priority_items.append({
-                        "type": "proposal",
-                        "subject": item["subject"],
-                        "external_email": item["external_email"],
-                        "days_waiting": item["days_waiting"],
-                        "odoo_lead": item.get("odoo_lead"),
-                        "source": "engage"
-                    })
+    report_data = latest_report_response.data[0]
 
-            # Add recent activity
-            for item in followups_result["unanswered"][:3]:  # Latest 3
-                recent_activity.append({
-                    "type": "email_received",
-                    "description": f"Email from {item['external_email']}",
-                    "time": item.get("last_contact_date", ""),
-                    "subject": item["subject"]
-                })
+    # The field is 'results' and it's JSON-encoded
+    result = report_data.get("results")
+    if isinstance(result, str):
+        result = json.loads(result)
+    if not result:
+        result = {}
 
-        except Exception as e:
-            logger.error(f"Error fetching proposal follow-ups for dashboard: {e}")
-            stats["unanswered_emails"] = 0
-            stats["pending_proposals"] = 0
+    # Get completed thread IDs to filter them out
+    db = get_supabase_database()
+    completed_threads = db.get_completed_followups_with_timestamps()
+    completed_ids = set(completed_threads.keys())
 
-        # 2. Get Lost Leads data - fetch actual count from Odoo
-        try:
-            analyzer = get_lost_lead_analyzer()
-            # Get lost leads without limit to count all
-            lost_leads = analyzer.list_lost_leads(limit=1000)
-            stats["lost_leads"] = len(lost_leads)
-        except Exception as e:
-            logger.error(f"Error fetching lost leads for dashboard: {e}")
-            stats["lost_leads"] = 0
+    # Filter out completed threads from unanswered and pending_proposals
+    unanswered = result.get("unanswered", [])
+    pending_proposals = result.get("pending_proposals", [])
 
-        # 3. Get Unenriched leads count (replacing enriched_today)
-        try:
-            workflow = get_workflow()
-            _, unenriched_leads = workflow.generate_enrichment_prompt()
-            stats["unenriched_leads"] = len(unenriched_leads)
-        except Exception as e:
-            logger.error(f"Error fetching unenriched leads for dashboard: {e}")
-            stats["unenriched_leads"] = 0
+    unanswered_filtered = [t for t in unanswered if t.get("conversation_id") not in completed_ids]
+    pending_filtered = [t for t in pending_proposals if t.get("conversation_id") not in completed_ids]
 
-        # 4. Get Call Flow stats (placeholder)
-        try:
-            # TODO: Track call flows in database and fetch count
-            stats["call_flows_generated"] = 0
-        except Exception as e:
-            logger.error(f"Error fetching call flow stats for dashboard: {e}")
-            stats["call_flows_generated"] = 0
+    stats = {
+        "unanswered_emails": len(unanswered_filtered),
+        "pending_proposals": len(pending_filtered),
+        "last_updated": report_data.get("created_at"),
+    }
+
+    # Add high priority items (>5 days waiting). Saved reports are raw JSON,
+    # so days_waiting may be a string or null there
+    high_priority_items: List[Dict[str, Any]] = []
+    for item in unanswered_filtered:
+        days_waiting = _whole_days(item.get("days_waiting"))
+        if days_waiting >= 5:
+            high_priority_items.append({
+                "type": "email",
+                "subject": item["subject"],
+                "external_email": item["external_email"],
+                "days_waiting": days_waiting,
+                "odoo_lead": item.get("odoo_lead"),
+                "source": "engage"
+            })
+
+    for item in pending_filtered:
+        days_waiting = _whole_days(item.get("days_waiting"))
+        if days_waiting >= 5:
+            high_priority_items.append({
+                "type": "proposal",
+                "subject": item["subject"],
+                "external_email": item["external_email"],
+                "days_waiting": days_waiting,
+                "odoo_lead": item.get("odoo_lead"),
+                "source": "engage"
+            })
+
+    # Add recent activity
+    recent_activity: List[Dict[str, Any]] = []
+    for item in unanswered_filtered[:3]:  # Latest 3
+        recent_activity.append({
+            "type": "email_received",
+            "description": f"Email from {item['external_email']}",
+            "time": item.get("last_contact_date", ""),
+            "subject": item["subject"]
+        })
+    return stats, high_priority_items, recent_activity
+
+
+def _dashboard_lost_leads_count() -> int:
+    # Get lost leads without limit to count all
+    return len(get_lost_lead_analyzer().list_lost_leads(limit=1000))
+
+
+def _dashboard_unenriched_count() -> int:
+    _, unenriched_leads = _get_enrichment_prompt(get_workflow())
+    return len(unenriched_leads)
+
+
+async def _build_dashboard_summary(engage_email: str) -> DashboardSummary:
+    """Aggregate the dashboard summary.
+
+    The sections hit Supabase and Odoo independently, so they run concurrently in
+    worker threads; a failing section is logged and reported as zero.
+    """
+    followups, lost_leads, unenriched = await asyncio.gather(
+        asyncio.to_thread(_dashboard_followup_section),
+        asyncio.to_thread(_dashboard_lost_leads_count),
+        asyncio.to_thread(_dashboard_unenriched_count),
+        return_exceptions=True,
+    )
+
+    try:
+        stats: Dict[str, Any] = {}
+
+        # 1. Proposal follow-ups from the latest shared report
+        if isinstance(followups, Exception):
+            logger.error(f"Error fetching proposal follow-ups for dashboard: {followups}")
+            stats["unanswered_emails"] = 0
+            stats["pending_proposals"] = 0
+            high_priority_items, recent_activity = [], []
+        else:
+            followup_stats, high_priority_items, recent_activity = followups
+            stats.update(followup_stats)
 
-        # Sort high priority items by days waiting (descending)
-        high_priority_items.sort(key=lambda x: x["days_waiting"], reverse=True)
+        # 2. Lost leads count from Odoo
+        if isinstance(lost_leads, Exception):
+            logger.error(f"Error fetching lost leads for dashboard: {lost_leads}")
+            lost_leads = 0
+        stats["lost_leads"] = lost_leads
 
-        # Sort recent activity by time (most recent first)
-        recent_activity.sort(key=lambda x: x.get("time", ""), reverse=True)
+        # 3. Unenriched leads count (replacing enriched_today)
+        if isinstance(unenriched, Exception):
+            logger.error(f"Error fetching unenriched leads for dashboard: {unenriched}")
+            unenriched = 0
+        stats["unenriched_leads"] = unenriched
 
+        # 4. Get Call Flow stats (placeholder)
+        # TODO: Track call flows in database and fetch count. When this becomes a
+        # real query, catch only the errors it can raise (e.g. ConnectionError,
+        # postgrest APIError) rather than a blanket Exception.
+        stats["call_flows_generated"] = 0
+
+        # Top 10 high priority items by days waiting, and the 10 most recent
+        # activities (ISO timestamps order correctly as strings). itemgetter keys
+        # keep the comparisons in C, and nlargest avoids a full sort.
         return DashboardSummary(
             high_priority_count=len(high_priority_items),
-            high_priority_items=high_priority_items[:10],  # Limit to 10
+            high_priority_items=heapq.nlargest(10, high_priority_items, key=itemgetter("days_waiting")),
             stats=stats,
-            recent_activity=recent_activity[:10]  # Limit to 10
+            recent_activity=heapq.nlargest(10, recent_activity, key=itemgetter("time"))
         )
 
     except Exception as e:
@@ -6082,6 +6975,7 @@ async def upload_knowledge_base_document(
         }).execute()
 
         if result.data:
+            _invalidate_kb_context()
             return KnowledgeBaseUploadResponse(
                 success=True,
                 document_id=result.data[0]["id"],
@@ -6146,6 +7040,7 @@ def delete_knowledge_base_document(
             .execute()
 
         if result.data:
+            _invalidate_kb_context()
             return {"success": True, "message": "Document deleted"}
         else:
             raise HTTPException(status_code=404, detail="Document not found or access denied")
@@ -6155,6 +7050,18 @@ def delete_knowledge_base_document(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/knowledge-base/invalidate")
+def invalidate_knowledge_base_cache(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Drop the cached knowledge base context so edits made outside the app show up immediately (admin only)."""
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    _invalidate_kb_context()
+    return {"success": True}
+
+
 # ============================================================================
 # MICROSOFT TEAMS INTEGRATION ENDPOINTS
 # ============================================================================
@@ -6303,8 +7210,6 @@ def get_tool_impact_report(
         win/loss rates, and velocity metrics for both periods.
     """
     try:
-        from modules.tool_impact_analyzer import ToolImpactAnalyzer
-
         analyzer = ToolImpactAnalyzer()
         report = analyzer.generate_impact_report(
             before_days=before_days,
@@ -6333,8 +7238,6 @@ def get_lead_sources(
         List of source names available in Odoo.
     """
     try:
-        from modules.tool_impact_analyzer import ToolImpactAnalyzer
-
         analyzer = ToolImpactAnalyzer()
         sources = analyzer.get_available_sources()
 
@@ -6356,8 +7259,6 @@ def get_saved_impact_reports(
     Get list of saved tool impact reports for the current user.
     """
     try:
-        from api.supabase_client import get_supabase_client
-
         supabase = get_supabase_client()
         if not supabase.is_connected():
             return {"success": True, "reports": []}
@@ -6390,8 +7291,6 @@ def save_impact_report(
     Save a tool impact report for the current user.
     """
     try:
-        from api.supabase_client import get_supabase_client
-
         supabase = get_supabase_client()
         if not supabase.is_connected():
             raise HTTPException(status_code=503, detail="Database not available")
@@ -5,14 +5,22 @@ Handles connection to Supabase for analysis caching and user collaboration.
 
 import os
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
-from supabase import create_client, Client
+import httpx
+from supabase import create_client, Client, ClientOptions
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by every PostgREST/auth/storage call of the client
+SUPABASE_HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+SUPABASE_HTTP_TIMEOUT = 30.0
+
+# Graph conversation ids are long; keep each IN (...) filter well under URL limits
+CLASSIFICATION_LOOKUP_CHUNK = 50
+
 
 class SupabaseClient:
     """Client for interacting with Supabase database."""
@@ -27,10 +35,18 @@ class SupabaseClient:
             self.client: Optional[Client] = None
         else:
             try:
+                # One pooled HTTP/2 client so requests reuse TCP/TLS connections
+                self.http_client = httpx.Client(
+                    limits=SUPABASE_HTTP_LIMITS,
+                    timeout=SUPABASE_HTTP_TIMEOUT,
+                    http2=True,
+                    follow_redirects=True,
+                )
                 # Create client with named parameters for better compatibility
                 self.client = create_client(
                     supabase_url=self.url,
-                    supabase_key=self.key
+                    supabase_key=self.key,
+                    options=ClientOptions(httpx_client=self.http_client)
                 )
                 logger.info("✅ Supabase client initialized successfully")
             except Exception as e:
@@ -66,35 +82,22 @@ class SupabaseClient:
             return None
 
         try:
-            # Query for matching cache entry
-            result = (
-                self.client.table("analysis_cache")
-                .select("*")
-                .eq("user_id", user_id)
-                .eq("analysis_type", analysis_type)
-                .contains("parameters", parameters)  # JSONB contains check
-                .order("created_at", desc=True)
-                .limit(1)
-                .execute()
-            )
+            # One call returns the newest live entry and purges expired ones
+            result = self.client.rpc(
+                "get_analysis_cache",
+                {
+                    "p_user_id": user_id,
+                    "p_analysis_type": analysis_type,
+                    "p_parameters": parameters,
+                },
+            ).execute()
 
             if not result.data:
                 logger.info(f"No cache found for user {user_id}, type {analysis_type}")
                 return None
 
-            cache_entry = result.data[0]
-
-            # Check if expired
-            if cache_entry.get("expires_at"):
-                expires_at = datetime.fromisoformat(cache_entry["expires_at"].replace("Z", "+00:00"))
-                if datetime.now(expires_at.tzinfo) > expires_at:
-                    logger.info(f"Cache expired for user {user_id}, type {analysis_type}")
-                    # Delete expired entry
-                    self.delete_analysis_cache(cache_entry["id"])
-                    return None
-
             logger.info(f"✅ Cache hit for user {user_id}, type {analysis_type}")
-            return cache_entry["results"]
+            return result.data
 
         except Exception as e:
             logger.error(f"Error retrieving cached analysis: {e}")
@@ -324,6 +327,36 @@ class SupabaseClient:
             logger.error(f"Error fetching sent assignments: {e}")
             return []
 
+    def get_user_assignments(
+        self,
+        user_id: int,
+        status: Optional[str] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get assignments received and sent by a user in a single query."""
+        if not self.client:
+            return {"received": [], "sent": []}
+
+        try:
+            query = (
+                self.client.table("lead_assignments")
+                .select("*")
+                .or_(f"assigned_to_user_id.eq.{user_id},assigned_from_user_id.eq.{user_id}")
+                .order("assigned_at", desc=True)
+            )
+
+            if status:
+                query = query.eq("status", status)
+
+            rows = query.execute().data or []
+            return {
+                "received": [row for row in rows if row.get("assigned_to_user_id") == user_id],
+                "sent": [row for row in rows if row.get("assigned_from_user_id") == user_id],
+            }
+
+        except Exception as e:
+            logger.error(f"Error fetching user assignments: {e}")
+            return {"received": [], "sent": []}
+
     def update_assignment_status(
         self,
         assignment_id: str,
@@ -413,6 +446,73 @@ class SupabaseClient:
             logger.error(f"Error upserting user preferences: {e}")
             return False
 
+    # ============================================================================
+    # Thread Classification Cache Methods
+    # ============================================================================
+
+    def get_thread_classifications(
+        self,
+        keys: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Fetch stored lead/noise classifications.
+
+        Args:
+            keys: (conversation_id, last_message_id) pairs
+
+        Returns:
+            Classification per key that has one stored
+        """
+        if not self.client or not keys:
+            return {}
+
+        wanted = set(keys)
+        conversation_ids = sorted({conversation_id for conversation_id, _ in wanted})
+        found: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        try:
+            for start in range(0, len(conversation_ids), CLASSIFICATION_LOOKUP_CHUNK):
+                result = (
+                    self.client.table("ai_classification_cache")
+                    .select("conversation_id,last_message_id,classification")
+                    .in_("conversation_id", conversation_ids[start:start + CLASSIFICATION_LOOKUP_CHUNK])
+                    .execute()
+                )
+                for row in result.data or []:
+                    key = (row["conversation_id"], row["last_message_id"])
+                    if key in wanted:
+                        found[key] = row["classification"]
+        except Exception as e:
+            logger.error(f"Error fetching thread classifications: {e}")
+
+        return found
+
+    def save_thread_classifications(
+        self,
+        classifications: Dict[Tuple[str, str], Dict[str, Any]]
+    ) -> bool:
+        """Store classifications keyed by (conversation_id, last_message_id)."""
+        if not self.client or not classifications:
+            return False
+
+        try:
+            rows = [
+                {
+                    "conversation_id": conversation_id,
+                    "last_message_id": last_message_id,
+                    "classification": classification,
+                }
+                for (conversation_id, last_message_id), classification in classifications.items()
+            ]
+            self.client.table("ai_classification_cache").upsert(
+                rows, on_conflict="conversation_id,last_message_id"
+            ).execute()
+            return True
+
+        except Exception as e:
+            logger.error(f"Error saving thread classifications: {e}")
+            return False
+
     # ============================================================================
     # Utility Methods
     # ============================================================================
@@ -109,6 +109,15 @@ class Config:
     PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
     PERPLEXITY_MODEL = os.getenv("PERPLEXITY_MODEL", "sonar-pro")
     PERPLEXITY_API_BASE = os.getenv("PERPLEXITY_API_BASE", "https://api.perplexity.ai")
+    # Write raw batch responses to the temp dir for debugging parser issues
+    PERPLEXITY_DEBUG_DUMP = _env_bool("PERPLEXITY_DEBUG_DUMP", False)
+    # Perplexity requests in flight at once for the streaming batch enrichment
+    PERPLEXITY_STREAM_CONCURRENCY = _env_int("PERPLEXITY_STREAM_CONCURRENCY", 8)
+    # Process-wide Perplexity request rate (requests/second) and burst size
+    PERPLEXITY_REQUESTS_PER_SECOND = _env_float("PERPLEXITY_REQUESTS_PER_SECOND", 1.0)
+    PERPLEXITY_BURST = _env_int("PERPLEXITY_BURST", 4)
+    # Retries for 429/5xx/timeouts, with exponential backoff between attempts
+    PERPLEXITY_MAX_RETRIES = _env_int("PERPLEXITY_MAX_RETRIES", 3)
 
     # Lost lead analysis
     LOST_LEAD_MAX_NOTES = _env_int("LOST_LEAD_MAX_NOTES", 12)
@@ -126,6 +135,10 @@ class Config:
     # Microsoft Teams Integration
     TEAMS_TEAM_ID = os.getenv("TEAMS_TEAM_ID")  # Optional: specific team ID for member list
 
+    # Shared response cache (optional). When set, hot payloads such as the
+    # dashboard summary are shared across uvicorn workers via Redis.
+    REDIS_URL = os.getenv("REDIS_URL")
+
     @classmethod
     def validate(cls) -> Dict[str, Any]:
         """Validate required configuration values."""
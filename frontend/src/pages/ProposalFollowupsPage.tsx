@@ -24,6 +24,12 @@ import { StarIcon as StarIconSolid } from '@heroicons/react/24/solid';
 import api from '../utils/api';
 import AssignLeadModal from '../components/AssignLeadModal';
 
+// Report jobs live in server memory: poll every few seconds, tolerate brief
+// network errors, and give up well past the ~20 minute worst case
+const REPORT_JOB_POLL_INTERVAL_MS = 5000;
+const REPORT_JOB_TIMEOUT_MS = 40 * 60 * 1000;
+const REPORT_JOB_MAX_POLL_ERRORS = 5;
+
 interface ProposalFollowupSummary {
   unanswered_count: number;
   pending_proposals_count: number;
@@ -398,7 +404,8 @@ const ProposalFollowupsPage: React.FC = () => {
     try {
       const response = await api.refineDraft({
         current_draft: draftEmail,
-        edit_prompt: editPrompt
+        edit_prompt: editPrompt,
+        thread_data: selectedThread ?? {}
       });
       setDraftEmail(response.data.refined_draft || '');
       setEditPrompt('');
@@ -1422,16 +1429,43 @@ const ProposalFollowupsPage: React.FC = () => {
                   setShowGenerateReportModal(false);
 
                   try {
-                    await toast.promise(
-                      api.generateReport({
+                    const generateAndWait = async () => {
+                      const { data: job } = await api.generateReport({
                         report_type: 'complete',
                         no_response_days: noResponseDays,
                         engage_email: 'automated.response@prezlab.com'
-                      }),
+                      });
+                      // Generation runs as a background job on the server; poll until it settles
+                      const deadline = Date.now() + REPORT_JOB_TIMEOUT_MS;
+                      let pollErrors = 0;
+                      while (Date.now() < deadline) {
+                        await new Promise((resolve) => setTimeout(resolve, REPORT_JOB_POLL_INTERVAL_MS));
+                        let status: any;
+                        try {
+                          ({ data: status } = await api.getReportJob(job.job_id));
+                          pollErrors = 0;
+                        } catch (error: any) {
+                          if (error.response?.status === 404) {
+                            // The server restarted and dropped the job
+                            throw new Error('The report job was lost because the server restarted. Please run the report again.');
+                          }
+                          pollErrors += 1;
+                          if (pollErrors >= REPORT_JOB_MAX_POLL_ERRORS) {
+                            throw new Error('Lost contact with the server. Check the Reports tab before running the report again.');
+                          }
+                          continue;
+                        }
+                        if (status.status === 'completed') return status;
+                        if (status.status === 'failed') throw new Error(status.error || 'Report generation failed');
+                      }
+                      throw new Error('The report is taking longer than expected. Check the Reports tab later.');
+                    };
+                    await toast.promise(
+                      generateAndWait(),
                       {
                         loading: 'Generating complete report... (estimated up to 20 minutes)',
                         success: 'Report generated successfully!',
-                        error: 'Failed to generate report'
+                        error: (error: Error) => error.message || 'Failed to generate report'
                       }
                     );
                     // Invalidate and refetch reports query to show the new report
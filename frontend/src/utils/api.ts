@@ -95,6 +95,8 @@ export const api = {
     apiClient.get('/proposal-followups/reports', { params }),
   generateReport: (data: { report_type: '90day' | 'monthly' | 'weekly' | 'complete'; days_back?: number; no_response_days?: number; engage_email?: string }) =>
     apiClient.post('/proposal-followups/reports/generate', data),
+  getReportJob: (jobId: string) =>
+    apiClient.get(`/proposal-followups/reports/jobs/${jobId}`),
   deleteReport: (reportId: string) =>
     apiClient.delete(`/proposal-followups/reports/${reportId}`),
   exportReport: (reportId: string) =>
@@ -113,7 +115,7 @@ export const api = {
     apiClient.delete(`/proposal-followups/${thread_id}/favorite`),
   generateDraft: (data: { thread_data: any }) =>
     apiClient.post('/proposal-followups/generate-draft', data),
-  refineDraft: (data: { current_draft: string; edit_prompt: string }) =>
+  refineDraft: (data: { current_draft: string; edit_prompt: string; thread_data?: any }) =>
     apiClient.post('/proposal-followups/refine-draft', data),
   sendFollowupEmail: (data: { conversation_id: string; draft_body: string; subject: string; reply_to_message_id?: string }) =>
     apiClient.post('/proposal-followups/send-email', data),
@@ -1,13 +1,37 @@
 """Supabase-based storage for OAuth2 email tokens (multi-user support)."""
 
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
 
 from api.supabase_database import SupabaseDatabase
+from modules.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Process-wide read-through cache of token rows, shared by every store instance.
+# Writes through a store update it; the TTL bounds staleness from other processes.
+# Entries are (row, time.monotonic() at which the access token expires), so
+# expiry checks never re-parse the row's expires_at.
+TOKEN_CACHE_TTL_SECONDS = 300
+TOKEN_EXPIRY_BUFFER_SECONDS = 300
+_token_cache = TTLCache(maxsize=1024, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+
+def _expiry_deadline(expires_at_str: Optional[str]) -> float:
+    """Convert a stored expires_at into a time.monotonic() deadline (0 if unreadable)."""
+    if not expires_at_str:
+        return 0.0
+    try:
+        expires_at = datetime.fromisoformat(expires_at_str.replace("Z", "+00:00"))
+    except ValueError:
+        return 0.0
+    # Rows written by save_tokens are naive UTC; Supabase returns them with an offset
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return time.monotonic() + (expires_at - datetime.now(timezone.utc)).total_seconds()
+
 
 class EmailTokenStore:
     """Store and retrieve OAuth2 tokens for multiple users in Supabase."""
@@ -57,7 +81,17 @@ class EmailTokenStore:
             )
 
             if success:
+                _token_cache.set(user_identifier, ({
+                    "user_identifier": user_identifier,
+                    "access_token": access_token,
+                    "refresh_token": refresh_token,
+                    "expires_at": expires_at.isoformat(),
+                    "user_email": user_email,
+                    "user_name": user_name,
+                }, time.monotonic() + expires_in))
                 logger.info(f"Saved tokens for user: {user_identifier}")
+            else:
+                _token_cache.pop(user_identifier)
             return success
 
         except Exception as e:
@@ -66,7 +100,7 @@ class EmailTokenStore:
 
     def get_tokens(self, user_identifier: str) -> Optional[Dict[str, Any]]:
         """
-        Retrieve tokens for a user from Supabase.
+        Retrieve tokens for a user, from the in-process cache or Supabase.
 
         Args:
             user_identifier: Unique identifier for user
@@ -74,6 +108,15 @@ class EmailTokenStore:
         Returns:
             Dictionary with token data, or None if not found
         """
+        entry = self._cached_entry(user_identifier)
+        return entry[0] if entry else None
+
+    def _cached_entry(self, user_identifier: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return the (row, expiry deadline) cache entry, loading it from Supabase on a miss."""
+        entry = _token_cache.get(user_identifier)
+        if entry is not None:
+            return entry
+
         try:
             data = self.db.get_email_tokens(user_identifier)
 
@@ -81,28 +124,42 @@ class EmailTokenStore:
                 logger.debug(f"No tokens found for user: {user_identifier}")
                 return None
 
-            return data
+            entry = (data, _expiry_deadline(data.get("expires_at")))
+            _token_cache.set(user_identifier, entry)
+            return entry
 
         except Exception as e:
             logger.error(f"Error loading tokens for {user_identifier}: {e}")
             return None
 
+    def seconds_until_expiry(self, user_identifier: str) -> float:
+        """Seconds left on the user's access token; 0 if missing or unreadable."""
+        entry = self._cached_entry(user_identifier)
+        if not entry:
+            return 0.0
+        return max(0.0, entry[1] - time.monotonic())
+
     def is_token_expired(self, user_identifier: str) -> bool:
-        """Check if user's access token is expired."""
-        data = self.get_tokens(user_identifier)
-        if not data:
-            return True
+        """Check if user's access token is expired (with a 5 minute buffer)."""
+        return self.seconds_until_expiry(user_identifier) <= TOKEN_EXPIRY_BUFFER_SECONDS
 
-        expires_at_str = data.get("expires_at")
-        if not expires_at_str:
-            return True
+    def get_status(self, user_identifier: str) -> Dict[str, Any]:
+        """Authorization status from a single token lookup.
 
-        try:
-            expires_at = datetime.fromisoformat(expires_at_str)
-            # Add 5 minute buffer
-            return datetime.utcnow() >= (expires_at - timedelta(minutes=5))
-        except:
-            return True
+        Returns:
+            Dictionary with authorized, user_email, user_name and expires_soon
+        """
+        entry = self._cached_entry(user_identifier)
+        if not entry:
+            return {"authorized": False, "user_email": None, "user_name": None, "expires_soon": False}
+
+        data, expires_monotonic = entry
+        return {
+            "authorized": True,
+            "user_email": data.get("user_email"),
+            "user_name": data.get("user_name"),
+            "expires_soon": expires_monotonic - time.monotonic() <= TOKEN_EXPIRY_BUFFER_SECONDS,
+        }
 
     def update_access_token(
         self,
@@ -122,14 +179,28 @@ class EmailTokenStore:
 
             if not success:
                 logger.error(f"Cannot update token - no data found for {user_identifier}")
-
+                _token_cache.pop(user_identifier)
+                return success
+
+            cached = _token_cache.get(user_identifier)
+            if cached is not None:
+                _token_cache.set(user_identifier, ({
+                    **cached[0],
+                    "access_token": access_token,
+                    "expires_at": expires_at.isoformat(),
+                }, time.monotonic() + expires_in))
             return success
         except Exception as e:
             logger.error(f"Error updating token for {user_identifier}: {e}")
             return False
 
+    def invalidate(self, user_identifier: str) -> None:
+        """Drop the cached row so the next read goes back to Supabase."""
+        _token_cache.pop(user_identifier)
+
     def delete_tokens(self, user_identifier: str) -> bool:
         """Delete tokens for a user (e.g., on logout/revocation) from Supabase."""
+        _token_cache.pop(user_identifier)
         try:
             success = self.db.delete_email_tokens(user_identifier)
             if success:
@@ -1,6 +1,7 @@
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
 
 from openai import OpenAI
 
@@ -8,6 +9,9 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Requests in flight at once for a single batch_chat_completion call
+BATCH_MAX_CONCURRENCY = 8
+
 
 class LLMClient:
     """Thin wrapper around OpenAI's chat/completions API."""
@@ -23,15 +27,14 @@ class LLMClient:
         )
         self.model = self.config.OPENAI_MODEL
 
-    def chat_completion(
+    def _completion_params(
         self,
         messages: List[Dict[str, str]],
-        *,
-        max_tokens: Optional[int] = None,
-        temperature: Optional[float] = None,
-        response_format: Optional[Dict[str, Any]] = None,
-    ) -> str:
-        """Execute a chat completion and return the content of the first choice."""
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        response_format: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Build chat/completions parameters for the configured model."""
         model_lower = self.model.lower()
 
         params: Dict[str, Any] = {
@@ -53,6 +56,18 @@ class LLMClient:
 
         if response_format:
             params["response_format"] = response_format
+        return params
+
+    def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Execute a chat completion and return the content of the first choice."""
+        params = self._completion_params(messages, max_tokens, temperature, response_format)
 
         try:
             response = self.client.chat.completions.create(**params)
@@ -67,6 +82,61 @@ class LLMClient:
             raise RuntimeError("LLM response missing content")
         return content
 
+    def batch_chat_completion(
+        self,
+        messages_batch: Sequence[List[Dict[str, str]]],
+        *,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> List[Union[str, Exception]]:
+        """Run several chat completions with shared parameters.
+
+        The chat/completions API takes one conversation per request, so the
+        batch is issued concurrently over the client's connection pool. Results
+        are returned in input order; a failed item holds its exception instead
+        of failing the whole batch.
+        """
+        def run(messages: List[Dict[str, str]]) -> Union[str, Exception]:
+            try:
+                return self.chat_completion(
+                    messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    response_format=response_format,
+                )
+            except Exception as exc:
+                return exc
+
+        if len(messages_batch) == 1:
+            return [run(messages_batch[0])]
+        with ThreadPoolExecutor(max_workers=min(BATCH_MAX_CONCURRENCY, len(messages_batch))) as pool:
+            return list(pool.map(run, messages_batch))
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[str]:
+        """Execute a streaming chat completion, yielding content deltas as they arrive."""
+        params = self._completion_params(messages, max_tokens, temperature, response_format)
+
+        try:
+            stream = self.client.chat.completions.create(stream=True, **params)
+        except Exception as exc:
+            logger.error("LLM streaming chat completion failed: %s", exc)
+            raise
+
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta and delta.content:
+                yield delta.content
+
     def chat_completion_json(
         self,
         messages: List[Dict[str, str]],
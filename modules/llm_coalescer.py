@@ -0,0 +1,94 @@
+"""
+Request-coalescing front end for LLMClient chat completions in async handlers.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from modules.llm_client import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+class LLMRequestCoalescer:
+    """Share chat completions between concurrent identical requests.
+
+    This dedupes; it does not batch. The chat/completions API takes one
+    conversation per request, so there is nothing to gain from holding
+    requests back to group them. Each submit runs ``LLMClient.chat_completion``
+    in a worker thread right away. A request whose messages and parameters
+    match a completion already in flight awaits that completion instead of
+    starting another, e.g. a double-clicked "analyze" or two tabs opening the
+    same thread.
+
+    Sampled (temperature > 0) completions are shared too: identical requests
+    in flight at the same moment get the same text, not independent samples.
+    Once the completion finishes, the next identical request samples afresh.
+
+    A caller that is cancelled stops waiting without cancelling the
+    completion for the others.
+    """
+
+    def __init__(self, llm_factory: Callable[[], LLMClient] = LLMClient) -> None:
+        self._llm_factory = llm_factory
+        self._llm: Optional[LLMClient] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def submit(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Run one chat completion, joining an identical one already in flight."""
+        params = {
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "response_format": response_format,
+        }
+        key = json.dumps([messages, params], sort_keys=True)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._complete(messages, params))
+            # The map also holds the reference that keeps the task alive until it finishes
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            logger.debug("LLM completion joined an identical request in flight")
+        return await asyncio.shield(task)
+
+    async def submit_json(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """submit() with a JSON response format, parsed like LLMClient.chat_completion_json."""
+        raw = await self.submit(
+            messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            response_format={"type": "json_object"},
+        )
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning("LLM response not valid JSON; returning raw text.")
+            return {"raw_text": raw}
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieve it here too, in case every caller was cancelled before it finished
+            logger.debug("LLM completion failed: %s", task.exception())
+
+    async def _complete(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        if self._llm is None:
+            self._llm = self._llm_factory()
+        return await asyncio.to_thread(self._llm.chat_completion, messages, **params)
@@ -8,6 +8,7 @@ from modules.llm_client import LLMClient
 from modules.odoo_client import OdooClient
 from modules.outlook_client import OutlookClient
 from modules.email_token_store import EmailTokenStore
+from modules.token_refresh import refresh_stored_access_token
 
 logger = logging.getLogger(__name__)
 
@@ -133,14 +134,7 @@ class LostLeadAnalyzer:
             access_token = tokens.get("access_token")
             if token_store.is_token_expired(system_identifier):
                 logger.info("Refreshing expired system token")
-                refresh_token = tokens.get("refresh_token")
-                token_response = outlook.refresh_access_token(refresh_token)
-                access_token = token_response.get("access_token")
-                token_store.update_access_token(
-                    system_identifier,
-                    access_token,
-                    token_response.get("expires_in", 3600)
-                )
+                access_token = refresh_stored_access_token(token_store, outlook, system_identifier)
 
             # Collect all possible contact emails
             contact_emails = []
@@ -6,10 +6,17 @@ from typing import Dict, List, Any, Tuple, Optional, Iterable
 import requests
 from itertools import count
 from config import Config
+from modules.ttl_cache import TTLCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Salesperson name -> res.users id barely changes, so lookups are shared across
+# clients for a while. Keyed on (Odoo URL, database, name): ids are per
+# database, not per login. Names that are not found are not cached.
+USER_ID_CACHE_TTL_SECONDS = 600
+_user_id_cache = TTLCache(maxsize=128, ttl=USER_ID_CACHE_TTL_SECONDS)
+
 class OdooRpcError(Exception):
     """Custom exception for Odoo RPC errors"""
     pass
@@ -98,7 +105,12 @@ class OdooClient:
             return False
     
     def find_user_id(self, name: str) -> Optional[int]:
-        """Find user ID by name"""
+        """Find user ID by name (cached for USER_ID_CACHE_TTL_SECONDS)"""
+        cache_key = (self.config.ODOO_URL, self.config.ODOO_DB, name)
+        cached = _user_id_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             # Exact match first
             users = self._call_kw('res.users', 'search_read', [], {
@@ -106,19 +118,21 @@ class OdooClient:
                 'fields': ['name'],
                 'limit': 1,
             })
-            if users:
-                return users[0]['id']
-            
-            # Fallback to ilike
-            users = self._call_kw('res.users', 'search_read', [], {
-                'domain': [['name', 'ilike', name]],
-                'fields': ['name'],
-                'limit': 1,
-            })
-            if users:
-                return users[0]['id']
-            
-            return None
+            if not users:
+                # Fallback to ilike
+                users = self._call_kw('res.users', 'search_read', [], {
+                    'domain': [['name', 'ilike', name]],
+                    'fields': ['name'],
+                    'limit': 1,
+                })
+
+            if not users:
+                # Not cached: callers treat None as "no salesperson filter", and
+                # the user may be created or renamed at any moment
+                return None
+            user_id = users[0]['id']
+            _user_id_cache.set(cache_key, user_id)
+            return user_id
         except Exception as e:
             logger.error(f"Error finding user '{name}': {e}")
             return None
@@ -213,17 +227,18 @@ class OdooClient:
         chunk_size = 50
         for start_index in range(0, len(unique_emails), chunk_size):
             chunk = unique_emails[start_index:start_index + chunk_size]
+            # email_from keeps whatever case the lead was created with, so OR
+            # together =ilike terms rather than an exact 'in' match
+            domain: List[Any] = ['|'] * (len(chunk) - 1) + [['email_from', '=ilike', email] for email in chunk]
             if user_id:
-                domain: List[Any] = [['user_id', '=', user_id], ['email_from', 'in', chunk]]
-            else:
-                domain = [['email_from', 'in', chunk]]
+                domain = ['&', ['user_id', '=', user_id]] + domain
 
             try:
                 records = self._call_kw(
                     'crm.lead',
                     'search_read',
                     [domain],
-                    {'fields': fields_to_fetch, 'limit': len(chunk)},
+                    {'fields': fields_to_fetch},
                 )
             except Exception as exc:
                 logger.error("Error fetching leads by email chunk: %s", exc)
@@ -231,7 +246,9 @@ class OdooClient:
 
             for record in records or []:
                 email_value = (record.get('email_from') or '').strip().lower()
-                if not email_value:
+                # Records come back in the model's default order; keep the first
+                # per address, as search_lead_by_email does
+                if not email_value or email_value in results:
                     continue
 
                 processed = dict(record)
@@ -455,177 +472,251 @@ class OdooClient:
             logger.error(f"Error extracting leads: {e}")
             return []
     
+    # crm.lead fields read before an enrichment update to find which are still empty
+    _UPDATE_READ_FIELDS = [
+        'partner_name', 'contact_name', 'website', 'email_from',
+        'function', 'phone', 'mobile', 'x_studio_linkedin_profile',
+        'x_studio_quality', 'city', 'source_id', 'description'
+    ]
+
     def update_lead(self, lead_id: int, values: Dict[str, Any]) -> bool:
         """Update a lead in Odoo with enriched data (only updates empty fields)"""
+        return self.update_leads([(lead_id, values)]).get(lead_id, False)
+
+    def update_leads(self, lead_updates: List[Tuple[int, Dict[str, Any]]]) -> Dict[int, bool]:
+        """Update several leads with enriched data (only updates empty fields).
+
+        Current values for every lead are read in one call, and leads that end
+        up with identical field values share a single write. Returns success
+        per lead id.
+        """
+        results: Dict[int, bool] = {}
+        if not lead_updates:
+            return results
+
+        # First, fetch current lead data to check which fields are empty
+        lead_ids = list(dict.fromkeys(lead_id for lead_id, _ in lead_updates))
         try:
-            # First, fetch current lead data to check which fields are empty
-            current_lead = self._call_kw(
+            current_rows = self._call_kw(
                 'crm.lead', 'read',
-                [[lead_id]],
-                {'fields': [
-                    'partner_name', 'contact_name', 'website', 'email_from',
-                    'function', 'phone', 'mobile', 'x_studio_linkedin_profile',
-                    'x_studio_quality', 'city', 'source_id'
-                ]}
+                [lead_ids],
+                {'fields': self._UPDATE_READ_FIELDS}
             )
+        except Exception as e:
+            logger.error(f"Error reading leads {lead_ids} for update: {e}")
+            return {lead_id: False for lead_id, _ in lead_updates}
+
+        current_by_id = {row['id']: row for row in current_rows or []}
+        # Country / source lookups shared across the batch
+        lookups: Dict[Tuple[str, str], Any] = {}
+        # Identical value sets -> one crm.lead write for all their ids
+        write_groups: Dict[Tuple[Tuple[str, Any], ...], List[int]] = {}
 
-            if not current_lead:
+        for lead_id, values in lead_updates:
+            current_data = current_by_id.get(lead_id)
+            if not current_data:
                 logger.error(f"Lead {lead_id} not found")
-                return False
+                results[lead_id] = False
+                continue
 
-            current_data = current_lead[0]
+            try:
+                odoo_fields, internal_note = self._prepare_lead_update(lead_id, values, current_data, lookups)
+            except Exception as e:
+                logger.error(f"Error updating lead {lead_id}: {e}")
+                results[lead_id] = False
+                continue
+
+            # Append to description field (Internal Notes tab) in the same write
+            if internal_note:
+                current_description = current_data.get('description') or ''
+                if current_description.strip():
+                    odoo_fields['description'] = f"{current_description}\n\n---\n\n{internal_note}"
+                else:
+                    odoo_fields['description'] = internal_note
+                current_data['description'] = odoo_fields['description']
+
+            results[lead_id] = True
+            if odoo_fields:
+                logger.info(f"Updating lead {lead_id} with fields: {list(odoo_fields.keys())}")
+                write_groups.setdefault(tuple(sorted(odoo_fields.items())), []).append(lead_id)
 
-            def is_empty(value):
-                """Check if a field value is considered empty - CONSERVATIVE approach"""
-                # None is definitely empty
-                if value is None:
+        for field_items, ids in write_groups.items():
+            try:
+                self._call_kw('crm.lead', 'write', [ids, dict(field_items)])
+                logger.info(f"Successfully updated lead(s) {ids} with enriched data")
+            except Exception as e:
+                logger.error(f"Error updating leads {ids}: {e}")
+                for lead_id in ids:
+                    results[lead_id] = False
+
+        return results
+
+    def _prepare_lead_update(
+        self,
+        lead_id: int,
+        values: Dict[str, Any],
+        current_data: Dict[str, Any],
+        lookups: Dict[Tuple[str, str], Any],
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Map enrichment values onto the empty crm.lead fields; returns (fields, internal note)."""
+
+        def is_empty(value):
+            """Check if a field value is considered empty - CONSERVATIVE approach"""
+            # None is definitely empty
+            if value is None:
+                return True
+            # False for non-boolean fields means empty in Odoo
+            if value is False:
+                return True
+            # Empty string
+            if isinstance(value, str):
+                cleaned = value.strip().lower()
+                # Only consider truly empty or explicitly marked as not found
+                if cleaned == '':
+                    return True
+                # These are placeholder values from failed enrichment
+                if cleaned in ['none', 'n/a', 'not found', 'false']:
                     return True
-                # False for non-boolean fields means empty in Odoo
-                if value is False:
+                # HTML fields in Odoo may contain only tags with no real content
+                # Strip HTML tags and check if empty
+                import re as regex_module
+                text_only = regex_module.sub(r'<[^>]+>', '', cleaned).strip()
+                if text_only == '':
                     return True
-                # Empty string
-                if isinstance(value, str):
-                    cleaned = value.strip().lower()
-                    # Only consider truly empty or explicitly marked as not found
-                    if cleaned == '':
-                        return True
-                    # These are placeholder values from failed enrichment
-                    if cleaned in ['none', 'n/a', 'not found', 'false']:
-                        return True
-                    # HTML fields in Odoo may contain only tags with no real content
-                    # Strip HTML tags and check if empty
-                    import re as regex_module
-                    text_only = regex_module.sub(r'<[^>]+>', '', cleaned).strip()
-                    if text_only == '':
-                        return True
-                    # If it has any other content, it's NOT empty
-                    return False
-                # For any other type, assume it has data
+                # If it has any other content, it's NOT empty
                 return False
+            # For any other type, assume it has data
+            return False
 
-            def clean_phone(phone_str):
-                """Remove (from lead) suffix from phone numbers"""
-                if not phone_str:
-                    return phone_str
-                # Remove "(from lead)" or any variant
-                cleaned = re.sub(r'\s*\(from lead\)\s*', '', phone_str, flags=re.IGNORECASE)
-                return cleaned.strip()
-
-            # Map our column names to Odoo field names based on your requirements
-            odoo_fields = {}
-
-            # Company Name (partner_name in crm.lead)
-            if 'Company Name' in values and values['Company Name']:
-                current_value = current_data.get('partner_name')
-                new_value = str(values['Company Name']).strip()
-                if is_empty(current_value):
-                    logger.info(f"Lead {lead_id}: Will update Company Name from {repr(current_value)} to {repr(new_value)}")
-                    odoo_fields['partner_name'] = new_value
-                else:
-                    logger.info(f"Lead {lead_id}: SKIPPING Company Name update - current value {repr(current_value)} is not empty")
-
-            # Contact Name (contact_name in crm.lead)
-            if 'Full Name' in values and values['Full Name']:
-                current_value = current_data.get('contact_name')
-                new_value = str(values['Full Name']).strip()
-                if is_empty(current_value):
-                    logger.info(f"Lead {lead_id}: Will update Contact Name from {repr(current_value)} to {repr(new_value)}")
-                    odoo_fields['contact_name'] = new_value
-                else:
-                    logger.info(f"Lead {lead_id}: SKIPPING Contact Name update - current value {repr(current_value)} is not empty")
-
-            # Website (website in crm.lead)
-            if 'website' in values and values['website']:
-                if is_empty(current_data.get('website')):
-                    website = str(values['website']).strip()
-                    # Validate URL before sending to Odoo
-                    if website and self._is_valid_url(website):
-                        if not website.startswith(('http://', 'https://')):
-                            website = f'https://{website}'
-                        odoo_fields['website'] = website
-                        logger.debug(f"Lead {lead_id}: Setting website to '{website}'")
-                    else:
-                        logger.warning(f"Lead {lead_id}: Skipping invalid website URL: '{website}'")
-
-            # Language (lang_id in crm.lead) - would need to map to language ID
-            # For now, we'll skip this as it requires language code mapping
-
-            # Email (email_from in crm.lead)
-            if 'email' in values and values['email']:
-                if is_empty(current_data.get('email_from')):
-                    email = str(values['email']).strip()
-                    if '@' in email:
-                        odoo_fields['email_from'] = email
-
-            # Job Position (function in crm.lead)
-            if 'Job Role' in values and values['Job Role']:
-                if is_empty(current_data.get('function')):
-                    odoo_fields['function'] = str(values['Job Role']).strip()
-
-            # Phone (phone in crm.lead)
-            if 'Phone' in values and values['Phone']:
-                if is_empty(current_data.get('phone')):
-                    phone = clean_phone(str(values['Phone']).strip())
-                    if phone and phone.lower() not in ['not found', 'n/a', 'none']:
-                        odoo_fields['phone'] = phone
-
-            # Mobile (mobile in crm.lead)
-            if 'Mobile' in values and values['Mobile']:
-                if is_empty(current_data.get('mobile')):
-                    mobile = clean_phone(str(values['Mobile']).strip())
-                    if mobile and mobile.lower() not in ['not found', 'n/a', 'none']:
-                        odoo_fields['mobile'] = mobile
-
-            # LinkedIn Profile (x_studio_linkedin_profile)
-            if 'LinkedIn Link' in values and values['LinkedIn Link']:
-                current_value = current_data.get('x_studio_linkedin_profile')
-                new_value = str(values['LinkedIn Link']).strip()
-                if is_empty(current_value):
-                    if new_value and new_value.lower() not in ['not found', 'n/a', 'none']:
-                        # Store as HTML link for the HTML field
-                        linkedin_html = f'<a href="{new_value}" target="_blank">{new_value}</a>'
-                        odoo_fields['x_studio_linkedin_profile'] = linkedin_html
-                        logger.info(f"Lead {lead_id}: Will update LinkedIn Profile to {repr(new_value)}")
+        def clean_phone(phone_str):
+            """Remove (from lead) suffix from phone numbers"""
+            if not phone_str:
+                return phone_str
+            # Remove "(from lead)" or any variant
+            cleaned = re.sub(r'\s*\(from lead\)\s*', '', phone_str, flags=re.IGNORECASE)
+            return cleaned.strip()
+
+        # Map our column names to Odoo field names based on your requirements
+        odoo_fields = {}
+
+        # Company Name (partner_name in crm.lead)
+        if 'Company Name' in values and values['Company Name']:
+            current_value = current_data.get('partner_name')
+            new_value = str(values['Company Name']).strip()
+            if is_empty(current_value):
+                logger.info(f"Lead {lead_id}: Will update Company Name from {repr(current_value)} to {repr(new_value)}")
+                odoo_fields['partner_name'] = new_value
+            else:
+                logger.info(f"Lead {lead_id}: SKIPPING Company Name update - current value {repr(current_value)} is not empty")
+
+        # Contact Name (contact_name in crm.lead)
+        if 'Full Name' in values and values['Full Name']:
+            current_value = current_data.get('contact_name')
+            new_value = str(values['Full Name']).strip()
+            if is_empty(current_value):
+                logger.info(f"Lead {lead_id}: Will update Contact Name from {repr(current_value)} to {repr(new_value)}")
+                odoo_fields['contact_name'] = new_value
+            else:
+                logger.info(f"Lead {lead_id}: SKIPPING Contact Name update - current value {repr(current_value)} is not empty")
+
+        # Website (website in crm.lead)
+        if 'website' in values and values['website']:
+            if is_empty(current_data.get('website')):
+                website = str(values['website']).strip()
+                # Validate URL before sending to Odoo
+                if website and self._is_valid_url(website):
+                    if not website.startswith(('http://', 'https://')):
+                        website = f'https://{website}'
+                    odoo_fields['website'] = website
+                    logger.debug(f"Lead {lead_id}: Setting website to '{website}'")
                 else:
-                    logger.info(f"Lead {lead_id}: SKIPPING LinkedIn Profile update - current value {repr(current_value)} is not empty")
-
-            # Quality (x_studio_quality) - selection field with keys like "[0/5]", "[1/5]", etc.
-            if 'Quality (Out of 5)' in values and values['Quality (Out of 5)']:
-                if is_empty(current_data.get('x_studio_quality')):
-                    quality = str(values['Quality (Out of 5)']).strip()
-                    if quality and quality.isdigit():
-                        # Map quality to the selection key format used in Odoo (e.g. '4/5')
-                        quality_key = f"{quality}/5"
-                        odoo_fields['x_studio_quality'] = quality_key
-
-            # City and Country fields if available
-            if 'City' in values and values['City']:
-                if is_empty(current_data.get('city')):
-                    city = str(values['City']).strip()
-                    if city and city.lower() not in ['not found', 'n/a', 'none']:
-                        odoo_fields['city'] = city
-
-            # Country - Map to country_id by looking up the country
-            if 'Country' in values and values['Country']:
-                if is_empty(current_data.get('country_id')):
-                    country_name = str(values['Country']).strip()
-                    if country_name and country_name.lower() not in ['not found', 'n/a', 'none']:
-                        try:
-                            # Search for country in res.country
-                            countries = self._call_kw(
+                    logger.warning(f"Lead {lead_id}: Skipping invalid website URL: '{website}'")
+
+        # Language (lang_id in crm.lead) - would need to map to language ID
+        # For now, we'll skip this as it requires language code mapping
+
+        # Email (email_from in crm.lead)
+        if 'email' in values and values['email']:
+            if is_empty(current_data.get('email_from')):
+                email = str(values['email']).strip()
+                if '@' in email:
+                    odoo_fields['email_from'] = email
+
+        # Job Position (function in crm.lead)
+        if 'Job Role' in values and values['Job Role']:
+            if is_empty(current_data.get('function')):
+                odoo_fields['function'] = str(values['Job Role']).strip()
+
+        # Phone (phone in crm.lead)
+        if 'Phone' in values and values['Phone']:
+            if is_empty(current_data.get('phone')):
+                phone = clean_phone(str(values['Phone']).strip())
+                if phone and phone.lower() not in ['not found', 'n/a', 'none']:
+                    odoo_fields['phone'] = phone
+
+        # Mobile (mobile in crm.lead)
+        if 'Mobile' in values and values['Mobile']:
+            if is_empty(current_data.get('mobile')):
+                mobile = clean_phone(str(values['Mobile']).strip())
+                if mobile and mobile.lower() not in ['not found', 'n/a', 'none']:
+                    odoo_fields['mobile'] = mobile
+
+        # LinkedIn Profile (x_studio_linkedin_profile)
+        if 'LinkedIn Link' in values and values['LinkedIn Link']:
+            current_value = current_data.get('x_studio_linkedin_profile')
+            new_value = str(values['LinkedIn Link']).strip()
+            if is_empty(current_value):
+                if new_value and new_value.lower() not in ['not found', 'n/a', 'none']:
+                    # Store as HTML link for the HTML field
+                    linkedin_html = f'<a href="{new_value}" target="_blank">{new_value}</a>'
+                    odoo_fields['x_studio_linkedin_profile'] = linkedin_html
+                    logger.info(f"Lead {lead_id}: Will update LinkedIn Profile to {repr(new_value)}")
+            else:
+                logger.info(f"Lead {lead_id}: SKIPPING LinkedIn Profile update - current value {repr(current_value)} is not empty")
+
+        # Quality (x_studio_quality) - selection field with keys like "[0/5]", "[1/5]", etc.
+        if 'Quality (Out of 5)' in values and values['Quality (Out of 5)']:
+            if is_empty(current_data.get('x_studio_quality')):
+                quality = str(values['Quality (Out of 5)']).strip()
+                if quality and quality.isdigit():
+                    # Map quality to the selection key format used in Odoo (e.g. '4/5')
+                    quality_key = f"{quality}/5"
+                    odoo_fields['x_studio_quality'] = quality_key
+
+        # City and Country fields if available
+        if 'City' in values and values['City']:
+            if is_empty(current_data.get('city')):
+                city = str(values['City']).strip()
+                if city and city.lower() not in ['not found', 'n/a', 'none']:
+                    odoo_fields['city'] = city
+
+        # Country - Map to country_id by looking up the country
+        if 'Country' in values and values['Country']:
+            if is_empty(current_data.get('country_id')):
+                country_name = str(values['Country']).strip()
+                if country_name and country_name.lower() not in ['not found', 'n/a', 'none']:
+                    try:
+                        # Search for country in res.country (once per batch per name)
+                        lookup_key = ('res.country', country_name.lower())
+                        if lookup_key not in lookups:
+                            lookups[lookup_key] = self._call_kw(
                                 'res.country', 'search_read',
                                 [[['name', 'ilike', country_name]]],
                                 {'fields': ['id', 'name'], 'limit': 1}
                             )
-                            if countries:
-                                odoo_fields['country_id'] = countries[0]['id']
-                                logger.info(f"Setting country to '{countries[0]['name']}' (ID: {countries[0]['id']})")
-                        except Exception as country_error:
-                            logger.warning(f"Error setting country field: {country_error}")
-
-            # Source - Always set to "Inbound" for enriched leads (if not already set)
-            if is_empty(current_data.get('source_id')):
-                try:
+                        countries = lookups[lookup_key]
+                        if countries:
+                            odoo_fields['country_id'] = countries[0]['id']
+                            logger.info(f"Setting country to '{countries[0]['name']}' (ID: {countries[0]['id']})")
+                    except Exception as country_error:
+                        logger.warning(f"Error setting country field: {country_error}")
+
+        # Source - Always set to "Inbound" for enriched leads (if not already set)
+        if is_empty(current_data.get('source_id')):
+            try:
+                if ('utm.source', 'inbound') in lookups:
+                    odoo_fields['source_id'] = lookups[('utm.source', 'inbound')]
+                else:
                     # Search for "Inbound" source in utm.source
                     inbound_sources = self._call_kw(
                         'utm.source', 'search_read',
@@ -647,94 +738,79 @@ class OdooClient:
                             logger.info(f"Created and set source to 'Inbound' (ID: {inbound_id})")
                         except Exception as create_error:
                             logger.warning(f"Could not create 'Inbound' source: {create_error}")
-                except Exception as source_error:
-                    logger.warning(f"Error setting source field: {source_error}")
-
-            # For country, we would need to map to country_id, which requires looking up the country ID
-            # We'll store it in a notes field or create a custom field for now
-
-            # Log what we're updating
-            if odoo_fields:
-                logger.info(f"Updating lead {lead_id} with fields: {list(odoo_fields.keys())}")
-                self._call_kw('crm.lead', 'write', [[lead_id], odoo_fields])
-                logger.info(f"Successfully updated lead {lead_id} with enriched data")
-
-            # Build internal note with additional enrichment info
-            note_parts = []
-            note_parts.append("<h3>📊 Enrichment Data</h3>")
-            note_parts.append("<ul>")
-
-            # Company LinkedIn
-            if 'Company LinkedIn' in values and values['Company LinkedIn']:
-                company_linkedin = str(values['Company LinkedIn']).strip()
-                if company_linkedin and company_linkedin.lower() not in ['not found', 'n/a', 'none']:
-                    note_parts.append(f"<li><strong>Company LinkedIn:</strong> <a href='{company_linkedin}'>{company_linkedin}</a></li>")
-
-            # Industry
-            if 'Industry' in values and values['Industry']:
-                industry = str(values['Industry']).strip()
-                if industry and industry.lower() not in ['not found', 'n/a', 'none']:
-                    note_parts.append(f"<li><strong>Industry:</strong> {industry}</li>")
-
-            # Company Size
-            if 'Company Size' in values and values['Company Size']:
-                company_size = str(values['Company Size']).strip()
-                if company_size and company_size.lower() not in ['not found', 'n/a', 'none']:
-                    note_parts.append(f"<li><strong>Company Size:</strong> {company_size}</li>")
-
-            # Revenue Estimate
-            if 'Company Revenue Estimated' in values and values['Company Revenue Estimated']:
-                revenue = str(values['Company Revenue Estimated']).strip()
-                if revenue and revenue.lower() not in ['not found', 'n/a', 'none']:
-                    note_parts.append(f"<li><strong>Revenue Estimate:</strong> {revenue}</li>")
-
-            # Founded
-            if 'Company year EST' in values and values['Company year EST']:
-                founded = str(values['Company year EST']).strip()
-                if founded and founded.lower() not in ['not found', 'n/a', 'none']:
-                    note_parts.append(f"<li><strong>Founded:</strong> {founded}</li>")
-
-            # Location
-            if 'Location' in values and values['Location']:
-                location = str(values['Location']).strip()
-                if location and location.lower() not in ['not found', 'n/a', 'none']:
-                    note_parts.append(f"<li><strong>Location:</strong> {location}</li>")
-
-            # Company Description
-            if 'Company Description' in values and values['Company Description']:
-                description = str(values['Company Description']).strip()
-                if description and description.lower() not in ['not found', 'n/a', 'none']:
-                    note_parts.append(f"<li><strong>Company Description:</strong> {description}</li>")
-
-            # Notes
-            if 'Notes' in values and values['Notes']:
-                notes = str(values['Notes']).strip()
-                if notes and notes.lower() not in ['not found', 'n/a', 'none']:
-                    note_parts.append(f"<li><strong>Notes:</strong> {notes}</li>")
-
-            note_parts.append("</ul>")
-
-            # Append to description field (Internal Notes tab) if we have any data
-            if len(note_parts) > 3:  # More than just header + ul tags
-                internal_note = "\n".join(note_parts)
-                logger.info(f"Appending internal note to lead {lead_id} with {len(note_parts)-3} fields")
-                self.append_to_description(lead_id, internal_note)
-            else:
-                logger.info(f"No enrichment data to add as internal note for lead {lead_id}")
-
-            return True
+                    if 'source_id' in odoo_fields:
+                        lookups[('utm.source', 'inbound')] = odoo_fields['source_id']
+            except Exception as source_error:
+                logger.warning(f"Error setting source field: {source_error}")
+
+        # For country, we would need to map to country_id, which requires looking up the country ID
+        # We'll store it in a notes field or create a custom field for now
+
+        # Build internal note with additional enrichment info
+        note_parts = []
+        note_parts.append("<h3>📊 Enrichment Data</h3>")
+        note_parts.append("<ul>")
+
+        # Company LinkedIn
+        if 'Company LinkedIn' in values and values['Company LinkedIn']:
+            company_linkedin = str(values['Company LinkedIn']).strip()
+            if company_linkedin and company_linkedin.lower() not in ['not found', 'n/a', 'none']:
+                note_parts.append(f"<li><strong>Company LinkedIn:</strong> <a href='{company_linkedin}'>{company_linkedin}</a></li>")
+
+        # Industry
+        if 'Industry' in values and values['Industry']:
+            industry = str(values['Industry']).strip()
+            if industry and industry.lower() not in ['not found', 'n/a', 'none']:
+                note_parts.append(f"<li><strong>Industry:</strong> {industry}</li>")
+
+        # Company Size
+        if 'Company Size' in values and values['Company Size']:
+            company_size = str(values['Company Size']).strip()
+            if company_size and company_size.lower() not in ['not found', 'n/a', 'none']:
+                note_parts.append(f"<li><strong>Company Size:</strong> {company_size}</li>")
+
+        # Revenue Estimate
+        if 'Company Revenue Estimated' in values and values['Company Revenue Estimated']:
+            revenue = str(values['Company Revenue Estimated']).strip()
+            if revenue and revenue.lower() not in ['not found', 'n/a', 'none']:
+                note_parts.append(f"<li><strong>Revenue Estimate:</strong> {revenue}</li>")
+
+        # Founded
+        if 'Company year EST' in values and values['Company year EST']:
+            founded = str(values['Company year EST']).strip()
+            if founded and founded.lower() not in ['not found', 'n/a', 'none']:
+                note_parts.append(f"<li><strong>Founded:</strong> {founded}</li>")
+
+        # Location
+        if 'Location' in values and values['Location']:
+            location = str(values['Location']).strip()
+            if location and location.lower() not in ['not found', 'n/a', 'none']:
+                note_parts.append(f"<li><strong>Location:</strong> {location}</li>")
+
+        # Company Description
+        if 'Company Description' in values and values['Company Description']:
+            description = str(values['Company Description']).strip()
+            if description and description.lower() not in ['not found', 'n/a', 'none']:
+                note_parts.append(f"<li><strong>Company Description:</strong> {description}</li>")
+
+        # Notes
+        if 'Notes' in values and values['Notes']:
+            notes = str(values['Notes']).strip()
+            if notes and notes.lower() not in ['not found', 'n/a', 'none']:
+                note_parts.append(f"<li><strong>Notes:</strong> {notes}</li>")
+
+        note_parts.append("</ul>")
+
+        if len(note_parts) > 3:  # More than just header + ul tags
+            logger.info(f"Appending internal note to lead {lead_id} with {len(note_parts)-3} fields")
+            return odoo_fields, "\n".join(note_parts)
+
+        logger.info(f"No enrichment data to add as internal note for lead {lead_id}")
+        return odoo_fields, None
 
-        except Exception as e:
-            logger.error(f"Error updating lead {lead_id}: {e}")
-            return False
-    
     def bulk_update_leads(self, lead_updates: List[Tuple[int, Dict[str, Any]]]) -> int:
         """Bulk update multiple leads"""
-        success_count = 0
-        for lead_id, values in lead_updates:
-            if self.update_lead(lead_id, values):
-                success_count += 1
-        return success_count
+        return sum(self.update_leads(lead_updates).values())
 
     def append_to_description(self, lead_id: int, note: str) -> bool:
         """Append text to the description field (Internal Notes tab)."""
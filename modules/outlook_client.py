@@ -1,27 +1,63 @@
 """Microsoft Outlook/Graph API client for email search."""
 
+import base64
+import http.cookiejar
 import logging
+import os
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 import requests
+from requests.adapters import HTTPAdapter
 
 from config import Config
+from modules.token_refresh import refresh_stored_access_token
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def _encoded_attachment(path: str, mtime_ns: int) -> str:
+    """Base64 of a file, cached per (path, mtime) so each attachment is read and encoded once."""
+    with open(path, 'rb') as f:
+        return base64.b64encode(f.read()).decode('utf-8')
+
+
+# Keep-alive pool for Graph and login calls; per host, shared by every client in the process
+GRAPH_POOL_CONNECTIONS = 4
+GRAPH_POOL_MAXSIZE = 50
+
+
+def _graph_session() -> requests.Session:
+    session = requests.Session()
+    # The session is shared by every user's requests, so never store or send cookies
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    session.mount("https://", HTTPAdapter(pool_connections=GRAPH_POOL_CONNECTIONS, pool_maxsize=GRAPH_POOL_MAXSIZE))
+    return session
+
+
 class OutlookClient:
     """Client for searching emails via Microsoft Graph API."""
 
     GRAPH_API_BASE = "https://graph.microsoft.com/v1.0"
     AUTH_BASE = "https://login.microsoftonline.com/common/oauth2/v2.0"
 
+    # Class-level so every instance reuses the same TLS connections
+    session = _graph_session()
+
     def __init__(self, config: Optional[Config] = None):
         self.config = config or Config()
         self.client_id = self.config.MICROSOFT_CLIENT_ID
         self.client_secret = self.config.MICROSOFT_CLIENT_SECRET
         self.redirect_uri = self.config.MICROSOFT_REDIRECT_URI
 
+    def warm_up(self) -> None:
+        """Open a pooled connection to Graph ahead of the first real call."""
+        try:
+            self.session.head(self.GRAPH_API_BASE, timeout=10)
+        except requests.RequestException as exc:
+            logger.debug("Graph connection warm-up failed: %s", exc)
+
     def get_authorization_url(self, state: str, force_account_selection: bool = False, include_teams: bool = True) -> str:
         """
         Generate OAuth2 authorization URL for user to grant access.
@@ -76,7 +112,7 @@ class OutlookClient:
             "grant_type": "authorization_code",
         }
 
-        response = requests.post(f"{self.AUTH_BASE}/token", data=data)
+        response = self.session.post(f"{self.AUTH_BASE}/token", data=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
@@ -89,14 +125,14 @@ class OutlookClient:
             "grant_type": "refresh_token",
         }
 
-        response = requests.post(f"{self.AUTH_BASE}/token", data=data)
+        response = self.session.post(f"{self.AUTH_BASE}/token", data=data, timeout=30)
         response.raise_for_status()
         return response.json()
 
     def get_user_info(self, access_token: str) -> Dict[str, Any]:
         """Get authenticated user's profile information."""
         headers = {"Authorization": f"Bearer {access_token}"}
-        response = requests.get(f"{self.GRAPH_API_BASE}/me", headers=headers)
+        response = self.session.get(f"{self.GRAPH_API_BASE}/me", headers=headers)
         response.raise_for_status()
         return response.json()
 
@@ -150,7 +186,7 @@ class OutlookClient:
         url = f"{endpoint}?{query_string}"
 
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self.session.get(url, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
             return data.get("value", [])
@@ -261,7 +297,7 @@ class OutlookClient:
         url = f"{self.GRAPH_API_BASE}/me/memberOf/microsoft.graph.group"
 
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self.session.get(url, headers=headers, timeout=30)
             response.raise_for_status()
             data = response.json()
             groups = data.get("value", [])
@@ -324,7 +360,7 @@ class OutlookClient:
                 page_count += 1
                 logger.info(f"📥 Fetching conversations page {page_count}")
 
-                response = requests.get(url, headers=headers, params=params, timeout=60)
+                response = self.session.get(url, headers=headers, params=params, timeout=60)
                 response.raise_for_status()
                 data = response.json()
                 conversations = data.get("value", [])
@@ -362,7 +398,7 @@ class OutlookClient:
 
                     try:
                         logger.debug(f"   → Fetching threads from: {threads_url}")
-                        threads_response = requests.get(threads_url, headers=headers, timeout=30)
+                        threads_response = self.session.get(threads_url, headers=headers, timeout=30)
                         threads_response.raise_for_status()
                         threads_data = threads_response.json()
                         threads = threads_data.get("value", [])
@@ -376,7 +412,7 @@ class OutlookClient:
                             posts_url = f"{self.GRAPH_API_BASE}/groups/{group_id}/threads/{thread_id}/posts"
 
                             logger.debug(f"   → Fetching posts from: {posts_url}")
-                            posts_response = requests.get(posts_url, headers=headers, timeout=30)
+                            posts_response = self.session.get(posts_url, headers=headers, timeout=30)
                             posts_response.raise_for_status()
                             posts_data = posts_response.json()
                             posts = posts_data.get("value", [])
@@ -511,7 +547,7 @@ class OutlookClient:
                 }
 
                 try:
-                    response = requests.get(url, headers=headers, params=params, timeout=60)
+                    response = self.session.get(url, headers=headers, params=params, timeout=60)
                     response.raise_for_status()
                     data = response.json()
                     conversations = data.get("value", [])
@@ -531,7 +567,7 @@ class OutlookClient:
                         # Fetch threads to get actual email content
                         try:
                             threads_url = f"{self.GRAPH_API_BASE}/groups/{group_id}/conversations/{conv_id}/threads"
-                            threads_response = requests.get(threads_url, headers=headers, timeout=30)
+                            threads_response = self.session.get(threads_url, headers=headers, timeout=30)
                             threads_response.raise_for_status()
                             threads = threads_response.json().get("value", [])
 
@@ -542,7 +578,7 @@ class OutlookClient:
 
                                 # Fetch posts (actual emails)
                                 posts_url = f"{self.GRAPH_API_BASE}/groups/{group_id}/conversations/{conv_id}/threads/{thread_id}/posts"
-                                posts_response = requests.get(posts_url, headers=headers, timeout=30)
+                                posts_response = self.session.get(posts_url, headers=headers, timeout=30)
                                 posts_response.raise_for_status()
                                 posts = posts_response.json().get("value", [])
 
@@ -669,7 +705,7 @@ class OutlookClient:
             if reply_to:
                 message["message"]["replyTo"] = [{"emailAddress": {"address": reply_to}}]
 
-            response = requests.post(url, headers=headers, json=message)
+            response = self.session.post(url, headers=headers, json=message)
             response.raise_for_status()
 
             logger.info(f"Email sent successfully to {', '.join(to)}")
@@ -711,20 +747,15 @@ class OutlookClient:
         Returns:
             True if email sent successfully, False otherwise
         """
-        import base64
-        import os
-
         try:
-            # Read and encode the attachment
+            # Read and encode the attachment (cached until the file changes)
             if not os.path.exists(attachment_path):
                 logger.error(f"Attachment file not found: {attachment_path}")
                 return False
 
-            with open(attachment_path, 'rb') as f:
-                attachment_content = base64.b64encode(f.read()).decode('utf-8')
-
-            # Get file size
-            file_size = os.path.getsize(attachment_path)
+            attachment_content = _encoded_attachment(
+                os.path.abspath(attachment_path), os.stat(attachment_path).st_mtime_ns
+            )
 
             url = f"{self.GRAPH_API_BASE}/me/sendMail"
             headers = {
@@ -763,7 +794,7 @@ class OutlookClient:
             if bcc_recipients:
                 message["message"]["bccRecipients"] = bcc_recipients
 
-            response = requests.post(url, headers=headers, json=message)
+            response = self.session.post(url, headers=headers, json=message)
             response.raise_for_status()
 
             logger.info(f"Email with attachment sent successfully to {', '.join(to)}")
@@ -830,7 +861,7 @@ class OutlookClient:
                 "comment": reply_body
             }
 
-            response = requests.post(url, headers=headers, json=message)
+            response = self.session.post(url, headers=headers, json=message)
             response.raise_for_status()
 
             logger.info(f"Reply sent successfully to conversation {conversation_id}")
@@ -848,28 +879,49 @@ class OutlookClient:
     def get_user_auth_tokens(self, user_identifier: str, token_store=None, db=None) -> Optional[Dict[str, Any]]:
         """
         Get authenticated user's Outlook tokens with auto-refresh.
-        Reads from database first (persistent), then falls back to file system.
+        Reads email_tokens through EmailTokenStore (in-process cache, then Supabase),
+        falling back to the legacy copy in user settings.
 
         Args:
             user_identifier: User identifier (email or user ID)
             token_store: EmailTokenStore instance (will create if not provided)
-            db: Database instance (will try to import if not provided)
+            db: Database holding user settings (defaults to the token store's database)
 
         Returns:
             Dictionary with access_token, refresh_token, etc., or None if not authenticated
         """
         from datetime import datetime, timedelta
 
-        tokens = None
+        if token_store is None:
+            from modules.email_token_store import EmailTokenStore
+            token_store = EmailTokenStore()
+
+        tokens = token_store.get_tokens(user_identifier)
+        if tokens:
+            # Check if token is expired and refresh if needed
+            if token_store.is_token_expired(user_identifier):
+                logger.info(f"Access token expired for {user_identifier}, refreshing...")
+                try:
+                    refresh_token = tokens.get("refresh_token")
+                    if not refresh_token:
+                        logger.error("No refresh token available")
+                        return None
+
+                    # Refresh and store the token, sharing any refresh already in flight for this user
+                    new_access_token = refresh_stored_access_token(token_store, self, user_identifier)
+                    tokens = {**tokens, "access_token": new_access_token}
+                    logger.info(f"Successfully refreshed access token for {user_identifier}")
+
+                except Exception as e:
+                    logger.error(f"Failed to refresh token for {user_identifier}: {e}")
+                    return None
+
+            return tokens
 
-        # Try to get tokens from database first (persistent across deployments)
+        # Legacy fallback: accounts authorized before tokens moved to email_tokens
+        # only have the copy kept in user settings
         if db is None:
-            try:
-                from api.supabase_database import SupabaseDatabase
-                db = SupabaseDatabase()
-                logger.info(f"✅ Successfully loaded Supabase database for token retrieval")
-            except Exception as e:
-                logger.error(f"❌ Could not load database: {e}")
+            db = token_store.db
 
         if db is not None:
             try:
@@ -927,42 +979,8 @@ class OutlookClient:
             except Exception as e:
                 logger.warning(f"Error reading tokens from database: {e}")
 
-        # Fall back to file system (legacy/backwards compatibility)
-        if token_store is None:
-            from modules.email_token_store import EmailTokenStore
-            token_store = EmailTokenStore()
-
-        tokens = token_store.get_tokens(user_identifier)
-        if not tokens:
-            logger.warning(f"No tokens found for user: {user_identifier}")
-            return None
-
-        # Check if token is expired and refresh if needed
-        if token_store.is_token_expired(user_identifier):
-            logger.info(f"Access token expired for {user_identifier}, refreshing from file system...")
-            try:
-                refresh_token = tokens.get("refresh_token")
-                if not refresh_token:
-                    logger.error("No refresh token available")
-                    return None
-
-                # Refresh the token
-                token_response = self.refresh_access_token(refresh_token)
-                new_access_token = token_response.get("access_token")
-                expires_in = token_response.get("expires_in", 3600)
-
-                # Update stored token
-                token_store.update_access_token(user_identifier, new_access_token, expires_in)
-
-                # Update tokens dict with new access token
-                tokens["access_token"] = new_access_token
-                logger.info(f"Successfully refreshed access token from file system for {user_identifier}")
-
-            except Exception as e:
-                logger.error(f"Failed to refresh token for {user_identifier}: {e}")
-                return None
-
-        return tokens
+        logger.warning(f"No tokens found for user: {user_identifier}")
+        return None
 
     def get_conversation_messages(
         self,
@@ -1002,7 +1020,7 @@ class OutlookClient:
                 "$select": "id,subject,from,toRecipients,ccRecipients,receivedDateTime,body,bodyPreview,hasAttachments,importance,conversationId,webLink"
             }
 
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = self.session.get(url, headers=headers, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             all_messages = data.get("value", [])
@@ -1063,7 +1081,7 @@ class OutlookClient:
                 "$top": 999  # Get up to 999 users (max per page)
             }
 
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = self.session.get(url, headers=headers, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             users = data.get("value", [])
@@ -1122,7 +1140,7 @@ class OutlookClient:
             }
 
             # Step 1: Get current user ID (sender)
-            me_response = requests.get(f"{self.GRAPH_API_BASE}/me", headers=headers, timeout=30)
+            me_response = self.session.get(f"{self.GRAPH_API_BASE}/me", headers=headers, timeout=30)
             me_response.raise_for_status()
             me_data = me_response.json()
             my_user_id = me_data.get("id")
@@ -1146,7 +1164,7 @@ class OutlookClient:
             }
 
             create_chat_url = f"{self.GRAPH_API_BASE}/chats"
-            chat_response = requests.post(create_chat_url, headers=headers, json=chat_payload, timeout=30)
+            chat_response = self.session.post(create_chat_url, headers=headers, json=chat_payload, timeout=30)
             chat_response.raise_for_status()
             chat_data = chat_response.json()
             chat_id = chat_data.get("id")
@@ -1168,7 +1186,7 @@ class OutlookClient:
             }
 
             send_message_url = f"{self.GRAPH_API_BASE}/chats/{chat_id}/messages"
-            message_response = requests.post(send_message_url, headers=headers, json=message_payload, timeout=30)
+            message_response = self.session.post(send_message_url, headers=headers, json=message_payload, timeout=30)
             message_response.raise_for_status()
 
             logger.info(f"Teams message sent successfully to user {user_id}")
@@ -2,12 +2,16 @@
 Perplexity API Client for lead enrichment
 """
 import logging
+import time
 import requests
 from typing import Dict, Any, Optional
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Responses worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
 
 class PerplexityClient:
     """Client for interacting with Perplexity AI API"""
@@ -17,6 +21,7 @@ class PerplexityClient:
         self.api_key = self.config.PERPLEXITY_API_KEY
         self.model = self.config.PERPLEXITY_MODEL
         self.api_base = self.config.PERPLEXITY_API_BASE
+        self.max_retries = max(0, self.config.PERPLEXITY_MAX_RETRIES)
 
         if not self.api_key:
             logger.warning("PERPLEXITY_API_KEY not set. Perplexity enrichment will not work.")
@@ -66,30 +71,57 @@ class PerplexityClient:
             "reasoning_effort": "high"
         }
 
-        try:
-            logger.info(f"Sending request to Perplexity API with model: {self.model}")
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
-            response.raise_for_status()
-
-            data = response.json()
-
-            if 'choices' in data and len(data['choices']) > 0:
-                content = data['choices'][0]['message']['content']
-                logger.info(f"Received response from Perplexity ({len(content)} characters)")
-                return content
-            else:
-                logger.error(f"Unexpected Perplexity API response format: {data}")
+        for attempt in range(self.max_retries + 1):
+            retries_left = attempt < self.max_retries
+            try:
+                logger.info(f"Sending request to Perplexity API with model: {self.model}")
+                response = requests.post(url, json=payload, headers=headers, timeout=60)
+                if response.status_code in RETRYABLE_STATUS_CODES and retries_left:
+                    delay = self._backoff_delay(attempt, response.headers.get("Retry-After"))
+                    logger.warning(
+                        f"Perplexity API returned {response.status_code}; retrying in {delay:.1f}s "
+                        f"(attempt {attempt + 1}/{self.max_retries})"
+                    )
+                    time.sleep(delay)
+                    continue
+                response.raise_for_status()
+
+                data = response.json()
+
+                if 'choices' in data and len(data['choices']) > 0:
+                    content = data['choices'][0]['message']['content']
+                    logger.info(f"Received response from Perplexity ({len(content)} characters)")
+                    return content
+                else:
+                    logger.error(f"Unexpected Perplexity API response format: {data}")
+                    return None
+
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                if retries_left:
+                    delay = self._backoff_delay(attempt)
+                    logger.warning(f"Perplexity API request failed ({e}); retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                logger.error(f"Perplexity API request failed: {e}")
+                return None
+            except requests.exceptions.HTTPError as e:
+                logger.error(f"Perplexity API HTTP error: {e.response.status_code} - {e.response.text}")
+                return None
+            except Exception as e:
+                logger.error(f"Perplexity API error: {str(e)}")
                 return None
 
-        except requests.exceptions.Timeout:
-            logger.error("Perplexity API request timed out")
-            return None
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"Perplexity API HTTP error: {e.response.status_code} - {e.response.text}")
-            return None
-        except Exception as e:
-            logger.error(f"Perplexity API error: {str(e)}")
-            return None
+        return None
+
+    @staticmethod
+    def _backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry number attempt + 1: Retry-After if given, else 1s doubling up to 30s."""
+        if retry_after:
+            try:
+                return min(30.0, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        return min(30.0, 2.0 ** attempt)
 
     def enrich_lead(self, lead_data: Dict[str, Any], enrichment_prompt: str) -> Optional[str]:
         """
@@ -785,55 +785,57 @@ class PerplexityWorkflow:
             'duplicates_updated': 0
         }
 
+        # Primary leads first, in one batched update
+        primaries = []
+        duplicates_by_primary: Dict[int, List[int]] = {}
         for lead in enriched_leads:
-            try:
-                if 'id' not in lead:
-                    results['failed'] += 1
-                    results['errors'].append("Lead missing ID field")
-                    continue
-
-                # Extract duplicate information if present
-                duplicate_ids = lead.pop('_duplicate_ids', [])
-                bulk_update_note = lead.pop('_bulk_update_note', '')
-
-                # Update the primary lead
-                success = self.odoo.update_lead(lead['id'], lead)
-                if success:
-                    results['updated'] += 1
-                    print(f"[OK] Updated lead: {lead.get('Full Name', 'Unknown')} (ID: {lead['id']})")
-                else:
-                    results['failed'] += 1
-                    results['errors'].append(f"Failed to update lead {lead['id']}")
-                    continue  # Don't update duplicates if primary failed
-
-                # Update all duplicate leads with the same enrichment data
-                if duplicate_ids:
-                    print(f"🔄 Applying same enrichment to {len(duplicate_ids)} duplicate lead(s)...")
-
-                    # Prepare enrichment data for duplicates (copy from primary)
-                    duplicate_enrichment = lead.copy()
-
-                    for dup_id in duplicate_ids:
-                        try:
-                            # Update the duplicate with the same enrichment
-                            duplicate_enrichment['id'] = dup_id
-                            dup_success = self.odoo.update_lead(dup_id, duplicate_enrichment)
-
-                            if dup_success:
-                                results['duplicates_updated'] += 1
-                                print(f"   [OK] Updated duplicate lead ID: {dup_id}")
-                            else:
-                                results['errors'].append(f"Failed to update duplicate lead {dup_id}")
+            if 'id' not in lead:
+                results['failed'] += 1
+                results['errors'].append("Lead missing ID field")
+                continue
 
-                        except Exception as dup_error:
-                            error_msg = f"Error updating duplicate lead {dup_id}: {str(dup_error)}"
-                            results['errors'].append(error_msg)
-                            print(f"   [ERROR] {error_msg}")
+            # Extract duplicate information if present
+            duplicate_ids = lead.pop('_duplicate_ids', [])
+            lead.pop('_bulk_update_note', '')
+            primaries.append(lead)
+            if duplicate_ids:
+                duplicates_by_primary[lead['id']] = duplicate_ids
 
-            except Exception as e:
+        try:
+            primary_results = self.odoo.update_leads([(lead['id'], lead) for lead in primaries])
+        except Exception as e:
+            primary_results = {}
+            results['errors'].append(f"Error updating leads: {str(e)}")
+
+        duplicate_updates = []
+        for lead in primaries:
+            if primary_results.get(lead['id']):
+                results['updated'] += 1
+                print(f"[OK] Updated lead: {lead.get('Full Name', 'Unknown')} (ID: {lead['id']})")
+            else:
                 results['failed'] += 1
-                error_msg = f"Error updating lead {lead.get('Full Name', 'Unknown')}: {str(e)}"
-                results['errors'].append(error_msg)
+                results['errors'].append(f"Failed to update lead {lead['id']}")
+                continue  # Don't update duplicates if primary failed
+
+            # Update all duplicate leads with the same enrichment data
+            duplicate_ids = duplicates_by_primary.get(lead['id'])
+            if duplicate_ids:
+                print(f"🔄 Applying same enrichment to {len(duplicate_ids)} duplicate lead(s)...")
+                for dup_id in duplicate_ids:
+                    duplicate_updates.append((dup_id, {**lead, 'id': dup_id}))
+
+        if duplicate_updates:
+            try:
+                duplicate_results = self.odoo.update_leads(duplicate_updates)
+            except Exception as dup_error:
+                duplicate_results = {}
+                results['errors'].append(f"Error updating duplicate leads: {str(dup_error)}")
+            for dup_id, _ in duplicate_updates:
+                if duplicate_results.get(dup_id):
+                    results['duplicates_updated'] += 1
+                    print(f"   [OK] Updated duplicate lead ID: {dup_id}")
+                else:
+                    results['errors'].append(f"Failed to update duplicate lead {dup_id}")
 
         # Add summary message if duplicates were updated
         if results['duplicates_updated'] > 0:
@@ -1,17 +1,42 @@
+import json
 import logging
 import re
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 from email.utils import parseaddr
 
+from api.supabase_client import SupabaseClient, get_supabase_client
 from config import Config
 from modules.llm_client import LLMClient
 from modules.odoo_client import OdooClient
 from modules.outlook_client import OutlookClient
 from modules.email_token_store import EmailTokenStore
+from modules.token_refresh import refresh_stored_access_token
 
 logger = logging.getLogger(__name__)
 
+# Completion settings for per-thread analysis (also used by the API's batched path)
+THREAD_ANALYSIS_MAX_TOKENS = 4000
+THREAD_ANALYSIS_TEMPERATURE = 0.7
+
+# Lead/noise classification of threads needing follow-up
+CLASSIFICATION_MAX_TOKENS = 64000  # High limit for reasoning models
+CLASSIFICATION_TEMPERATURE = 0.3
+DEFAULT_CLASSIFICATION = {"is_lead": True, "confidence": 0.5, "category": "unknown"}
+
+# Lead fields attached to each thread as ``odoo_lead``
+ODOO_LEAD_FIELDS = [
+    "id",
+    "name",
+    "partner_name",
+    "contact_name",
+    "email_from",
+    "stage_id",
+    "probability",
+    "expected_revenue",
+    "type",
+]
+
 
 def _strip_html(value: Optional[str]) -> str:
     """Remove HTML tags from text."""
@@ -55,10 +80,12 @@ class ProposalFollowupAnalyzer:
         config: Optional[Config] = None,
         odoo_client: Optional[OdooClient] = None,
         llm_client: Optional[LLMClient] = None,
+        supabase_client: Optional[SupabaseClient] = None,
     ) -> None:
         self.config = config or Config()
         self.odoo = odoo_client or OdooClient(self.config)
         self.llm = llm_client or LLMClient(self.config)
+        self.supabase = supabase_client or get_supabase_client()
         self.token_store = EmailTokenStore()
 
     def _ensure_odoo_connection(self) -> None:
@@ -94,22 +121,9 @@ class ProposalFollowupAnalyzer:
         if self.token_store.is_token_expired(user_identifier):
             logger.info(f"Access token expired for {user_identifier}, refreshing...")
             try:
-                refresh_token = tokens.get("refresh_token")
-                if not refresh_token:
-                    raise ValueError(f"No refresh token available for {user_identifier}")
-
-                token_response = outlook.refresh_access_token(refresh_token)
-                access_token = token_response.get("access_token")
-
-                # Update the stored tokens
-                self.token_store.update_access_token(
-                    user_identifier,
-                    access_token,
-                    token_response.get("expires_in", 3600)
-                )
-
-                # Reload tokens to get the updated access token
-                tokens = self.token_store.get_tokens(user_identifier)
+                # Concurrent analyses for the same mailbox share one refresh
+                access_token = refresh_stored_access_token(self.token_store, outlook, user_identifier)
+                tokens = {**tokens, "access_token": access_token}
                 logger.info(f"Successfully refreshed token for {user_identifier}")
             except Exception as e:
                 logger.error(f"Failed to refresh token for {user_identifier}: {e}")
@@ -173,17 +187,17 @@ class ProposalFollowupAnalyzer:
                 return True
         return False
 
-    def _classify_as_lead(self, subject: str, body: str, external_email: str) -> Dict[str, Any]:
-        """
-        Use AI to classify if an email thread is a potential lead or noise.
+    @staticmethod
+    def _classification_messages(thread_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Build the prompt that classifies a thread's latest email as a lead or noise."""
+        last_email = thread_data["last_email"]
+        subject = last_email.get("subject", "")
+        body = _strip_html(last_email.get("body", {}).get("content", ""))
 
-        Returns:
-            Dict with is_lead (bool), confidence (float), category (str)
-        """
         prompt = f"""Classify this email as either a LEAD (potential business opportunity) or NOISE (job application, spam, newsletter, etc).
 
 Subject: {subject}
-From: {external_email}
+From: {thread_data["external_email"]}
 Preview: {body[:300]}
 
 Respond in JSON format:
@@ -196,22 +210,62 @@ Respond in JSON format:
 A LEAD is: client inquiry, partnership opportunity, sales opportunity, project request, proposal request.
 NOISE is: job applications, recruitment, newsletters, ads, automated notifications, supplier solicitations."""
 
-        try:
-            messages = [
-                {"role": "system", "content": "You are an expert at classifying business emails."},
-                {"role": "user", "content": prompt}
-            ]
-
-            result = self.llm.chat_completion_json(
-                messages,
-                max_tokens=64000,  # High limit for reasoning models
-                temperature=0.3
-            )
+        return [
+            {"role": "system", "content": "You are an expert at classifying business emails."},
+            {"role": "user", "content": prompt}
+        ]
 
-            return result
-        except Exception as e:
-            logger.warning(f"Error classifying email: {e}")
-            return {"is_lead": True, "confidence": 0.5, "category": "unknown"}
+    def _classify_threads(self, threads: List[Dict[str, Any]]) -> None:
+        """
+        Attach a lead/noise classification to each thread.
+
+        Classifications are stored per (conversation_id, latest message id), so a
+        conversation is only sent to the LLM again once a new message arrives.
+        The misses are classified concurrently in one batch.
+        """
+        keyed = [
+            (thread_data, (thread_data["conversation_id"], thread_data["last_email"].get("id")))
+            for thread_data in threads
+        ]
+        stored = self.supabase.get_thread_classifications([key for _, key in keyed if key[1]])
+
+        misses = []
+        for thread_data, key in keyed:
+            classification = stored.get(key)
+            if classification is None:
+                misses.append((thread_data, key))
+            else:
+                thread_data["classification"] = classification
+
+        if not misses:
+            logger.info(f"Reused stored classifications for all {len(threads)} threads")
+            return
+
+        results = self.llm.batch_chat_completion(
+            [self._classification_messages(thread_data) for thread_data, _ in misses],
+            max_tokens=CLASSIFICATION_MAX_TOKENS,
+            temperature=CLASSIFICATION_TEMPERATURE,
+            response_format={"type": "json_object"},
+        )
+
+        fresh: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for (thread_data, key), raw in zip(misses, results):
+            if isinstance(raw, Exception):
+                logger.warning(f"Error classifying email: {raw}")
+                thread_data["classification"] = dict(DEFAULT_CLASSIFICATION)
+                continue
+            try:
+                classification = json.loads(raw)
+            except json.JSONDecodeError:
+                logger.warning("LLM response not valid JSON; returning raw text.")
+                classification = {"raw_text": raw}
+            thread_data["classification"] = classification
+            # Only keep real answers; fallbacks are retried on the next run
+            if key[1] and "is_lead" in classification:
+                fresh[key] = classification
+
+        self.supabase.save_thread_classifications(fresh)
+        logger.info(f"Classified {len(misses)} threads with the LLM, reused {len(threads) - len(misses)} stored classifications")
 
     def categorize_threads(
         self,
@@ -246,6 +300,8 @@ NOISE is: job applications, recruitment, newsletters, ads, automated notificatio
         unanswered = []
         pending_proposals = []
         filtered = []
+        # (thread_data, list it joins if classified as a lead), classified in one batch below
+        to_classify: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = []
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=no_response_days)
 
         for conv_id, thread in conversations.items():
@@ -276,11 +332,6 @@ NOISE is: job applications, recruitment, newsletters, ads, automated notificatio
                     # Extract external sender's email
                     external_email = last_sender
 
-                    # Classify the email
-                    subject = last_email.get("subject", "")
-                    body = _strip_html(last_email.get("body", {}).get("content", ""))
-                    classification = self._classify_as_lead(subject, body, external_email)
-
                     thread_data = {
                         "conversation_id": conv_id,
                         "thread": thread,
@@ -290,17 +341,12 @@ NOISE is: job applications, recruitment, newsletters, ads, automated notificatio
                         "subject": last_email.get("subject", ""),
                         "days_waiting": (datetime.now(timezone.utc) - last_received).days,
                         "web_link": last_email.get("webLink"),
-                        "classification": classification,
                         "last_internal_sender": last_internal_sender,
                         "last_internal_sender_email": last_internal_sender_email,
                         "last_internal_email_date": last_internal_email_date
                     }
 
-                    # Add to appropriate list based on classification
-                    if classification.get("is_lead", True):
-                        unanswered.append(thread_data)
-                    else:
-                        filtered.append(thread_data)
+                    to_classify.append((thread_data, unanswered))
 
             # Check if we sent a proposal and haven't heard back
             else:
@@ -356,11 +402,6 @@ NOISE is: job applications, recruitment, newsletters, ads, automated notificatio
                                 break
 
                         if external_email:
-                            # Classify the email
-                            subject = last_email.get("subject", "")
-                            body = _strip_html(last_email.get("body", {}).get("content", ""))
-                            classification = self._classify_as_lead(subject, body, external_email)
-
                             thread_data = {
                                 "conversation_id": conv_id,
                                 "thread": thread,
@@ -370,17 +411,21 @@ NOISE is: job applications, recruitment, newsletters, ads, automated notificatio
                                 "subject": last_email.get("subject", ""),
                                 "days_waiting": (datetime.now(timezone.utc) - proposal_date).days,
                                 "web_link": last_email.get("webLink"),
-                                "classification": classification,
                                 "last_internal_sender": last_internal_sender,
                                 "last_internal_sender_email": last_internal_sender_email,
                                 "last_internal_email_date": last_internal_email_date
                             }
 
-                            # Add to appropriate list based on classification
-                            if classification.get("is_lead", True):
-                                pending_proposals.append(thread_data)
-                            else:
-                                filtered.append(thread_data)
+                            to_classify.append((thread_data, pending_proposals))
+
+        self._classify_threads([thread_data for thread_data, _ in to_classify])
+
+        # Add to appropriate list based on classification
+        for thread_data, lead_list in to_classify:
+            if thread_data["classification"].get("is_lead", True):
+                lead_list.append(thread_data)
+            else:
+                filtered.append(thread_data)
 
         logger.info(f"Categorized {len(unanswered)} unanswered threads, {len(pending_proposals)} pending proposals, and {len(filtered)} filtered threads")
         return unanswered, pending_proposals, filtered
@@ -400,16 +445,26 @@ NOISE is: job applications, recruitment, newsletters, ads, automated notificatio
         """
         self._ensure_odoo_connection()
 
-        for category in ["unanswered", "pending_proposals", "filtered"]:
-            threads = categorized_threads.get(category, [])
+        categories = ["unanswered", "pending_proposals", "filtered"]
+
+        # One search_read per 50 addresses instead of two RPCs per thread
+        leads_by_email = self.odoo.get_leads_by_emails(
+            [
+                thread["external_email"]
+                for category in categories
+                for thread in categorized_threads.get(category, [])
+                if thread.get("external_email")
+            ],
+            fields=ODOO_LEAD_FIELDS,
+        )
 
-            for thread in threads:
+        for category in categories:
+            for thread in categorized_threads.get(category, []):
                 external_email = thread.get("external_email")
                 if not external_email:
                     continue
 
-                # Search Odoo for matching lead/opportunity
-                odoo_record = self.odoo.search_lead_by_email(external_email)
+                odoo_record = leads_by_email.get(external_email.strip().lower())
 
                 if odoo_record:
                     thread["odoo_lead"] = {
@@ -427,18 +482,16 @@ NOISE is: job applications, recruitment, newsletters, ads, automated notificatio
 
         return categorized_threads
 
-    def analyze_thread_with_llm(
-        self,
-        thread_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    @staticmethod
+    def thread_analysis_messages(thread_data: Dict[str, Any]) -> List[Dict[str, str]]:
         """
-        Use LLM to analyze email thread and generate follow-up draft.
+        Build the chat messages asking the LLM to analyze an email thread.
 
         Args:
             thread_data: Thread data with emails and Odoo context
 
         Returns:
-            Analysis with summary, sentiment, urgency, and draft email
+            Messages for a JSON-formatted chat completion
         """
         thread = thread_data.get("thread", [])
         odoo_lead = thread_data.get("odoo_lead")
@@ -494,28 +547,46 @@ Respond in JSON format with these keys:
 - draft_email
 """
 
-        try:
-            messages = [
-                {"role": "system", "content": "You are a sales communication expert helping draft follow-up emails."},
-                {"role": "user", "content": prompt}
-            ]
+        return [
+            {"role": "system", "content": "You are a sales communication expert helping draft follow-up emails."},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def failed_thread_analysis() -> Dict[str, Any]:
+        """Placeholder analysis used when the LLM call fails."""
+        return {
+            "summary": "Unable to analyze thread",
+            "sentiment": "unknown",
+            "urgency": "medium",
+            "key_points": [],
+            "draft_email": ""
+        }
+
+    def analyze_thread_with_llm(
+        self,
+        thread_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Use LLM to analyze email thread and generate follow-up draft.
+
+        Args:
+            thread_data: Thread data with emails and Odoo context
 
+        Returns:
+            Analysis with summary, sentiment, urgency, and draft email
+        """
+        try:
             analysis = self.llm.chat_completion_json(
-                messages,
-                max_tokens=4000,
-                temperature=0.7
+                self.thread_analysis_messages(thread_data),
+                max_tokens=THREAD_ANALYSIS_MAX_TOKENS,
+                temperature=THREAD_ANALYSIS_TEMPERATURE
             )
 
             return analysis
         except Exception as e:
             logger.error(f"Error analyzing thread with LLM: {e}")
-            return {
-                "summary": "Unable to analyze thread",
-                "sentiment": "unknown",
-                "urgency": "medium",
-                "key_points": [],
-                "draft_email": ""
-            }
+            return self.failed_thread_analysis()
 
     def get_proposal_followups(
         self,
@@ -0,0 +1,45 @@
+"""
+Token-bucket rate limiter shared by async handlers and worker threads.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Allow bursts of up to ``capacity`` calls, refilling at ``rate`` calls per second.
+
+    Each acquire reserves a token under a short lock and then sleeps outside it
+    until the reservation comes due, so waiters are served in arrival order and
+    never hold the lock while sleeping.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self) -> None:
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self) -> None:
+        """acquire() for sync code running in a worker thread."""
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
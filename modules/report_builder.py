@@ -0,0 +1,98 @@
+"""
+Generate and save shared proposal follow-up reports.
+
+Used by the API's background report jobs and by scripts/daily_report_cron.py.
+"""
+
+import logging
+from datetime import date
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Analysis window per saved report type
+REPORT_DAYS = {"complete": 365, "90day": 90, "monthly": 30, "weekly": 7}
+
+
+@lru_cache(maxsize=16)
+def _report_period(report_type: str, day: date) -> str:
+    """Label of the period a report generated on ``day`` covers (memoized per day)."""
+    if report_type == "complete":
+        return str(day.year)
+    if report_type == "90day":
+        # strftime has no portable quarter directive
+        return f"{day.year}-Q{(day.month - 1) // 3 + 1}"
+    if report_type == "monthly":
+        return day.strftime("%Y-%m")
+    return day.strftime("%Y-W%W")
+
+
+def build_saved_report(
+    db: Any,
+    analyzer: Any,
+    user_id: Any,
+    report_type: str,
+    no_response_days: int,
+    engage_email: str,
+    on_saved: Optional[Callable[[], None]] = None,
+) -> Dict[str, Any]:
+    """Run the follow-up analysis for a report type and save it as a shared report.
+
+    Args:
+        db: SupabaseDatabase the report is saved to
+        analyzer: ProposalFollowupAnalyzer that runs the analysis
+        user_id: Owner of the saved report
+        report_type: One of REPORT_DAYS
+        no_response_days: Days without a reply before a thread needs follow-up
+        engage_email: Mailbox analyzed (its tokens are stored as SYSTEM_<email>)
+        on_saved: Called after the report is saved, e.g. to drop cached summaries
+
+    Returns:
+        Dictionary with report_id (None if saving failed), report_type,
+        report_period and the analysis result
+    """
+    days_back = REPORT_DAYS[report_type]
+    report_period = _report_period(report_type, date.today())
+
+    # Generate the analysis
+    logger.info(f"Starting report generation for {report_type} (days_back={days_back})")
+    # Use SYSTEM_ prefix for system email tokens
+    system_identifier = f"SYSTEM_{engage_email}"
+    result = analyzer.get_proposal_followups(
+        user_identifier=system_identifier,
+        days_back=days_back,
+        no_response_days=no_response_days
+    )
+    logger.info(f"Analysis completed. Found {result.get('summary', {}).get('total_count', 0)} follow-ups")
+
+    # Save as shared report (but don't fail if save fails)
+    report_id = None
+    try:
+        logger.info(f"Attempting to save report to database for user {user_id}")
+        report_id = db.save_report(
+            user_id=user_id,
+            analysis_type="proposal_followups",
+            report_type=report_type,
+            report_period=report_period,
+            result=result,
+            parameters={
+                "days_back": days_back,
+                "no_response_days": no_response_days,
+                "engage_email": engage_email
+            },
+            is_shared=True
+        )
+        logger.info(f"Report saved successfully with ID: {report_id}")
+        if on_saved is not None:
+            on_saved()
+    except Exception as save_error:
+        logger.warning(f"Failed to save report to cache (report still generated): {save_error}")
+        # Continue without saving - the caller still gets the report
+
+    return {
+        "report_id": report_id,
+        "report_type": report_type,
+        "report_period": report_period,
+        "result": result,
+    }
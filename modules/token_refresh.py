@@ -0,0 +1,108 @@
+"""
+Per-user single-flight refresh of OAuth access tokens.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Longest a caller waits on a refresh; covers the 30s token POST plus the store write
+TOKEN_REFRESH_TIMEOUT_SECONDS = 45
+
+
+class TokenRefreshManager:
+    """Run at most one access-token refresh per user at a time.
+
+    ``refresh()`` performs the refresh and returns the new access token.
+    Callers whose token is still valid call ``schedule`` and carry on with it;
+    callers whose token has expired call ``wait`` and join the refresh that is
+    already in flight instead of starting another one.
+    """
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="token-refresh")
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _run(self, user_identifier: str, refresh: Callable[[], str]) -> str:
+        try:
+            return refresh()
+        except Exception as exc:
+            logger.error("Access token refresh failed for %s: %s", user_identifier, exc)
+            raise
+
+    def _forget(self, user_identifier: str, future: Future) -> None:
+        # Only drop our own entry; a timed-out refresh may already have been replaced
+        with self._lock:
+            if self._inflight.get(user_identifier) is future:
+                del self._inflight[user_identifier]
+
+    def schedule(self, user_identifier: str, refresh: Callable[[], str]) -> Future:
+        """Start a refresh for the user unless one is already running, and return it."""
+        with self._lock:
+            future = self._inflight.get(user_identifier)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._run, user_identifier, refresh)
+            self._inflight[user_identifier] = future
+        future.add_done_callback(lambda done: self._forget(user_identifier, done))
+        return future
+
+    def wait(
+        self,
+        user_identifier: str,
+        refresh: Callable[[], str],
+        timeout: Optional[float] = TOKEN_REFRESH_TIMEOUT_SECONDS,
+    ) -> str:
+        """Return a freshly refreshed access token, sharing any refresh in flight.
+
+        Raises concurrent.futures.TimeoutError after ``timeout`` seconds and
+        forgets the hung refresh, so the next caller starts a new one.
+        """
+        future = self.schedule(user_identifier, refresh)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            logger.error("Access token refresh for %s timed out after %ss", user_identifier, timeout)
+            self._forget(user_identifier, future)
+            raise
+
+
+# Shared by every refresh site in the process, so concurrent callers for one
+# user (API handlers, analyzers, background jobs) trigger a single Graph refresh
+token_refresh_manager = TokenRefreshManager()
+
+
+def stored_token_refresh(token_store: Any, outlook: Any, user_identifier: str) -> Callable[[], str]:
+    """Build a refresh that redeems the stored refresh token and saves the new access token."""
+    def refresh() -> str:
+        tokens = token_store.get_tokens(user_identifier)
+        if not tokens or not tokens.get("refresh_token"):
+            raise ValueError(f"No refresh token available for {user_identifier}")
+        token_response = outlook.refresh_access_token(tokens["refresh_token"])
+        access_token = token_response.get("access_token")
+        token_store.update_access_token(
+            user_identifier,
+            access_token,
+            token_response.get("expires_in", 3600)
+        )
+        return access_token
+
+    return refresh
+
+
+def refresh_stored_access_token(
+    token_store: Any,
+    outlook: Any,
+    user_identifier: str,
+    timeout: float = TOKEN_REFRESH_TIMEOUT_SECONDS,
+) -> str:
+    """Refresh the user's stored access token, joining a refresh already in flight."""
+    return token_refresh_manager.wait(
+        user_identifier,
+        stored_token_refresh(token_store, outlook, user_identifier),
+        timeout,
+    )
@@ -13,6 +13,7 @@ from config import Config
 from modules.odoo_client import OdooClient
 from modules.outlook_client import OutlookClient
 from modules.email_token_store import EmailTokenStore
+from modules.token_refresh import refresh_stored_access_token
 
 logger = logging.getLogger(__name__)
 
@@ -66,21 +67,8 @@ class ToolImpactAnalyzer:
         if self.token_store.is_token_expired(SYSTEM_EMAIL_IDENTIFIER):
             logger.info(f"Access token expired for {SYSTEM_EMAIL_IDENTIFIER}, refreshing...")
             try:
-                refresh_token = tokens.get("refresh_token")
-                if not refresh_token:
-                    logger.error(f"No refresh token available for {SYSTEM_EMAIL_IDENTIFIER}")
-                    return None
-
-                token_response = outlook.refresh_access_token(refresh_token)
-                access_token = token_response.get("access_token")
-
-                self.token_store.update_access_token(
-                    SYSTEM_EMAIL_IDENTIFIER,
-                    access_token,
-                    token_response.get("expires_in", 3600)
-                )
-
-                tokens = self.token_store.get_tokens(SYSTEM_EMAIL_IDENTIFIER)
+                access_token = refresh_stored_access_token(self.token_store, outlook, SYSTEM_EMAIL_IDENTIFIER)
+                tokens = {**tokens, "access_token": access_token}
                 logger.info(f"Successfully refreshed token for {SYSTEM_EMAIL_IDENTIFIER}")
             except Exception as e:
                 logger.error(f"Failed to refresh token: {e}")
@@ -2,20 +2,21 @@
 """
 Daily automated report generation for Railway cron job.
 
-This script generates a 90-day proposal follow-up report every day.
+This script pre-generates the 90-day, monthly and weekly proposal follow-up
+reports every day.
 Run as: python scripts/daily_report_cron.py
 """
 
 import os
 import sys
 import logging
-from datetime import datetime
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from modules.proposal_followup_analyzer import ProposalFollowupAnalyzer
 from api.supabase_database import SupabaseDatabase
+from modules.proposal_followup_analyzer import ProposalFollowupAnalyzer
+from modules.report_builder import build_saved_report
 
 # Configure logging
 logging.basicConfig(
@@ -24,77 +25,61 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Report types pre-warmed every night so interactive views always hit a saved report
+PREWARM_REPORT_TYPES = ("90day", "monthly", "weekly")
+ENGAGE_EMAIL = "automated.response@prezlab.com"
+
 
 def generate_daily_report():
-    """Generate a 90-day automated report."""
+    """Generate and save the 90-day, monthly and weekly shared reports."""
     try:
-        logger.info("Starting automated 90-day report generation...")
+        logger.info("Starting automated report generation...")
 
         # Initialize database
         db = SupabaseDatabase()
 
-        # Get admin user (or use a specific service user)
-        # For automated reports, we'll use the admin user
+        # For automated reports, we'll use the admin user as the owner
         admin_email = os.getenv('ADMIN_EMAIL', 'admin@prezlab.com')
-
-        # Fetch admin user
-        from supabase import create_client
-        supabase = create_client(
-            os.getenv('SUPABASE_URL'),
-            os.getenv('SUPABASE_KEY')
-        )
-
-        response = supabase.table('users').select('*').eq('email', admin_email).execute()
-        if not response.data or len(response.data) == 0:
+        response = db.supabase.client.table('users').select('id').eq('email', admin_email).execute()
+        if not response.data:
             logger.error(f"Admin user not found: {admin_email}")
             return False
 
-        admin_user = response.data[0]
-        user_id = admin_user['id']
-
+        user_id = response.data[0]['id']
         logger.info(f"Using user: {admin_email} (ID: {user_id})")
 
-        # Initialize analyzer
+        # One analyzer for every report, so the Odoo login and LLM client are shared
         analyzer = ProposalFollowupAnalyzer()
 
-        # Generate report with 90-day parameters
-        report_config = {
-            'report_type': '90day',
-            'days_back': 90,
-            'no_response_days': 3,
-            'engage_email': admin_email
-        }
-
-        logger.info(f"Generating report with config: {report_config}")
-
-        # Generate the report
-        report_data = analyzer.generate_followup_report(**report_config)
-
-        if not report_data:
-            logger.error("Report generation returned no data")
-            return False
-
-        # Save to database
-        report_name = f"Automated 90-Day Report - {datetime.now().strftime('%Y-%m-%d')}"
-
-        logger.info(f"Saving report to database: {report_name}")
-
-        db.save_followup_report(
-            user_id=user_id,
-            report_name=report_name,
-            report_data=report_data,
-            report_config=report_config
-        )
-
-        logger.info(f"✅ Successfully generated and saved report: {report_name}")
-        logger.info(f"   - Total threads: {report_data.get('total_threads', 0)}")
-        logger.info(f"   - Needs followup: {report_data.get('needs_followup', 0)}")
-        logger.info(f"   - Engaged: {report_data.get('engaged', 0)}")
-
-        return True
+        success = True
+        for report_type in PREWARM_REPORT_TYPES:
+            try:
+                report = build_saved_report(
+                    db,
+                    analyzer,
+                    user_id,
+                    report_type,
+                    no_response_days=3,
+                    engage_email=ENGAGE_EMAIL,
+                )
+            except Exception as e:
+                logger.error(f"❌ Error generating {report_type} report: {e}", exc_info=True)
+                success = False
+                continue
+
+            if not report["report_id"]:
+                logger.error(f"❌ {report_type} report was generated but not saved")
+                success = False
+                continue
+
+            summary = report["result"].get("summary", {})
+            logger.info(f"✅ Saved {report_type} report {report['report_id']} ({report['report_period']})")
+            logger.info(f"   - Total follow-ups: {summary.get('total_count', 0)}")
+
+        return success
 
     except Exception as e:
-        logger.error(f"❌ Error generating daily report: {str(e)}", exc_info=True)
+        logger.error(f"❌ Error generating daily reports: {str(e)}", exc_info=True)
         return False
 
 
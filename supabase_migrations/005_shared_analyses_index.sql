@@ -0,0 +1,7 @@
+-- Migration: Index shared analyses
+-- Version: 005
+-- Description: Lets GET /re-engage/analyses read the newest shared lost-lead analyses from an index
+
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_shared
+ON analysis_cache(analysis_type, created_at DESC)
+WHERE is_shared;
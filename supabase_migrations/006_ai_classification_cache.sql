@@ -0,0 +1,12 @@
+-- Migration: Cache AI thread classifications
+-- Version: 006
+-- Description: Stores the lead/noise classification of each follow-up thread so unchanged
+-- threads (same latest message) are not sent to the LLM again on the next analysis run
+
+CREATE TABLE IF NOT EXISTS ai_classification_cache (
+    conversation_id TEXT NOT NULL,
+    last_message_id TEXT NOT NULL,
+    classification JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (conversation_id, last_message_id)
+);
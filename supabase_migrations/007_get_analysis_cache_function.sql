@@ -0,0 +1,32 @@
+-- Migration: Read the analysis cache in one round trip
+-- Version: 007
+-- Description: Returns the newest live cached result for a user/type/parameters and drops
+-- expired matches in the same call, replacing a select followed by a separate delete
+
+CREATE OR REPLACE FUNCTION get_analysis_cache(
+    p_user_id INTEGER,
+    p_analysis_type TEXT,
+    p_parameters JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+    cached_results JSONB;
+BEGIN
+    DELETE FROM analysis_cache
+    WHERE user_id = p_user_id
+      AND analysis_type = p_analysis_type
+      AND parameters @> p_parameters
+      AND expires_at IS NOT NULL
+      AND expires_at <= NOW();
+
+    SELECT results INTO cached_results
+    FROM analysis_cache
+    WHERE user_id = p_user_id
+      AND analysis_type = p_analysis_type
+      AND parameters @> p_parameters
+    ORDER BY created_at DESC
+    LIMIT 1;
+
+    RETURN cached_results;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from modules import email_token_store
+from modules.email_token_store import EmailTokenStore
+
+
+class FakeDatabase:
+    """The email_tokens calls EmailTokenStore makes, backed by a dict."""
+
+    def __init__(self):
+        self.rows = {}
+        self.reads = 0
+
+    def get_email_tokens(self, user_identifier):
+        self.reads += 1
+        row = self.rows.get(user_identifier)
+        return dict(row) if row else None
+
+    def save_email_tokens(self, user_identifier, access_token, refresh_token, expires_at, user_email, user_name):
+        self.rows[user_identifier] = {
+            'user_identifier': user_identifier,
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'expires_at': expires_at.isoformat(),
+            'user_email': user_email,
+            'user_name': user_name,
+        }
+        return True
+
+    def update_email_access_token(self, user_identifier, access_token, expires_at):
+        row = self.rows.get(user_identifier)
+        if not row:
+            return False
+        row.update(access_token=access_token, expires_at=expires_at.isoformat())
+        return True
+
+    def delete_email_tokens(self, user_identifier):
+        return self.rows.pop(user_identifier, None) is not None
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    email_token_store._token_cache.clear()
+    yield
+    email_token_store._token_cache.clear()
+
+
+def _stored_row(db, user_identifier, access_token='access-1', expires_in=3600):
+    db.rows[user_identifier] = {
+        'user_identifier': user_identifier,
+        'access_token': access_token,
+        'refresh_token': 'refresh-1',
+        'expires_at': (datetime.utcnow() + timedelta(seconds=expires_in)).isoformat(),
+    }
+
+
+def test_reads_are_cached_until_invalidated():
+    db = FakeDatabase()
+    _stored_row(db, 'user-1')
+    store = EmailTokenStore(db=db)
+
+    assert store.get_tokens('user-1')['access_token'] == 'access-1'
+    assert store.get_tokens('user-1')['access_token'] == 'access-1'
+    assert db.reads == 1
+
+    # Another process refreshed the token; invalidate makes us read it
+    db.rows['user-1']['access_token'] = 'access-2'
+    store.invalidate('user-1')
+    assert store.get_tokens('user-1')['access_token'] == 'access-2'
+    assert db.reads == 2
+
+
+def test_writes_update_the_cache():
+    db = FakeDatabase()
+    store = EmailTokenStore(db=db)
+
+    assert store.save_tokens('user-1', 'access-1', 'refresh-1', expires_in=3600)
+    assert store.update_access_token('user-1', 'access-2', expires_in=3600)
+
+    assert store.get_tokens('user-1')['access_token'] == 'access-2'
+    assert db.reads == 0
+
+    assert store.delete_tokens('user-1')
+    assert store.get_tokens('user-1') is None
+
+
+def test_expiry_uses_the_refresh_buffer():
+    db = FakeDatabase()
+    _stored_row(db, 'fresh', expires_in=3600)
+    _stored_row(db, 'expiring', expires_in=60)
+    store = EmailTokenStore(db=db)
+
+    assert not store.is_token_expired('fresh')
+    assert store.is_token_expired('expiring')
+    assert store.is_token_expired('missing')
+    assert store.get_status('expiring')['expires_soon']
+    assert store.get_status('missing') == {
+        'authorized': False, 'user_email': None, 'user_name': None, 'expires_soon': False,
+    }
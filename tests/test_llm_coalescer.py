@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+from modules.llm_coalescer import LLMRequestCoalescer
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def chat_completion(self, messages, **params):
+        self.calls.append((messages, params))
+        self.release.wait(5)
+        content = messages[-1]['content']
+        if content == 'fail':
+            raise RuntimeError('upstream error')
+        return content.upper()
+
+
+def _messages(content):
+    return [{'role': 'user', 'content': content}]
+
+
+def test_identical_requests_in_flight_share_one_completion():
+    llm = FakeLLM()
+    coalescer = LLMRequestCoalescer(llm_factory=lambda: llm)
+
+    async def run():
+        first = asyncio.create_task(coalescer.submit(_messages('hi'), temperature=0.7))
+        second = asyncio.create_task(coalescer.submit(_messages('hi'), temperature=0.7))
+        other = asyncio.create_task(coalescer.submit(_messages('hi'), temperature=0.2))
+        await asyncio.sleep(0.05)
+        llm.release.set()
+        return await asyncio.gather(first, second, other)
+
+    assert asyncio.run(run()) == ['HI', 'HI', 'HI']
+    assert len(llm.calls) == 2
+    assert coalescer._inflight == {}
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_completion():
+    llm = FakeLLM()
+    coalescer = LLMRequestCoalescer(llm_factory=lambda: llm)
+
+    async def run():
+        first = asyncio.create_task(coalescer.submit(_messages('hi')))
+        second = asyncio.create_task(coalescer.submit(_messages('hi')))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        llm.release.set()
+        return await second
+
+    assert asyncio.run(run()) == 'HI'
+
+
+def test_failure_is_raised_to_every_caller():
+    llm = FakeLLM()
+    llm.release.set()
+    coalescer = LLMRequestCoalescer(llm_factory=lambda: llm)
+
+    async def run():
+        return await asyncio.gather(
+            coalescer.submit(_messages('fail')),
+            coalescer.submit(_messages('fail')),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(llm.calls) == 1
+
+
+def test_submit_json_parses_the_response():
+    class JsonLLM:
+        def chat_completion(self, messages, **params):
+            assert params['response_format'] == {'type': 'json_object'}
+            return '{"priority": "high"}' if messages[-1]['content'] == 'json' else 'not json'
+
+    coalescer = LLMRequestCoalescer(llm_factory=JsonLLM)
+
+    assert asyncio.run(coalescer.submit_json(_messages('json'))) == {'priority': 'high'}
+    assert asyncio.run(coalescer.submit_json(_messages('text'))) == {'raw_text': 'not json'}
@@ -0,0 +1,156 @@
+from modules.odoo_client import OdooClient
+
+
+class FakeOdooClient(OdooClient):
+    """OdooClient whose RPCs run against in-memory crm.lead and res.users records."""
+
+    def __init__(self, leads=(), users=()):
+        super().__init__()
+        self.leads = list(leads)
+        self.users = list(users)
+        self.calls = []
+
+    def _call_kw(self, model, method, args=None, kwargs=None):
+        self.calls.append((model, method, args, kwargs))
+        if model == 'res.users':
+            return [dict(user) for user in self.users if self._matches(list(kwargs['domain']), user)]
+        if method == 'read':
+            ids = args[0]
+            return [dict(lead) for lead in self.leads if lead['id'] in ids]
+        if method == 'write':
+            ids, values = args
+            for lead in self.leads:
+                if lead['id'] in ids:
+                    lead.update(values)
+            return True
+        domain = args[0]
+        return [dict(lead) for lead in self.leads if self._matches(list(domain), lead)]
+
+    @classmethod
+    def _matches(cls, domain, record):
+        # Evaluates a prefix-notation domain of '&'/'|' and the operators used here
+        def evaluate():
+            term = domain.pop(0)
+            if term == '|':
+                left, right = evaluate(), evaluate()
+                return left or right
+            if term == '&':
+                left, right = evaluate(), evaluate()
+                return left and right
+            field, operator, value = term
+            actual = record.get(field)
+            if operator == '=ilike':
+                return (actual or '').lower() == value.lower()
+            if operator == '=':
+                return actual == value
+            if operator == 'ilike':
+                return value.lower() in (actual or '').lower()
+            raise AssertionError(f"unexpected operator {operator}")
+
+        result = evaluate()
+        while domain:
+            result = result and evaluate()
+        return result
+
+
+def test_get_leads_by_emails_matches_mixed_case_stored_email():
+    client = FakeOdooClient([
+        {'id': 7, 'name': 'Acme rebrand', 'contact_name': 'John Doe', 'email_from': 'John.Doe@Acme.com'},
+    ])
+
+    leads = client.get_leads_by_emails([' john.doe@acme.com '])
+
+    assert leads['john.doe@acme.com']['id'] == 7
+    assert leads['john.doe@acme.com']['first_name'] == 'John'
+
+
+def test_get_leads_by_emails_queries_in_chunks_of_fifty():
+    emails = [f'user{i}@example.com' for i in range(120)]
+    client = FakeOdooClient([
+        {'id': i, 'name': f'Lead {i}', 'email_from': email.upper()}
+        for i, email in enumerate(emails)
+    ])
+
+    # Duplicates and surrounding whitespace collapse to one address
+    leads = client.get_leads_by_emails(emails + [' USER0@example.com '])
+
+    assert len(client.calls) == 3
+    assert [len(call[2][0]) for call in client.calls] == [50 * 2 - 1, 50 * 2 - 1, 20 * 2 - 1]
+    assert len(leads) == 120
+    assert leads['user119@example.com']['id'] == 119
+
+
+def test_get_leads_by_emails_filters_by_salesperson():
+    client = FakeOdooClient(
+        leads=[
+            {'id': 1, 'name': 'Mine', 'email_from': 'a@example.com', 'user_id': 5},
+            {'id': 2, 'name': 'Theirs', 'email_from': 'b@example.com', 'user_id': 6},
+        ],
+        users=[{'id': 5, 'name': 'Rana Salesperson'}],
+    )
+
+    leads = client.get_leads_by_emails(['a@example.com', 'b@example.com'], salesperson_name='Rana Salesperson')
+
+    assert list(leads) == ['a@example.com']
+
+
+def test_get_leads_by_emails_keeps_first_lead_per_email():
+    client = FakeOdooClient([
+        {'id': 9, 'name': 'Newest', 'email_from': 'jane@example.com'},
+        {'id': 3, 'name': 'Older', 'email_from': 'JANE@example.com'},
+        {'id': 5, 'name': 'Other', 'email_from': 'bob@example.com'},
+    ])
+
+    leads = client.get_leads_by_emails(['jane@example.com', 'Bob@Example.com'])
+
+    assert leads['jane@example.com']['id'] == 9
+    assert leads['bob@example.com']['id'] == 5
+    _, _, _, kwargs = client.calls[0]
+    assert 'limit' not in kwargs
+
+
+def test_find_user_id_does_not_cache_missing_user():
+    client = FakeOdooClient()
+    name = 'Salesperson Added Later'
+
+    assert client.find_user_id(name) is None
+
+    client.users.append({'id': 42, 'name': name})
+    assert client.find_user_id(name) == 42
+
+    # Found ids are cached
+    calls = len(client.calls)
+    assert client.find_user_id(name) == 42
+    assert len(client.calls) == calls
+
+
+def _enrichable_lead(lead_id, **values):
+    # source_id and description already set, so no utm.source lookup or internal note
+    return {'id': lead_id, 'source_id': [1, 'Inbound'], 'description': 'Existing', **values}
+
+
+def test_update_leads_writes_identical_values_once():
+    client = FakeOdooClient([
+        _enrichable_lead(1),
+        _enrichable_lead(2),
+        _enrichable_lead(3),
+        _enrichable_lead(4, city='Amman'),
+    ])
+
+    results = client.update_leads([
+        (1, {'City': 'Dubai', 'Job Role': 'CEO'}),
+        (2, {'Job Role': 'CEO', 'City': 'Dubai'}),
+        (3, {'City': 'Cairo'}),
+        (4, {'City': 'Dubai'}),
+        (99, {'City': 'Dubai'}),
+    ])
+
+    assert results == {1: True, 2: True, 3: True, 4: True, 99: False}
+    reads = [call for call in client.calls if call[1] == 'read']
+    writes = [call[2] for call in client.calls if call[1] == 'write']
+    assert len(reads) == 1
+    # Lead 4 already has a city, so it has nothing to write
+    assert sorted(writes, key=lambda args: args[0]) == [
+        [[1, 2], {'city': 'Dubai', 'function': 'CEO'}],
+        [[3], {'city': 'Cairo'}],
+    ]
@@ -0,0 +1,77 @@
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from modules.token_refresh import TokenRefreshManager, stored_token_refresh
+
+
+@pytest.fixture
+def manager():
+    manager = TokenRefreshManager(max_workers=2)
+    yield manager
+    manager._executor.shutdown(wait=False)
+
+
+def test_concurrent_waiters_share_one_refresh(manager):
+    release = threading.Event()
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        release.wait(5)
+        return 'new-token'
+
+    first = manager.schedule('user-1', refresh)
+    second = manager.schedule('user-1', refresh)
+    assert first is second
+
+    release.set()
+    assert manager.wait('user-1', refresh) == 'new-token'
+    assert calls == [1]
+
+
+def test_finished_refresh_is_forgotten(manager):
+    assert manager.wait('user-1', lambda: 'first') == 'first'
+    assert manager.wait('user-1', lambda: 'second') == 'second'
+    assert manager._inflight == {}
+
+
+def test_failed_refresh_raises_to_waiters(manager):
+    def refresh():
+        raise ValueError('refresh token revoked')
+
+    with pytest.raises(ValueError):
+        manager.wait('user-1', refresh)
+    assert manager.wait('user-1', lambda: 'retried') == 'retried'
+
+
+def test_timed_out_wait_lets_the_next_caller_start_over(manager):
+    hung = threading.Event()
+
+    with pytest.raises(FutureTimeoutError):
+        manager.wait('user-1', lambda: hung.wait(5) and 'late', timeout=0.05)
+
+    assert manager.wait('user-1', lambda: 'fresh', timeout=1) == 'fresh'
+    hung.set()
+
+
+def test_stored_token_refresh_saves_the_new_access_token():
+    class Store:
+        def __init__(self):
+            self.updated = None
+
+        def get_tokens(self, user_identifier):
+            return {'refresh_token': 'refresh-1'}
+
+        def update_access_token(self, user_identifier, access_token, expires_in):
+            self.updated = (user_identifier, access_token, expires_in)
+
+    class Outlook:
+        def refresh_access_token(self, refresh_token):
+            assert refresh_token == 'refresh-1'
+            return {'access_token': 'access-2', 'expires_in': 1800}
+
+    store = Store()
+    assert stored_token_refresh(store, Outlook(), 'user-1')() == 'access-2'
+    assert store.updated == ('user-1', 'access-2', 1800)
@@ -0,0 +1,60 @@
+import pytest
+
+from modules import ttl_cache
+from modules.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set('a', 1)
+
+    clock[0] += 9.9
+    assert cache.get('a') == 1
+
+    clock[0] += 0.1
+    assert cache.get('a') is None
+    assert cache.get('a', 'missing') == 'missing'
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set('short', 1, ttl=1)
+    cache.set('long', 2)
+
+    clock[0] += 5
+    assert cache.get('short') is None
+    assert cache.get('long') == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # Reading 'a' makes 'b' the least recently used
+    assert cache.get('a') == 1
+
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_pop_returns_live_value_only(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    assert cache.pop('a') == 1
+    assert cache.get('a') is None
+
+    clock[0] += 10
+    assert cache.pop('b', 'expired') == 'expired'